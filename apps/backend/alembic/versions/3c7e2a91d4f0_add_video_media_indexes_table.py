@@ -0,0 +1,40 @@
+"""Add video_media_indexes table
+
+Revision ID: 3c7e2a91d4f0
+Revises: 16bee0812a63
+Create Date: 2025-09-02 10:14:22.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e2a91d4f0'
+down_revision = '16bee0812a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create video_media_indexes table
+    op.create_table(
+        'video_media_indexes',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('keyframes', sa.JSON(), nullable=False),
+        sa.Column('shots', sa.JSON(), nullable=True),
+        sa.Column('keyframe_count', sa.Integer(), nullable=True),
+        sa.Column('max_gop_duration', sa.Float(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_video_media_indexes_video_id', 'video_media_indexes', ['video_id'], unique=True)
+
+
+def downgrade() -> None:
+    # Drop video_media_indexes table
+    op.drop_index('ix_video_media_indexes_video_id', table_name='video_media_indexes')
+    op.drop_table('video_media_indexes')
@@ -0,0 +1,40 @@
+"""Add render_cache_entries table
+
+Revision ID: 8f41b6d2c9e7
+Revises: 3c7e2a91d4f0
+Create Date: 2025-09-04 16:42:09.731264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f41b6d2c9e7'
+down_revision = '3c7e2a91d4f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create render_cache_entries table
+    op.create_table(
+        'render_cache_entries',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('cache_key', sa.String(), nullable=False),
+        sa.Column('video_s3_key', sa.String(), nullable=False),
+        sa.Column('thumbnail_url', sa.String(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('generation_metadata', sa.Text(), nullable=True),
+        sa.Column('source_video_id', sa.String(), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_hit_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_render_cache_entries_cache_key', 'render_cache_entries', ['cache_key'], unique=True)
+
+
+def downgrade() -> None:
+    # Drop render_cache_entries table
+    op.drop_index('ix_render_cache_entries_cache_key', table_name='render_cache_entries')
+    op.drop_table('render_cache_entries')
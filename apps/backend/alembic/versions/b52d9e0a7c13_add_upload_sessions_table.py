@@ -0,0 +1,43 @@
+"""Add upload_sessions table
+
+Revision ID: b52d9e0a7c13
+Revises: 8f41b6d2c9e7
+Create Date: 2025-09-06 10:17:52.408116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d9e0a7c13'
+down_revision = '8f41b6d2c9e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create upload_sessions table
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('property_id', sa.String(), sa.ForeignKey('properties.id'), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('s3_upload_id', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('part_size', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_upload_sessions_user_id', 'upload_sessions', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop upload_sessions table
+    op.drop_index('ix_upload_sessions_user_id', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
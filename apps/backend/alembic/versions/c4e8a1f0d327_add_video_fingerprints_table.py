@@ -0,0 +1,38 @@
+"""Add video_fingerprints table
+
+Revision ID: c4e8a1f0d327
+Revises: b52d9e0a7c13
+Create Date: 2025-09-08 11:03:27.519842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f0d327'
+down_revision = 'b52d9e0a7c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create video_fingerprints table
+    op.create_table(
+        'video_fingerprints',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('property_id', sa.String(), sa.ForeignKey('properties.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('duration', sa.Float(), nullable=False),
+        sa.Column('frame_hashes', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_video_fingerprints_video_id', 'video_fingerprints', ['video_id'], unique=True)
+    op.create_index('ix_video_fingerprints_property_duration', 'video_fingerprints', ['property_id', 'duration'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop video_fingerprints table
+    op.drop_index('ix_video_fingerprints_property_duration', table_name='video_fingerprints')
+    op.drop_index('ix_video_fingerprints_video_id', table_name='video_fingerprints')
+    op.drop_table('video_fingerprints')
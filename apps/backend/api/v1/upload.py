@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 import logging
 
@@ -10,6 +11,7 @@ from core.auth import get_current_user
 from models.user import User
 from models.property import Property
 from models.video import Video
+from models.upload_session import UploadSession
 # Import S3 service conditionally to prevent startup crashes
 try:
     from services.s3_service import s3_service
@@ -17,6 +19,7 @@ except Exception as e:
     print(f"Warning: Could not import S3 service: {e}")
     s3_service = None
 from core.config import settings
+from core.celery_queues import PRIORITY_INTERACTIVE
 # Import Celery tasks conditionally to prevent startup crashes
 try:
     from tasks.video_processing_tasks import get_video_processing_status
@@ -47,6 +50,21 @@ class VideoCreateRequest(BaseModel):
     file_size: int
     content_type: str
 
+class MultipartInitRequest(BaseModel):
+    file_name: str
+    content_type: str
+    property_id: str
+    file_size: int
+
+class MultipartUploadResponse(BaseModel):
+    upload_id: str
+    s3_key: str
+    status: str
+    file_size: int
+    part_size: int
+    part_count: int
+    missing_parts: List[int]
+
 class VideoResponse(BaseModel):
     id: str
     title: str
@@ -185,48 +203,8 @@ async def get_download_url(
             detail="Failed to generate download URL"
         )
 
-@router.post("/complete", response_model=VideoResponse)
-async def complete_upload(
-    request: VideoCreateRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Create a video record after successful file upload"""
-    
-    # Validate property ownership
-    property = db.query(Property).filter(
-        Property.id == request.property_id,
-        Property.user_id == current_user.id
-    ).first()
-    
-    if not property:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Property not found"
-        )
-    
-    # Check if S3 service is available
-    if not s3_service:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="S3 service unavailable"
-        )
-    
-    # Create video record with processing status (will be completed once AI description is generated)
-    video = Video(
-        title=request.file_name,
-        video_url=f"s3://{s3_service.bucket_name}/{request.s3_key}",
-        format=request.content_type.split('/')[-1],
-        size=request.file_size,
-        status="processing",  # Initial processing status
-        user_id=current_user.id,
-        property_id=request.property_id,
-        description=f"Uploaded video: {request.file_name}"
-    )
-    
-    db.add(video)
-    db.commit()
-    db.refresh(video)
+async def _start_video_processing(video: Video, s3_key: str, db: Session):
+    """Start ingest of an uploaded video: Celery when available, synchronous otherwise"""
     
     # Auto-detect environment and choose appropriate processing method
     from core.deployment import deployment_config
@@ -237,7 +215,9 @@ async def complete_upload(
         # Local/Production avec Celery - traitement asynchrone
         try:
             from tasks.video_processing_tasks import process_uploaded_video
-            task = process_uploaded_video.delay(str(video.id), request.s3_key)
+            task = process_uploaded_video.apply_async(
+                args=[str(video.id), s3_key], priority=PRIORITY_INTERACTIVE
+            )
             
             video.generation_job_id = task.id
             db.commit()
@@ -276,14 +256,14 @@ async def complete_upload(
             if use_complex_processing:
                 processed = await process_video_sync(
                     video=video,
-                    s3_key=request.s3_key,
+                    s3_key=s3_key,
                     db=db,
                     config=config
                 )
             else:
                 processed = await process_video_simple(
                     video=video,
-                    s3_key=request.s3_key,
+                    s3_key=s3_key,
                     db=db,
                     config=config
                 )
@@ -297,6 +277,52 @@ async def complete_upload(
             logger.error(f"❌ Synchronous processing failed: {e}")
             video.status = "uploaded"  # Fallback to uploaded status
             db.commit()
+
+
+@router.post("/complete", response_model=VideoResponse)
+async def complete_upload(
+    request: VideoCreateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a video record after successful file upload"""
+    
+    # Validate property ownership
+    property = db.query(Property).filter(
+        Property.id == request.property_id,
+        Property.user_id == current_user.id
+    ).first()
+    
+    if not property:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    # Check if S3 service is available
+    if not s3_service:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="S3 service unavailable"
+        )
+    
+    # Create video record with processing status (will be completed once AI description is generated)
+    video = Video(
+        title=request.file_name,
+        video_url=f"s3://{s3_service.bucket_name}/{request.s3_key}",
+        format=request.content_type.split('/')[-1],
+        size=request.file_size,
+        status="processing",  # Initial processing status
+        user_id=current_user.id,
+        property_id=request.property_id,
+        description=f"Uploaded video: {request.file_name}"
+    )
+    
+    db.add(video)
+    db.commit()
+    db.refresh(video)
+    
+    await _start_video_processing(video, request.s3_key, db)
     
     return VideoResponse.from_orm(video)
 
@@ -330,7 +356,9 @@ async def get_processing_status(
             }
         
         # Get processing status
-        status_result = get_video_processing_status.delay(video_id)
+        status_result = get_video_processing_status.apply_async(
+            args=[video_id], priority=PRIORITY_INTERACTIVE
+        )
         result = status_result.get(timeout=5)
         
         return result
@@ -343,6 +371,287 @@ async def get_processing_status(
             "error": str(e)
         }
 
+def _get_upload_session(upload_id: str, user: User, db: Session) -> UploadSession:
+    """Load an upload session of the current user (404 otherwise)"""
+    
+    upload_session = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.user_id == user.id
+    ).first()
+    
+    if not upload_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    return upload_session
+
+async def _list_received_parts(upload_session: UploadSession) -> list:
+    """Parts S3 holds for the session (S3 is the source of truth: parts can arrive in parallel)"""
+    
+    parts = await run_in_threadpool(s3_service.list_parts, upload_session.s3_key, upload_session.s3_upload_id)
+    if parts is None:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to list uploaded parts"
+        )
+    return parts
+
+def _multipart_response(upload_session: UploadSession, missing_parts: List[int]) -> MultipartUploadResponse:
+    return MultipartUploadResponse(
+        upload_id=upload_session.id,
+        s3_key=upload_session.s3_key,
+        status=upload_session.status,
+        file_size=upload_session.file_size,
+        part_size=upload_session.part_size,
+        part_count=upload_session.part_count,
+        missing_parts=missing_parts
+    )
+
+@router.post("/multipart/init", response_model=MultipartUploadResponse)
+async def init_multipart_upload(
+    request: MultipartInitRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a resumable chunked upload
+    Le client envoie ensuite chaque part (PUT), peut reprendre après une coupure
+    via GET, puis finalise (complete)
+    """
+    
+    # Validate property ownership
+    property = db.query(Property).filter(
+        Property.id == request.property_id,
+        Property.user_id == current_user.id
+    ).first()
+    
+    if not property:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    is_video = (
+        request.content_type.startswith('video/') or
+        any(request.file_name.lower().endswith(ext) for ext in ['.mp4', '.mov', '.avi', '.wmv'])
+    )
+    
+    if not is_video:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type: {request.content_type}. Only video files are allowed."
+        )
+    
+    if request.file_size <= 0 or request.file_size > settings.UPLOAD_MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file size. Maximum size is {settings.UPLOAD_MAX_FILE_SIZE // (1024 * 1024)}MB"
+        )
+    
+    if not s3_service or not s3_service.is_available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="S3 service unavailable"
+        )
+    
+    import uuid
+    file_extension = request.file_name.split('.')[-1] if '.' in request.file_name else 'mp4'
+    s3_key = f"properties/{request.property_id}/videos/{uuid.uuid4()}.{file_extension}"
+    
+    s3_upload_id = await run_in_threadpool(s3_service.create_multipart_upload, s3_key, request.content_type)
+    if not s3_upload_id:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to start upload"
+        )
+    
+    upload_session = UploadSession(
+        user_id=current_user.id,
+        property_id=request.property_id,
+        s3_key=s3_key,
+        s3_upload_id=s3_upload_id,
+        file_name=request.file_name,
+        content_type=request.content_type,
+        file_size=request.file_size,
+        part_size=settings.UPLOAD_PART_SIZE
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    
+    logger.info(f"📦 Multipart upload started: {upload_session.id} ({upload_session.part_count} parts) -> {s3_key}")
+    
+    return _multipart_response(upload_session, list(range(1, upload_session.part_count + 1)))
+
+@router.put("/multipart/{upload_id}/parts/{part_number}")
+async def upload_multipart_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload one part (raw request body) straight into the S3 multipart upload
+    Une part peut être renvoyée autant de fois que nécessaire, seule la dernière compte
+    """
+    
+    upload_session = _get_upload_session(upload_id, current_user, db)
+    
+    if upload_session.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is {upload_session.status}"
+        )
+    
+    if part_number < 1 or part_number > upload_session.part_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part number must be between 1 and {upload_session.part_count}"
+        )
+    
+    # Buffer at most one part per request: memory stays bounded by the part size
+    expected_size = upload_session.expected_part_size(part_number)
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > expected_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Part {part_number} must be {expected_size} bytes"
+            )
+    
+    if len(body) != expected_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part {part_number} must be {expected_size} bytes, got {len(body)}"
+        )
+    
+    etag = await run_in_threadpool(
+        s3_service.upload_part,
+        upload_session.s3_key,
+        upload_session.s3_upload_id,
+        part_number,
+        bytes(body)
+    )
+    
+    if not etag:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to store part {part_number}, retry it"
+        )
+    
+    return {"upload_id": upload_id, "part_number": part_number, "etag": etag, "size": expected_size}
+
+@router.get("/multipart/{upload_id}", response_model=MultipartUploadResponse)
+async def get_multipart_upload_status(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload progress: the parts still missing, to resume after a dropped connection"""
+    
+    upload_session = _get_upload_session(upload_id, current_user, db)
+    
+    if upload_session.status != "uploading":
+        return _multipart_response(upload_session, [])
+    
+    parts = await _list_received_parts(upload_session)
+    return _multipart_response(upload_session, upload_session.missing_parts(parts))
+
+@router.post("/multipart/{upload_id}/complete", response_model=VideoResponse)
+async def complete_multipart_upload(
+    upload_id: str,
+    title: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Assemble the parts into the final S3 object, create the video and start processing"""
+    
+    upload_session = _get_upload_session(upload_id, current_user, db)
+    
+    if upload_session.status == "completed" and upload_session.video_id:
+        # Retried completion (response lost on the way back): same video
+        video = db.query(Video).filter(Video.id == upload_session.video_id).first()
+        if video:
+            return VideoResponse.from_orm(video)
+    
+    if upload_session.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is {upload_session.status}"
+        )
+    
+    parts = await _list_received_parts(upload_session)
+    missing_parts = upload_session.missing_parts(parts)
+    if missing_parts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Upload incomplete", "missing_parts": missing_parts}
+        )
+    
+    completed = await run_in_threadpool(
+        s3_service.complete_multipart_upload,
+        upload_session.s3_key,
+        upload_session.s3_upload_id,
+        [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in sorted(parts, key=lambda part: part["PartNumber"])]
+    )
+    if not completed:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to complete upload"
+        )
+    
+    file_extension = upload_session.s3_key.rsplit('.', 1)[-1]
+    video = Video(
+        title=title or upload_session.file_name,
+        video_url=f"s3://{s3_service.bucket_name}/{upload_session.s3_key}",
+        format=file_extension,
+        size=upload_session.file_size,
+        status="processing",  # Initial processing status
+        user_id=current_user.id,
+        property_id=upload_session.property_id,
+        description=f"Uploaded video: {upload_session.file_name}"
+    )
+    db.add(video)
+    db.flush()
+    
+    upload_session.status = "completed"
+    upload_session.video_id = video.id
+    db.commit()
+    db.refresh(video)
+    
+    logger.info(f"✅ Multipart upload completed: {upload_session.id} -> video {video.id}")
+    
+    await _start_video_processing(video, upload_session.s3_key, db)
+    
+    return VideoResponse.from_orm(video)
+
+@router.delete("/multipart/{upload_id}")
+async def abort_multipart_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Abort an upload and free the parts already stored in S3"""
+    
+    upload_session = _get_upload_session(upload_id, current_user, db)
+    
+    if upload_session.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is {upload_session.status}"
+        )
+    
+    await run_in_threadpool(s3_service.abort_multipart_upload, upload_session.s3_key, upload_session.s3_upload_id)
+    
+    upload_session.status = "aborted"
+    db.commit()
+    
+    return {"upload_id": upload_id, "status": "aborted"}
+
 # Direct upload endpoint - handles both / and without trailing slash
 @router.post("/", response_model=VideoResponse)
 @router.post("", response_model=VideoResponse)  
@@ -408,8 +717,9 @@ async def upload_video_direct(
         
         # Check if S3 is configured and available
         if s3_service and settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-            # Production S3 upload
-            upload_result = s3_service.upload_file_direct(
+            # Production S3 upload (blocking boto3 call: off the event loop)
+            upload_result = await run_in_threadpool(
+                s3_service.upload_file_direct,
                 file.file,  # Direct file stream
                 s3_key, 
                 file.content_type or 'video/mp4'
@@ -429,14 +739,15 @@ async def upload_video_direct(
             video_url = f"test://uploads/{s3_key}"
             logger.info(f"✅ TEST upload simulated: {video_url}")
         
-        # Get file size
-        file_size = 0
-        try:
-            await file.seek(0, 2)  # Seek to end
-            file_size = await file.tell()
-            await file.seek(0)     # Reset to beginning
-        except:
-            file_size = 1024 * 1024  # Default 1MB
+        # Get file size (known from the multipart parser, no seek needed)
+        file_size = getattr(file, "size", None)
+        if file_size is None:
+            try:
+                await file.seek(0, 2)  # Seek to end
+                file_size = await file.tell()
+                await file.seek(0)     # Reset to beginning
+            except:
+                file_size = 1024 * 1024  # Default 1MB
         
         # Create video record with "processing" status
         # This will trigger the automatic processing pipeline
@@ -466,7 +777,9 @@ async def upload_video_direct(
             # Celery async processing (recommended for production)
             try:
                 from tasks.video_processing_tasks import process_uploaded_video
-                task = process_uploaded_video.delay(str(video.id), s3_key)
+                task = process_uploaded_video.apply_async(
+                    args=[str(video.id), s3_key], priority=PRIORITY_INTERACTIVE
+                )
                 video.generation_job_id = task.id
                 db.commit()
                 logger.info(f"🔄 Async processing task {task.id} started for video {video.id}")
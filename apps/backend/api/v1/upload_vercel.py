@@ -30,6 +30,7 @@ except Exception as e:
     print(f"Warning: Could not import OpenAI Vision service: {e}")  
     ai_analysis_service = None
 from core.config import settings
+from core.celery_queues import PRIORITY_INTERACTIVE
 from schemas.video import VideoResponse, VideoCreateRequest, UploadUrlRequest, UploadUrlResponse
 import logging
 import tempfile
@@ -531,7 +532,9 @@ async def complete_upload_async(
     # Trigger background processing with Celery (for local dev)
     try:
         from tasks.video_processing_tasks import process_uploaded_video
-        task = process_uploaded_video.delay(str(video.id), request.s3_key)
+        task = process_uploaded_video.apply_async(
+            args=[str(video.id), request.s3_key], priority=PRIORITY_INTERACTIVE
+        )
         
         video.generation_job_id = task.id
         db.commit()
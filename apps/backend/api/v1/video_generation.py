@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional, List
 from core.database import get_db
 from core.auth import get_current_user
+from core.celery_queues import PRIORITY_INTERACTIVE
 from models.user import User
 from models.property import Property
 from models.video import Video
@@ -710,13 +711,16 @@ async def generate_video_from_viral_template(
         }
         
         # Launch Celery task directly
-        task = generate_video_from_timeline_v3.delay(
-            video_id=video_id,
-            property_id=request.property_id,
-            user_id=str(current_user.id),
-            timeline_data=timeline_data,
-            template_id=template_id,
-            language=request.language
+        task = generate_video_from_timeline_v3.apply_async(
+            kwargs={
+                "video_id": video_id,
+                "property_id": request.property_id,
+                "user_id": str(current_user.id),
+                "timeline_data": timeline_data,
+                "template_id": template_id,
+                "language": request.language
+            },
+            priority=PRIORITY_INTERACTIVE  # The user is waiting on this render
         )
         
         # Update video record with task ID
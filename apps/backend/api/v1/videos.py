@@ -7,6 +7,7 @@ from datetime import datetime
 
 from core.database import get_db
 from core.auth import get_current_user
+from core.celery_queues import PRIORITY_INTERACTIVE
 from models.user import User
 from models.video import Video
 from models.property import Property
@@ -456,7 +457,9 @@ async def restart_video_processing(
             metadata = json.loads(video.source_data)
             s3_key = metadata.get('s3_key')
             if s3_key:
-                task = process_uploaded_video.delay(str(video.id), s3_key)
+                task = process_uploaded_video.apply_async(
+                    args=[str(video.id), s3_key], priority=PRIORITY_INTERACTIVE
+                )
                 video.generation_job_id = task.id
                 db.commit()
                 
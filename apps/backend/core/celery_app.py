@@ -1,6 +1,10 @@
 from celery import Celery
-from celery.signals import worker_process_init
+from celery.signals import celeryd_init, worker_process_init, worker_process_shutdown, worker_shutdown
 from core.config import settings
+from core.celery_queues import (
+    TASK_ROUTES, PRIORITY_DEFAULT, PRIORITY_BACKGROUND, QUEUE_DEFAULT, WORKER_PROFILES, worker_profile_name
+)
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -54,6 +58,19 @@ celery_app.conf.update(
     task_default_retry_delay=30,  # 30 secondes (réduit)
     task_max_retries=2,  # Réduit de 3 à 2
     
+    # Routing: ingest, render, ai and maintenance run on dedicated queues (and
+    # workers, see core/celery_queues.py) so a render never blocks a short task
+    task_routes=TASK_ROUTES,
+    task_default_queue=QUEUE_DEFAULT,
+    
+    # Priorities: interactive jobs jump ahead of backfills within a queue
+    task_default_priority=PRIORITY_DEFAULT,
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+    
     # Beat schedule for periodic tasks
     beat_schedule={
         'recover-stuck-videos': {
@@ -62,34 +79,50 @@ celery_app.conf.update(
             'kwargs': {
                 'timeout_minutes': 5,  # Videos stuck for more than 5 minutes
                 'max_retries': 2
-            }
+            },
+            'options': {'priority': PRIORITY_BACKGROUND}
         },
         'cleanup-old-failed-videos': {
             'task': 'video_recovery.cleanup_old_failed_videos', 
             'schedule': 24 * 60 * 60.0,  # Once per day
             'kwargs': {
                 'days_old': 7  # Delete failed videos older than 7 days
-            }
+            },
+            'options': {'priority': PRIORITY_BACKGROUND}
+        },
+        'abort-stale-upload-sessions': {
+            'task': 'video_recovery.abort_stale_upload_sessions',
+            'schedule': 60 * 60.0,  # Every hour (TTL: UPLOAD_SESSION_TTL_HOURS)
+            'options': {'priority': PRIORITY_BACKGROUND}
         }
     },
 )
 
+@celeryd_init.connect
+def celeryd_init_handler(sender=None, **kwargs):
+    """Publish the worker profile to the pool processes (forked after this signal)"""
+    os.environ["CELERY_WORKER_PROFILE"] = worker_profile_name(sender)
+
 @worker_process_init.connect
 def worker_process_init_handler(signal, sender, **kwargs):
-    """Initialize worker process with anti-crash optimizations"""
-    import os
-    import threading
+    """Initialize worker process with anti-crash optimizations and the limits of its worker profile"""
+    profile_name = os.environ.get("CELERY_WORKER_PROFILE", "")
+    profile = WORKER_PROFILES.get(profile_name, {})
     
-    logger.info(f"🚀 Initializing worker process: {sender}")
+    logger.info(f"🚀 Initializing worker process: {sender} (profile: {profile_name or 'none'})")
+    
+    # Threading limits du profil (numpy/OpenCV des process qui partagent les cœurs)
+    math_threads = profile.get("math_threads")
+    if math_threads:
+        os.environ.update({
+            'OMP_NUM_THREADS': str(math_threads),
+            'MKL_NUM_THREADS': str(math_threads),
+            'OPENBLAS_NUM_THREADS': str(math_threads),
+            'NUMEXPR_NUM_THREADS': str(math_threads),
+        })
     
     # Optimisations environnement pour éviter SIGSEGV
     os.environ.update({
-        # Threading limits pour éviter les conflits
-        'OMP_NUM_THREADS': '1',
-        'MKL_NUM_THREADS': '1', 
-        'OPENBLAS_NUM_THREADS': '1',
-        'NUMEXPR_NUM_THREADS': '1',
-        
         # OpenCV optimizations
         'OPENCV_IO_MAX_IMAGE_PIXELS': str(10**8),
         'OPENCV_FFMPEG_CAPTURE_OPTIONS': 'rtsp_transport;udp',
@@ -107,21 +140,37 @@ def worker_process_init_handler(signal, sender, **kwargs):
         'PYTHONIOENCODING': 'utf-8',
     })
     
-    # Forcer un seul thread pour OpenCV
-    try:
-        import cv2
-        cv2.setNumThreads(1)
-        logger.info("✅ OpenCV configuré en single-thread")
-    except ImportError:
-        pass
+    # Threads OpenCV alignés sur le profil
+    if math_threads:
+        try:
+            import cv2
+            cv2.setNumThreads(math_threads)
+            logger.info(f"✅ OpenCV configuré sur {math_threads} thread(s)")
+        except ImportError:
+            pass
         
-    # Limite de mémoire du processus
-    try:
-        import resource
-        # Limite de mémoire virtuelle à 1GB
-        resource.setrlimit(resource.RLIMIT_AS, (1024*1024*1024, 1024*1024*1024))
-        logger.info("✅ Limite mémoire processus configurée (1GB)")
-    except:
-        pass
+    # Limite d'espace d'adressage du profil (KB, héritée par les ffmpeg lancés)
+    max_address_space = profile.get("max_address_space")
+    if max_address_space:
+        try:
+            import resource
+            limit = max_address_space * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            logger.info(f"✅ Limite d'espace d'adressage configurée ({max_address_space // 1024} MB)")
+        except (ValueError, OSError) as e:
+            logger.warning(f"⚠️ Limite d'espace d'adressage non appliquée: {e}")
         
-    logger.info("✅ Worker process initialized avec optimisations anti-crash")
\ No newline at end of file
+    logger.info("✅ Worker process initialized avec optimisations anti-crash")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_vector_writes_on_shutdown(**kwargs):
+    """Write queued segment vectors before the worker (or pool process) exits"""
+    import sys
+    
+    # Only processes that analyzed videos have a writer to flush
+    weaviate_module = sys.modules.get("services.weaviate_service")
+    if weaviate_module is not None:
+        logger.info("🧮 Flushing queued segment vectors before shutdown")
+        weaviate_module.weaviate_service.batch_writer.close()
@@ -0,0 +1,121 @@
+"""
+Celery queues, task routing, priorities and per-queue worker profiles
+
+Kept free of Celery imports so the supervisor can build worker commands from it.
+"""
+
+from typing import List, Dict, Any
+
+# Queues: a long render never blocks an upload, an AI call or a recovery sweep
+QUEUE_INGEST = "ingest"            # Upload probe/conversion/finalize (CPU, ffmpeg)
+QUEUE_RENDER = "render"            # Video generation (CPU heavy, minutes)
+QUEUE_AI = "ai"                    # External AI calls and embeddings (I/O bound)
+QUEUE_MAINTENANCE = "maintenance"  # Recovery sweeps, backfills, status lookups (short)
+QUEUE_DEFAULT = "celery"           # Unrouted tasks (consumed by the maintenance worker)
+
+# Priorities (Redis transport: 0 is served first)
+PRIORITY_INTERACTIVE = 0  # A user is waiting on the result
+PRIORITY_DEFAULT = 5
+PRIORITY_BACKGROUND = 9   # Backfills and periodic sweeps
+
+TASK_ROUTES = {
+    # Ingest DAG
+    "tasks.video_processing_tasks.process_uploaded_video": {"queue": QUEUE_INGEST},
+    "tasks.video_processing_tasks.convert_uploaded_video": {"queue": QUEUE_INGEST},
+    "tasks.video_processing_tasks.finalize_uploaded_video": {"queue": QUEUE_INGEST},
+    "tasks.video_processing_tasks.mark_uploaded_video_failed": {"queue": QUEUE_INGEST},
+    "tasks.video_processing_tasks.describe_uploaded_video": {"queue": QUEUE_AI},
+    "tasks.video_processing_tasks.describe_uploaded_videos": {"queue": QUEUE_AI},
+
+    # Short lookups and backfills
+    "tasks.video_processing_tasks.get_video_processing_status": {"queue": QUEUE_MAINTENANCE},
+    "tasks.video_processing_tasks.get_source_cache_stats": {"queue": QUEUE_MAINTENANCE},
+    "tasks.video_processing_tasks.generate_missing_thumbnails": {"queue": QUEUE_MAINTENANCE},
+    "tasks.recovery_tasks.*": {"queue": QUEUE_MAINTENANCE},
+    "tasks.video_recovery_tasks.*": {"queue": QUEUE_MAINTENANCE},
+    "video_recovery.*": {"queue": QUEUE_MAINTENANCE},
+
+    # Rendering
+    "tasks.video_generation_v3.*": {"queue": QUEUE_RENDER},
+
+    # AI analysis and embeddings
+    "tasks.video_analysis_tasks.*": {"queue": QUEUE_AI},
+    "tasks.embeddings.*": {"queue": QUEUE_AI},
+    "tasks.video_matching.*": {"queue": QUEUE_AI},
+}
+
+# One worker per queue, sized for its workload (memory in KB, limits in seconds).
+# Prefork children also get the profile's math library thread cap (math_threads) and
+# address-space limit (max_address_space), both inherited by the ffmpeg they spawn:
+# ffmpeg maps far more address space than it uses, so encoding workers set none.
+WORKER_PROFILES: Dict[str, Dict[str, Any]] = {
+    QUEUE_INGEST: {
+        "queues": [QUEUE_INGEST],
+        "pool": "prefork",
+        "concurrency": 2,
+        "max_tasks_per_child": 10,
+        "max_memory_per_child": 1536000,  # 1.5 GB (decode + encode buffers)
+        "time_limit": 900,
+        "soft_time_limit": 780,
+        "math_threads": 1,  # Two children share the cores with their ffmpeg encodes
+        "max_address_space": None,
+    },
+    QUEUE_RENDER: {
+        "queues": [QUEUE_RENDER],
+        "pool": "prefork",
+        "concurrency": 1,  # A render already spreads its clip encodes over every core
+        "max_tasks_per_child": 5,
+        "max_memory_per_child": 2048000,  # 2 GB
+        "time_limit": 900,
+        "soft_time_limit": 780,
+        "math_threads": None,
+        "max_address_space": None,
+    },
+    QUEUE_AI: {
+        "queues": [QUEUE_AI],
+        "pool": "threads",  # Waiting on HTTP: threads, no fork per call
+        "concurrency": 8,
+    },
+    QUEUE_MAINTENANCE: {
+        "queues": [QUEUE_MAINTENANCE, QUEUE_DEFAULT],
+        "pool": "solo",
+        "concurrency": 1,
+        "max_tasks_per_child": 50,
+        "max_memory_per_child": 256000,  # 256 MB
+        "time_limit": 300,
+        "soft_time_limit": 240,
+    },
+}
+
+ALL_QUEUES = [QUEUE_DEFAULT, QUEUE_INGEST, QUEUE_RENDER, QUEUE_AI, QUEUE_MAINTENANCE]
+
+
+def worker_command_args(profile_name: str) -> List[str]:
+    """
+    Celery worker CLI options of a worker profile
+
+    Args:
+        profile_name: Key of WORKER_PROFILES
+
+    Returns:
+        Options to append after "celery -A core.celery_app worker"
+    """
+    profile = WORKER_PROFILES[profile_name]
+    args = [
+        f"--queues={','.join(profile['queues'])}",
+        f"--pool={profile['pool']}",
+        f"--concurrency={profile['concurrency']}",
+        f"--hostname={profile_name}@%h",
+    ]
+
+    # The threads pool has no child processes to recycle or time-limit
+    for option in ("max_tasks_per_child", "max_memory_per_child", "time_limit", "soft_time_limit"):
+        if profile.get(option):
+            args.append(f"--{option.replace('_', '-')}={profile[option]}")
+
+    return args
+
+
+def worker_profile_name(nodename: str) -> str:
+    """Profile of a worker started with worker_command_args (its hostname is "<profile>@<host>")"""
+    return str(nodename).split("@", 1)[0]
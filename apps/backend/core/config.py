@@ -43,11 +43,90 @@ class Settings(BaseSettings):
     AWS_S3_BUCKET: str = os.getenv("AWS_S3_BUCKET", "hospup-files")
     AWS_REGION: str = os.getenv("AWS_REGION", "eu-west-1")
     
+    # S3 transfers (pooled client, concurrent ranged/multipart transfers)
+    S3_MAX_POOL_CONNECTIONS: int = 32
+    S3_TRANSFER_CONCURRENCY: int = 8  # Parallel ranges/parts per transfer
+    S3_TRANSFER_CHUNK_SIZE: int = 8 * 1024 * 1024  # 8 MB ranges/parts
+    S3_TRANSFER_MAX_RETRIES: int = 4
+    
+    # Resumable chunked uploads (each part is streamed into an S3 multipart upload)
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024  # 8 MB parts (S3 minimum is 5 MB, except the last part)
+    UPLOAD_MAX_FILE_SIZE: int = 5 * 1024 * 1024 * 1024  # 5 GB
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Unfinished sessions older than this are aborted (stored parts are billed)
+    
     # Storage backend configuration
     STORAGE_BACKEND: str = "s3"  # 'local' or 's3'
     
+    # Shared on-disk cache of S3 source videos (per worker host)
+    SOURCE_CACHE_ENABLED: bool = True
+    SOURCE_CACHE_DIR: str = "/tmp/hospup-source-cache"
+    SOURCE_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024  # 10 GB
+    
+    # Upload ingest
+    INGEST_ANALYSIS_FRAMES: int = 8  # Evenly spaced frames written by the single-decode ingest pass
+    INGEST_CHUNK_WORKERS: int = 0  # Parallel chunk encoders for long uploads (0 = CPU count)
+    INGEST_CHUNK_MIN_SECONDS: int = 30  # Minimum chunk length; uploads under two chunks convert in one process
+    
+    # Near-duplicate uploads: fingerprint at ingest, reuse the processed outputs of a match in the same property
+    FINGERPRINT_ENABLED: bool = True
+    FINGERPRINT_FRAMES: int = 16  # Evenly spaced frames hashed per video
+    FINGERPRINT_MAX_DISTANCE: float = 6.0  # Mean Hamming distance per frame (of 64 bits) of a duplicate
+    FINGERPRINT_DURATION_TOLERANCE: float = 0.5  # Seconds (or 2% of the duration when larger)
+    
+    # Shot detection (small frames, shared by analysis, thumbnails and renders through VideoMediaIndex.shots)
+    SHOT_DETECT_FPS: float = 6.0  # Frames per second examined (never above the source rate)
+    SHOT_DETECT_MAX_FRAMES: int = 900  # Lower the rate for long videos to stay under this
+    SHOT_CUT_THRESHOLD: float = 0.12  # Mean absolute RGB difference (0-1) of a cut
+    SHOT_ADAPTIVE_RATIO: float = 3.0  # A cut also beats the recent differences by this factor
+    SHOT_MIN_SECONDS: float = 1.0  # Minimum shot length
+    SHOT_SNAP_SECONDS: float = 0.5  # Render in-points this close to a shot start are moved onto it
+    
+    # Video rendering
+    RENDER_CLIP_WORKERS: int = 0  # Parallel clip download/encode workers (0 = CPU count)
+    RENDER_ENGINE: str = "filtergraph"  # 'filtergraph' (single encode) or 'legacy' (per-segment encodes)
+    RENDER_SMART_CUT: bool = True  # Stream-copy sources already in the render profile when there are no text overlays
+    RENDER_CACHE_ENABLED: bool = True  # Reuse the stored output of an identical timeline instead of rendering again
+    RENDER_FONT: str = "DejaVu Sans"  # Text overlay font, resolved through fontconfig (installed in the worker image)
+    RENDER_FONT_FILE: str = ""  # Explicit font file, used instead of RENDER_FONT when it exists
+    
+    # Scene captioning (BLIP)
+    CAPTION_BATCH_SIZE: int = 16  # Frames per forward pass, across videos analyzed concurrently
+    CAPTION_MAX_WAIT_MS: int = 50  # Wait this long for more frames before running a partial batch
+    CAPTION_QUANTIZE: bool = True  # int8 dynamic quantization on CPU
+    CAPTION_THREADS: int = 0  # torch threads (0 = half the cores)
+    CAPTION_MAX_LENGTH: int = 50  # Max caption tokens
+    
+    # Image embeddings (OpenCLIP-compatible, 512-d)
+    EMBEDDING_BACKEND: str = "torch"  # "torch" or "onnx" (onnxruntime)
+    EMBEDDING_MODEL: str = "ViT-B-32"
+    EMBEDDING_PRETRAINED: str = "openai"
+    EMBEDDING_BATCH_SIZE: int = 32  # Frames per forward pass
+    EMBEDDING_QUANTIZE: bool = False  # int8 dynamic quantization (torch and onnx)
+    EMBEDDING_THREADS: int = 0  # Inference threads (0 = half the cores)
+    EMBEDDING_ONNX_PATH: str = "./models_cache/clip_image_encoder.onnx"  # Exported on first use
+    EMBEDDING_MAX_WAIT_MS: int = 20  # Sidecar: wait this long for more frames before running a partial batch
+    
+    # Inference sidecar (scripts/inference_server.py): models loaded once per host, shared by every worker
+    INFERENCE_SERVER_URL: str = ""  # "unix:///tmp/hospup-inference.sock" or "http://127.0.0.1:8091", empty = in-process models
+    INFERENCE_TIMEOUT: int = 60  # Seconds per request
+    
+    # Inference cache: captions, embeddings and AI descriptions keyed by a perceptual frame hash + model version
+    INFERENCE_CACHE_BACKEND: str = "disk"  # "disk" (SQLite per host), "redis" (shared, REDIS_URL) or "none"
+    INFERENCE_CACHE_DIR: str = "/tmp/hospup-inference-cache"
+    INFERENCE_CACHE_MAX_ENTRIES: int = 200000  # Disk: least recently used entries evicted above this
+    INFERENCE_CACHE_TTL: int = 30 * 24 * 3600  # Redis: idle entries expire after this (seconds)
+    INFERENCE_CACHE_HASH_SIZE: int = 16  # Difference hash of a 16x16 grayscale thumbnail (256 bits)
+    
     # External APIs
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = ""  # OpenAI-compatible endpoint (e.g. the local stand-in), empty = api.openai.com
+    
+    # AI description of uploaded videos
+    AI_DESCRIPTION_MODEL: str = "gpt-4o-mini"
+    AI_DESCRIPTION_CONCURRENCY: int = 8  # Requests in flight per process
+    AI_DESCRIPTION_BATCH_SIZE: int = 4  # Videos described per request (1 = one request per video)
+    AI_DESCRIPTION_MAX_RETRIES: int = 4  # Rate limits, timeouts and 5xx, with jittered backoff
+    AI_DESCRIPTION_TIMEOUT: int = 30  # seconds per request
     
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -60,6 +139,16 @@ class Settings(BaseSettings):
     WEAVIATE_GRPC_PORT: int = 50051
     WEAVIATE_API_KEY: str = ""
     
+    # Segment vector storage: "local" (embedded index, no service) or "weaviate"
+    VECTOR_BACKEND: str = "local"
+    LOCAL_VECTOR_INDEX_DIR: str = "./vector_index"  # Memory-mapped vectors + metadata log, shared by every process of the host
+    LOCAL_VECTOR_HNSW_THRESHOLD: int = 20000  # Filtered candidates above this go through HNSW (hnswlib), below are scored exactly
+    VECTOR_WRITE_BATCH_SIZE: int = 64  # Segment vectors per bulk write
+    VECTOR_WRITE_FLUSH_INTERVAL_MS: int = 500  # Write a partial batch after this long
+    VECTOR_WRITE_BUFFER: int = 1024  # Queued vectors before producers block (backpressure)
+    VECTOR_WRITE_PUT_TIMEOUT: int = 60  # Seconds a producer blocks on a full buffer before failing
+    VECTOR_WRITE_MAX_RETRIES: int = 4  # Bulk writes and deletes, with jittered backoff
+    
     # Airtable
     AIRTABLE_API_KEY: str = ""
     AIRTABLE_BASE_ID: str = ""
@@ -3,5 +3,9 @@ from .user import User
 from .property import Property
 from .video import Video
 from .video_segment import VideoSegment
+from .video_media_index import VideoMediaIndex
+from .render_cache_entry import RenderCacheEntry
+from .upload_session import UploadSession
+from .video_fingerprint import VideoFingerprint
 
-__all__ = ["User", "Property", "Video", "VideoSegment"]
\ No newline at end of file
+__all__ = ["User", "Property", "Video", "VideoSegment", "VideoMediaIndex", "RenderCacheEntry", "UploadSession", "VideoFingerprint"]
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime
+from datetime import datetime
+import uuid
+
+from core.database import Base
+
+class RenderCacheEntry(Base):
+    """Rendered output of a timeline, keyed by a hash of everything that determines its bytes"""
+    __tablename__ = "render_cache_entries"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    cache_key = Column(String, nullable=False, unique=True, index=True)  # sha256 of the canonical render inputs
+    
+    # Stored output
+    video_s3_key = Column(String, nullable=False)
+    thumbnail_url = Column(String)
+    duration = Column(Float)
+    generation_metadata = Column(Text)          # JSON of the render that produced the output
+    
+    # Source render and reuse stats
+    source_video_id = Column(String)
+    hit_count = Column(Integer, default=0, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<RenderCacheEntry {self.cache_key[:12]}: {self.video_s3_key} ({self.hit_count} hits)>"
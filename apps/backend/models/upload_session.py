@@ -0,0 +1,56 @@
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime
+from datetime import datetime
+import uuid
+
+from core.database import Base
+
+class UploadSession(Base):
+    """Resumable chunked upload, streamed part by part into an S3 multipart upload
+    
+    Received parts are not tracked here: S3 lists them (parts can arrive in parallel).
+    """
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    property_id = Column(String, ForeignKey("properties.id"), nullable=False)
+    
+    # Destination object and its S3 multipart upload
+    s3_key = Column(String, nullable=False)
+    s3_upload_id = Column(String, nullable=False)
+    
+    # File info
+    file_name = Column(String, nullable=False)
+    content_type = Column(String)
+    file_size = Column(BigInteger, nullable=False)  # bytes
+    part_size = Column(Integer, nullable=False)     # bytes, every part but the last
+    
+    # Status: uploading, completed, aborted
+    status = Column(String, default="uploading")
+    video_id = Column(String, ForeignKey("videos.id", ondelete="SET NULL"))  # Set on completion
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UploadSession {self.id}: {self.part_count} parts of {self.part_size} bytes ({self.status})>"
+    
+    @property
+    def part_count(self) -> int:
+        """Number of parts the file is split into"""
+        return max(1, -(-self.file_size // self.part_size))
+    
+    def expected_part_size(self, part_number: int) -> int:
+        """Size in bytes of a given part (the last one holds the remainder)"""
+        if part_number < self.part_count:
+            return self.part_size
+        return self.file_size - self.part_size * (self.part_count - 1)
+    
+    def missing_parts(self, received_parts):
+        """Part numbers not received yet (or received with the wrong size)"""
+        received = {part["PartNumber"]: part["Size"] for part in received_parts}
+        return [
+            number for number in range(1, self.part_count + 1)
+            if received.get(number) != self.expected_part_size(number)
+        ]
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from core.database import Base
+
+class VideoFingerprint(Base):
+    """Perceptual fingerprint of an uploaded video, used to find re-uploads of the same footage"""
+    __tablename__ = "video_fingerprints"
+    __table_args__ = (
+        # Near-duplicates are looked up within a property, among videos of about the same length
+        Index("ix_video_fingerprints_property_duration", "property_id", "duration"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = Column(String, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    property_id = Column(String, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+
+    # Fingerprint
+    duration = Column(Float, nullable=False)        # seconds
+    frame_hashes = Column(JSON, nullable=False)     # 64-bit difference hash (hex) of evenly spaced frames, null for blank frames
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    video = relationship("Video")
+
+    def __repr__(self):
+        return f"<VideoFingerprint {self.video_id}: {len(self.frame_hashes or [])} frames, {self.duration}s>"
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from core.database import Base
+
+class VideoMediaIndex(Base):
+    """Keyframe and shot index of an ingested video, used to seek and cut without decoding"""
+    __tablename__ = "video_media_indexes"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = Column(String, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    
+    # Object the index was computed from (a re-ingest invalidates it)
+    s3_key = Column(String, nullable=False)
+    
+    # Index data
+    keyframes = Column(JSON, nullable=False)   # [{"time": seconds, "pos": byte offset}]
+    shots = Column(JSON)                       # [{"start": seconds, "end": seconds, "motion": 0-1, "brightness": 0-1}]
+    
+    # GOP structure
+    keyframe_count = Column(Integer)
+    max_gop_duration = Column(Float)           # seconds between the two furthest keyframes
+    duration = Column(Float)                   # seconds
+    
+    # Ingest mezzanine settings when the ingest encoded the video stream, null for a copied stream
+    encoder_profile = Column(JSON)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    video = relationship("Video")
+    
+    def __repr__(self):
+        return f"<VideoMediaIndex {self.video_id}: {self.keyframe_count} keyframes, max GOP {self.max_gop_duration}s>"
+    
+    def keyframe_times(self):
+        """Get keyframe timestamps in seconds"""
+        return [keyframe["time"] for keyframe in (self.keyframes or [])]
+    
+    def shot_bounds(self):
+        """Get shots as (start, end) tuples in seconds"""
+        return [(shot["start"], shot["end"]) for shot in (self.shots or [])]
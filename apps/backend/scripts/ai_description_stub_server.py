@@ -0,0 +1,143 @@
+"""
+Serveur local compatible OpenAI (chat completions) pour tester les descriptions IA hors ligne
+- Latence simulée (fixe + gigue) et taux d'erreurs 429/500 configurables
+- Répond aux requêtes groupées (plusieurs vidéos) avec le JSON {"descriptions": [...]} attendu
+- Limite de requêtes simultanées pour reproduire un quota d'API
+
+Usage:
+    python scripts/ai_description_stub_server.py --port 8089 --latency 1.5 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python scripts/benchmark_ai_descriptions.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Paramètres de simulation et compteurs partagés entre les threads du serveur"""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float, max_concurrent: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.videos = 0
+        self.errors = 0
+
+
+def _count_videos(messages) -> int:
+    """Nombre de vidéos d'une requête: marqueurs 'Video N:' (requête groupée) ou 1"""
+    count = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            count += sum(
+                1 for part in content
+                if part.get("type") == "text" and part.get("text", "").startswith("Video ")
+            )
+    return max(1, count)
+
+
+def make_handler(state: StubState):
+    class ChatCompletionsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            # Quota atteint: 429 immédiat, comme l'API
+            if state.slots and not state.slots.acquire(blocking=False):
+                with state.lock:
+                    state.errors += 1
+                self._send_json(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": "1"})
+                return
+
+            try:
+                time.sleep(max(0.0, state.latency + random.uniform(-state.jitter, state.jitter)))
+
+                if random.random() < state.error_rate:
+                    with state.lock:
+                        state.errors += 1
+                    status = random.choice([429, 500])
+                    self._send_json(status, {"error": {"message": "Simulated error"}}, {"Retry-After": "1"} if status == 429 else None)
+                    return
+
+                videos = _count_videos(request.get("messages", []))
+                descriptions = [
+                    f"Stub description {uuid.uuid4().hex[:8]}: bright hotel room with a sea view, natural light, "
+                    f"slow pan over the bed and balcony."
+                    for _ in range(videos)
+                ]
+                is_json = (request.get("response_format") or {}).get("type") == "json_object"
+                content = json.dumps({"descriptions": descriptions}) if is_json else descriptions[0]
+
+                with state.lock:
+                    state.requests += 1
+                    state.videos += videos
+
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                })
+            finally:
+                if state.slots:
+                    state.slots.release()
+
+    return ChatCompletionsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for AI descriptions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=1.5, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency jitter (+/- seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 429/500")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="Concurrent requests before 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    state = StubState(args.latency, args.jitter, args.error_rate, args.max_concurrent)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"🤖 AI stand-in listening on http://{args.host}:{args.port}/v1 "
+          f"(latency {args.latency}s ±{args.jitter}s, errors {args.error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {state.requests} requests, {state.videos} videos described, {state.errors} errors")
+
+
+if __name__ == "__main__":
+    main()
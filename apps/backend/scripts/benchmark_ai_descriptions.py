@@ -0,0 +1,98 @@
+"""
+Benchmark des descriptions IA (débit) contre le serveur local ou une API compatible OpenAI
+- Génère N frames d'analyse synthétiques (512x512 JPEG)
+- Compare le mode séquentiel (1 requête à la fois, 1 vidéo par requête) aux réglages
+  de concurrence et de regroupement demandés
+- Écrit le résultat en JSON pour comparer deux commits
+
+Usage:
+    python scripts/ai_description_stub_server.py --latency 1.5 &
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python scripts/benchmark_ai_descriptions.py \\
+        --videos 50 --concurrency 1,8 --batch-sizes 1,4 --output bench_ai.json
+"""
+
+import sys
+import os
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+
+from PIL import Image
+
+from core.config import settings
+from services.ai_description_service import ai_description_service
+
+
+def generate_frames(work_dir: str, count: int) -> list:
+    """Génère des frames 512x512 de couleurs différentes"""
+    frame_paths = []
+    for index in range(count):
+        path = os.path.join(work_dir, f"frame_{index:03d}.jpg")
+        color = ((index * 37) % 256, (index * 91) % 256, (index * 53) % 256)
+        Image.new("RGB", (512, 512), color).save(path, "JPEG", quality=85)
+        frame_paths.append([path])
+    return frame_paths
+
+
+def run_case(frame_paths: list, concurrency: int, batch_size: int) -> dict:
+    """Décrit toutes les vidéos avec un réglage et mesure le débit"""
+    started_at = time.perf_counter()
+    descriptions = ai_description_service.describe_many(
+        frame_paths, concurrency=concurrency, batch_size=batch_size, use_cache=False
+    )
+    wall_seconds = time.perf_counter() - started_at
+    described = sum(1 for description in descriptions if description)
+    return {
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "videos": len(frame_paths),
+        "described": described,
+        "wall_seconds": round(wall_seconds, 2),
+        "videos_per_second": round(described / wall_seconds, 2) if wall_seconds > 0 else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI description throughput")
+    parser.add_argument("--videos", type=int, default=50, help="Videos to describe per case")
+    parser.add_argument("--concurrency", default="1,8", help="Requests in flight (comma separated)")
+    parser.add_argument("--batch-sizes", default="1,4", help="Videos per request (comma separated)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if not ai_description_service.is_available:
+        print("❌ Set OPENAI_BASE_URL (local stand-in) or OPENAI_API_KEY")
+        sys.exit(1)
+
+    report = {
+        "started_at": datetime.utcnow().isoformat(),
+        "base_url": settings.OPENAI_BASE_URL or "https://api.openai.com/v1",
+        "model": settings.AI_DESCRIPTION_MODEL,
+        "cases": []
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench_ai_") as work_dir:
+        frame_paths = generate_frames(work_dir, args.videos)
+
+        for concurrency in [int(value) for value in args.concurrency.split(",")]:
+            for batch_size in [int(value) for value in args.batch_sizes.split(",")]:
+                case = run_case(frame_paths, concurrency, batch_size)
+                report["cases"].append(case)
+                print(f"⚡ concurrency={concurrency:<3} batch={batch_size:<3} "
+                      f"{case['described']}/{case['videos']} videos in {case['wall_seconds']}s "
+                      f"({case['videos_per_second']} videos/s)")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark des embeddings d'images (OpenCLIP) sur CPU
+- Génère des frames synthétiques 384x384 (taille des frames d'analyse)
+- Mesure, par backend et par taille de batch: débit (frames/s) et latence par batch (p50/p95)
+- Vérifie que les embeddings sont en float32, de dimension 512 et normalisés L2
+- Écrit le résultat en JSON pour comparer deux commits ou deux machines
+
+Usage:
+    python scripts/benchmark_image_embeddings.py --backends torch,onnx --batch-sizes 1,8,32 --frames 256
+    EMBEDDING_QUANTIZE=true python scripts/benchmark_image_embeddings.py --output bench_embeddings_int8.json
+"""
+
+import sys
+import os
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+
+from core.config import settings
+from services.image_embedding_service import ImageEmbeddingService
+
+
+def generate_frames(count: int, size: int = 384) -> list:
+    """Génère des frames RGB aléatoires (reproductibles)"""
+    random_state = np.random.RandomState(42)
+    return [random_state.randint(0, 256, (size, size, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def run_case(service: ImageEmbeddingService, frames: list, batch_size: int) -> dict:
+    """Embarque toutes les frames batch par batch et mesure chaque batch"""
+    latencies = []
+    embeddings = []
+    started_at = time.perf_counter()
+    for start in range(0, len(frames), batch_size):
+        batch_started_at = time.perf_counter()
+        embeddings.append(service.embed(frames[start:start + batch_size], batch_size=batch_size))
+        latencies.append(time.perf_counter() - batch_started_at)
+    wall_seconds = time.perf_counter() - started_at
+
+    embeddings = np.concatenate(embeddings)
+    norms = np.linalg.norm(embeddings, axis=1)
+    return {
+        "backend": service.backend,
+        "quantized": settings.EMBEDDING_QUANTIZE,
+        "batch_size": batch_size,
+        "frames": len(frames),
+        "wall_seconds": round(wall_seconds, 3),
+        "frames_per_second": round(len(frames) / wall_seconds, 1) if wall_seconds > 0 else None,
+        "batch_latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "batch_latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+        "dtype": str(embeddings.dtype),
+        "dim": int(embeddings.shape[1]),
+        "max_norm_error": round(float(np.max(np.abs(norms - 1.0))), 6)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU image embedding throughput and latency")
+    parser.add_argument("--backends", default=settings.EMBEDDING_BACKEND, help="torch and/or onnx (comma separated)")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="Frames per forward pass (comma separated)")
+    parser.add_argument("--frames", type=int, default=256, help="Frames to embed per case")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    frames = generate_frames(args.frames)
+    report = {
+        "started_at": datetime.utcnow().isoformat(),
+        "model": settings.EMBEDDING_MODEL,
+        "pretrained": settings.EMBEDDING_PRETRAINED,
+        "threads": settings.EMBEDDING_THREADS or max(1, (os.cpu_count() or 1) // 2),
+        "cases": []
+    }
+
+    for backend in args.backends.split(","):
+        service = ImageEmbeddingService(backend=backend)
+
+        # Chargement et premier passage hors mesure
+        load_started_at = time.perf_counter()
+        service.embed(frames[:1])
+        print(f"🔧 {backend}: loaded and warmed up in {time.perf_counter() - load_started_at:.1f}s")
+
+        for batch_size in [int(value) for value in args.batch_sizes.split(",")]:
+            case = run_case(service, frames, batch_size)
+            report["cases"].append(case)
+            print(f"⚡ {backend:<5} batch={batch_size:<3} {case['frames_per_second']} frames/s "
+                  f"(p50 {case['batch_latency_p50_ms']}ms, p95 {case['batch_latency_p95_ms']}ms per batch, "
+                  f"{case['dtype']}x{case['dim']}, norm error {case['max_norm_error']})")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
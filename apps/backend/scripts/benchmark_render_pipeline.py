@@ -0,0 +1,310 @@
+"""
+Benchmark du pipeline de génération vidéo
+- Génère des sources synthétiques avec ffmpeg lavfi (testsrc2 + sine)
+- Exécute chaque étape de rendu dans un process forké, contre le stockage local (uploads/)
+- Mesure wall time, CPU time, pic de RSS (process + ffmpeg) et taille des sorties
+- Écrit le résultat en JSON pour comparer deux commits
+
+Usage:
+    python scripts/benchmark_render_pipeline.py --durations 5,20 --resolutions 1080x1920,1920x1080 \\
+        --engines legacy,filtergraph,smart_cut --output bench.json
+"""
+
+import sys
+import os
+
+# Le benchmark utilise le backend de stockage local: à fixer avant d'importer la config
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import multiprocessing
+from datetime import datetime
+from typing import List, Dict, Any, Callable
+
+from tasks.video_generation_v3 import (
+    _process_video_segment_v3,
+    _prepare_clip_source_v3,
+    _assemble_final_video_v3,
+    _apply_text_overlays_v3
+)
+from services.video_render_service import video_render_service
+from services.video_conversion_service import video_conversion_service
+
+BENCH_PREFIX = "benchmark"
+BENCH_TEXT_OVERLAYS = [
+    {"content": "Benchmark", "start_time": 0, "end_time": 3,
+     "position": {"x": 50, "y": 20, "anchor": "center"}, "style": {"font_size": 8, "color": "#FFFFFF"}},
+    {"content": "Hospup", "start_time": 2, "end_time": 6,
+     "position": {"x": 50, "y": 80, "anchor": "center"}, "style": {"font_size": 6, "outline": True}}
+]
+
+
+def generate_source(uploads_dir: str, width: int, height: int, duration: float, framerate: int = 30) -> str:
+    """Génère une source lavfi (mire + sinus) et retourne sa clé de stockage"""
+    key = f"{BENCH_PREFIX}/src_{width}x{height}_{duration:g}s_{framerate}fps.mp4"
+    path = os.path.join(uploads_dir, key)
+    if os.path.exists(path):
+        return key
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ffmpeg_cmd = [
+        "ffmpeg", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={framerate}",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+        "-t", str(duration),
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+        "-g", str(framerate), "-keyint_min", str(framerate), "-sc_threshold", "0",
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "128k", "-ac", "2",
+        "-movflags", "+faststart",
+        path
+    ]
+    subprocess.run(ffmpeg_cmd, capture_output=True, check=True)
+    return key
+
+
+def _stage_child(stage_fn: Callable[[], Dict[str, Any]], conn):
+    """Corps du process forké: exécute l'étape et renvoie ses mesures"""
+    started_at = time.perf_counter()
+    try:
+        result = stage_fn()
+        error = None
+    except Exception as e:
+        result = {}
+        error = str(e)
+    wall_time = time.perf_counter() - started_at
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    conn.send({
+        "wall_time_s": round(wall_time, 3),
+        "cpu_time_s": round(own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime, 3),
+        # ru_maxrss is in KB on Linux; for children it is the largest single ffmpeg
+        "peak_rss_mb": round(max(own.ru_maxrss, children.ru_maxrss) / 1024, 1),
+        "output_bytes": sum(os.path.getsize(path) for path in result.get("outputs", []) if os.path.exists(path)),
+        "result": result.get("data"),
+        "error": error
+    })
+    conn.close()
+
+
+def run_stage(name: str, stage_fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Exécute une étape dans un process forké pour isoler CPU et RSS
+
+    Args:
+        name: Nom de l'étape dans le rapport
+        stage_fn: Fonction retournant {"outputs": [paths], "data": json-serializable}
+
+    Returns:
+        Mesures de l'étape
+    """
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_stage_child, args=(stage_fn, child_conn))
+    process.start()
+    child_conn.close()
+    measures = parent_conn.recv() if parent_conn.poll(3600) else {"error": "stage timed out"}
+    process.join()
+
+    status = "❌" if measures.get("error") else "✅"
+    print(f"  {status} {name}: {measures.get('wall_time_s')}s wall, {measures.get('cpu_time_s')}s CPU, "
+          f"{measures.get('peak_rss_mb')} MB RSS, {measures.get('output_bytes', 0):,} bytes")
+    return {"stage": name, **measures}
+
+
+def bench_legacy(clips: List[Dict[str, Any]], work_dir: str, with_text: bool) -> List[Dict[str, Any]]:
+    """Moteur legacy: un encode par segment, concat ré-encodée, passe texte"""
+    stages = []
+    segments = []
+    for clip in clips:
+        def _segment(clip=clip):
+            segment = _process_video_segment_v3(
+                f"bench-{clip['order']}", clip["video_url"], clip["duration"], work_dir, clip["order"],
+                start=clip["start"]
+            )
+            if not segment:
+                raise Exception("segment failed")
+            return {"outputs": [segment["path"]], "data": segment}
+
+        measures = run_stage(f"segment_{clip['order']}", _segment)
+        stages.append(measures)
+        if measures.get("result"):
+            segments.append(measures["result"])
+
+    def _assemble():
+        final_path = _assemble_final_video_v3(segments, [], [], work_dir, "bench_legacy")
+        return {"outputs": [final_path], "data": final_path}
+
+    assemble = run_stage("assemble", _assemble)
+    stages.append(assemble)
+
+    if with_text and assemble.get("result"):
+        def _text():
+            output_path = _apply_text_overlays_v3(
+                assemble["result"], BENCH_TEXT_OVERLAYS, [], work_dir, "bench_legacy"
+            )
+            return {"outputs": [output_path], "data": output_path}
+
+        stages.append(run_stage("text_overlays", _text))
+
+    return stages
+
+
+def bench_filtergraph(clips: List[Dict[str, Any]], work_dir: str, with_text: bool) -> List[Dict[str, Any]]:
+    """Moteur single-pass: sondage des sources puis un seul encode filter_complex"""
+    def _prepare():
+        sources = [
+            _prepare_clip_source_v3(f"bench-{clip['order']}", clip["video_url"], clip["duration"], work_dir, clip["order"],
+                                    start=clip["start"])
+            for clip in clips
+        ]
+        if not all(sources):
+            raise Exception("source preparation failed")
+        return {"outputs": [], "data": sources}
+
+    prepare = run_stage("prepare_sources", _prepare)
+    stages = [prepare]
+    if not prepare.get("result"):
+        return stages
+
+    def _render():
+        output_path = os.path.join(work_dir, "final_filtergraph.mp4")
+        result = video_render_service.render_timeline(
+            prepare["result"], BENCH_TEXT_OVERLAYS if with_text else [], output_path,
+            encoder_threads=os.cpu_count() or 0
+        )
+        if not result["success"]:
+            raise Exception(result["error"][-500:])
+        return {"outputs": [output_path], "data": output_path}
+
+    stages.append(run_stage("render_filtergraph", _render))
+    return stages
+
+
+def bench_smart_cut(clips: List[Dict[str, Any]], work_dir: str, with_text: bool) -> List[Dict[str, Any]]:
+    """Smart-cut: copie des GOPs, ré-encode des bords (sources au format cible, sans texte)"""
+    def _prepare():
+        # generate_source encode avec les réglages de la mezzanine d'ingest
+        sources = [
+            _prepare_clip_source_v3(f"bench-{clip['order']}", clip["video_url"], clip["duration"], work_dir, clip["order"],
+                                    start=clip["start"], encoder_profile=video_conversion_service.get_mezzanine_profile())
+            for clip in clips
+        ]
+        if not all(sources):
+            raise Exception("source preparation failed")
+        if not video_render_service.can_smart_cut(sources):
+            raise Exception("sources are not in the render profile")
+        return {"outputs": [], "data": sources}
+
+    prepare = run_stage("prepare_sources", _prepare)
+    stages = [prepare]
+    if not prepare.get("result"):
+        return stages
+
+    def _render():
+        output_path = os.path.join(work_dir, "final_smart_cut.mp4")
+        smart_cut_dir = os.path.join(work_dir, "smart_cut")
+        os.makedirs(smart_cut_dir, exist_ok=True)
+        result = video_render_service.render_smart_cut(prepare["result"], output_path, smart_cut_dir)
+        if not result["success"]:
+            raise Exception(result["error"][-500:])
+        return {"outputs": [output_path], "data": result}
+
+    stages.append(run_stage("render_smart_cut", _render))
+    return stages
+
+
+ENGINES = {
+    "legacy": bench_legacy,
+    "filtergraph": bench_filtergraph,
+    "smart_cut": bench_smart_cut
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the video generation pipeline")
+    parser.add_argument("--durations", default="5,20", help="Source durations in seconds (comma separated)")
+    parser.add_argument("--resolutions", default="1080x1920,1920x1080", help="Source resolutions WxH (comma separated)")
+    parser.add_argument("--clips", type=int, default=3, help="Clips per timeline")
+    parser.add_argument("--clip-duration", type=float, default=3.0, help="Slot duration of each clip")
+    parser.add_argument("--clip-start", type=float, default=1.5, help="In-point of each clip in its source")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Engines to run (comma separated)")
+    parser.add_argument("--no-text", action="store_true", help="Render without text overlays")
+    parser.add_argument("--work-dir", default=None, help="Keep sources and outputs here (default: temp dir)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    work_root = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix="hospup_bench_")
+    uploads_dir = os.path.join(work_root, "uploads")
+    os.makedirs(uploads_dir, exist_ok=True)
+
+    # Le stockage local lit les sources depuis ./uploads
+    os.chdir(work_root)
+
+    report = {
+        "started_at": datetime.utcnow().isoformat(),
+        "commit": subprocess.run(
+            ["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True
+        ).stdout.strip() or None,
+        "host": {"platform": platform.platform(), "cpu_count": os.cpu_count(), "python": platform.python_version()},
+        "params": vars(args),
+        "runs": []
+    }
+
+    try:
+        for resolution in args.resolutions.split(","):
+            width, height = (int(value) for value in resolution.lower().split("x"))
+            for duration in (float(value) for value in args.durations.split(",")):
+                print(f"\n🎬 Sources {width}x{height}, {duration:g}s")
+                key = generate_source(uploads_dir, width, height, duration)
+
+                clip_start = min(args.clip_start, max(0.0, duration - args.clip_duration))
+                clips = [
+                    {"order": i, "video_url": f"s3://hospup-files/{key}", "duration": args.clip_duration, "start": clip_start}
+                    for i in range(args.clips)
+                ]
+
+                for engine in args.engines.split(","):
+                    print(f"⚙️ Engine: {engine}")
+                    run_dir = tempfile.mkdtemp(prefix=f"{engine}_", dir=work_root)
+                    stages = ENGINES[engine](clips, run_dir, not args.no_text)
+                    report["runs"].append({
+                        "engine": engine,
+                        "resolution": f"{width}x{height}",
+                        "source_duration": duration,
+                        "stages": [{k: v for k, v in stage.items() if k != "result"} for stage in stages],
+                        "total_wall_time_s": round(sum(stage.get("wall_time_s") or 0 for stage in stages), 3),
+                        "total_cpu_time_s": round(sum(stage.get("cpu_time_s") or 0 for stage in stages), 3),
+                        "failed": any(stage.get("error") for stage in stages)
+                    })
+                    shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    report["finished_at"] = datetime.utcnow().isoformat()
+    report_json = json.dumps(report, indent=2, default=str)
+
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(report_json)
+        print(f"\n📊 Report written to {output_path}")
+    else:
+        print(report_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,11 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import json
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.celery_queues import WORKER_PROFILES, worker_command_args
+from core.config import settings
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,26 +33,16 @@ logger = logging.getLogger(__name__)
 
 class CelerySupervisor:
     def __init__(self):
-        self.worker_process = None
+        self.worker_processes = {}  # Un worker par queue (profils dans core/celery_queues.py)
         self.beat_process = None
+        self.inference_process = None  # Sidecar des modèles (si INFERENCE_SERVER_URL est configuré)
         self.restart_count = 0
         self.last_restart = None
-        self.max_restarts_per_hour = 10
+        self.max_restarts_per_hour = 10 * len(WORKER_PROFILES)
         
-        # Configuration optimisée pour éviter SIGSEGV
+        # Pool, concurrence, limites mémoire et timeouts : par queue (WORKER_PROFILES)
         self.worker_config = {
-            # Threading et processus
-            'concurrency': 1,
-            'pool': 'solo',  # Solo pool évite les forks problématiques
             'loglevel': 'info',
-            
-            # Limites de sécurité
-            'max_tasks_per_child': 10,  # Redémarrer fréquemment
-            'max_memory_per_child': 256000,  # 256MB limite mémoire
-            
-            # Timeouts
-            'task_time_limit': 900,  # 15 minutes max par tâche
-            'task_soft_time_limit': 780,  # 13 minutes soft
         }
         
         # Variables d'environnement pour stabilité
@@ -97,24 +92,17 @@ class CelerySupervisor:
                 
         return True
         
-    def get_worker_cmd(self):
-        """Commande worker optimisée contre SIGSEGV"""
+    def get_worker_cmd(self, profile_name):
+        """Commande worker d'une queue, avec son pool et ses limites"""
         base_cmd = [
             sys.executable, '-m', 'celery',
             '-A', 'core.celery_app',
             'worker',
             f"--loglevel={self.worker_config['loglevel']}",
-            f"--concurrency={self.worker_config['concurrency']}",
-            f"--pool={self.worker_config['pool']}",
-            f"--max-tasks-per-child={self.worker_config['max_tasks_per_child']}",
-            f"--max-memory-per-child={self.worker_config['max_memory_per_child']}",
-            f"--time-limit={self.worker_config['task_time_limit']}",
-            f"--soft-time-limit={self.worker_config['task_soft_time_limit']}",
             '--without-gossip',
             '--without-mingle', 
             '--without-heartbeat',
-            '--hostname=worker-stable@%h'
-        ]
+        ] + worker_command_args(profile_name)
         return base_cmd
         
     def get_beat_cmd(self):
@@ -127,8 +115,39 @@ class CelerySupervisor:
             '--pidfile=/tmp/celerybeat.pid'
         ]
     
-    def start_worker(self):
-        """Démarre le worker Celery avec config optimisée"""
+    def get_inference_cmd(self):
+        """Commande du sidecar d'inférence (adresse lue dans INFERENCE_SERVER_URL)"""
+        return [sys.executable, 'scripts/inference_server.py']
+    
+    def start_inference(self):
+        """Démarre le sidecar d'inférence: les modèles sont chargés une fois pour tous les workers"""
+        try:
+            env = os.environ.copy()
+            env.update(self.env_vars)
+            # Le sidecar répartit lui-même ses threads (CAPTION_THREADS, EMBEDDING_THREADS)
+            for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+                env.pop(name, None)
+            
+            cmd = self.get_inference_cmd()
+            logger.info(f"🧠 Démarrage sidecar d'inférence: {' '.join(cmd)}")
+            
+            self.inference_process = subprocess.Popen(
+                cmd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True
+            )
+            
+            logger.info(f"✅ Sidecar d'inférence démarré (PID: {self.inference_process.pid})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur démarrage sidecar d'inférence: {e}")
+            return False
+    
+    def start_worker(self, profile_name):
+        """Démarre le worker Celery d'une queue"""
         if not self.check_restart_limits():
             logger.error("❌ Limite de redémarrages atteinte, arrêt du superviseur")
             return False
@@ -138,10 +157,10 @@ class CelerySupervisor:
             env = os.environ.copy()
             env.update(self.env_vars)
             
-            cmd = self.get_worker_cmd()
-            logger.info(f"🚀 Démarrage worker: {' '.join(cmd)}")
+            cmd = self.get_worker_cmd(profile_name)
+            logger.info(f"🚀 Démarrage worker {profile_name}: {' '.join(cmd)}")
             
-            self.worker_process = subprocess.Popen(
+            self.worker_processes[profile_name] = subprocess.Popen(
                 cmd,
                 env=env,
                 stdout=subprocess.PIPE,
@@ -153,11 +172,11 @@ class CelerySupervisor:
             self.restart_count += 1
             self.last_restart = datetime.now()
             
-            logger.info(f"✅ Worker démarré (PID: {self.worker_process.pid}, restart #{self.restart_count})")
+            logger.info(f"✅ Worker {profile_name} démarré (PID: {self.worker_processes[profile_name].pid}, restart #{self.restart_count})")
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erreur démarrage worker: {e}")
+            logger.error(f"❌ Erreur démarrage worker {profile_name}: {e}")
             return False
             
     def start_beat(self):
@@ -256,22 +275,31 @@ class CelerySupervisor:
             
     def stop_all_processes(self):
         """Arrête tous les processus"""
-        if self.worker_process:
-            self.stop_process(self.worker_process, "Worker")
-            self.worker_process = None
+        for profile_name, worker_process in self.worker_processes.items():
+            self.stop_process(worker_process, f"Worker {profile_name}")
+        self.worker_processes = {}
             
         if self.beat_process:
             self.stop_process(self.beat_process, "Beat")
             self.beat_process = None
+        
+        if self.inference_process:
+            self.stop_process(self.inference_process, "Sidecar d'inférence")
+            self.inference_process = None
     
     def monitor_loop(self):
         """Boucle principale de surveillance"""
         logger.info("🎯 Démarrage superviseur Celery anti-crash")
         
-        # Démarrage initial
-        if not self.start_worker():
-            logger.error("❌ Impossible de démarrer le worker initial")
-            return
+        # Démarrage initial (le sidecar d'abord: les workers ai l'appellent dès leur première tâche)
+        if settings.INFERENCE_SERVER_URL and not self.start_inference():
+            logger.warning("⚠️ Impossible de démarrer le sidecar d'inférence, les workers chargeront les modèles")
+        
+        for profile_name in WORKER_PROFILES:
+            if not self.start_worker(profile_name):
+                logger.error(f"❌ Impossible de démarrer le worker initial {profile_name}")
+                self.stop_all_processes()
+                return
             
         if not self.start_beat():
             logger.warning("⚠️ Impossible de démarrer beat, continuons avec worker seul")
@@ -279,24 +307,33 @@ class CelerySupervisor:
         # Boucle de surveillance
         while True:
             try:
-                # Vérifier worker
-                if not self.is_process_healthy(self.worker_process):
-                    logger.warning("💥 Worker mort ou zombie détecté")
+                # Vérifier chaque worker (un crash ne touche que sa queue)
+                worker_failed = False
+                for profile_name in WORKER_PROFILES:
+                    worker_process = self.worker_processes.get(profile_name)
+                    if self.is_process_healthy(worker_process):
+                        continue
                     
-                    if self.worker_process:
-                        exit_code = self.worker_process.poll()
+                    logger.warning(f"💥 Worker {profile_name} mort ou zombie détecté")
+                    
+                    if worker_process:
+                        exit_code = worker_process.poll()
                         if exit_code == -11:  # SIGSEGV
                             logger.error("🧨 Crash SIGSEGV détecté, redémarrage avec config renforcée")
                         else:
                             logger.error(f"💀 Worker mort avec code: {exit_code}")
                     
-                    self.stop_process(self.worker_process, "Worker")
-                    self.worker_process = None
+                    self.stop_process(worker_process, f"Worker {profile_name}")
+                    self.worker_processes.pop(profile_name, None)
                     
-                    if not self.start_worker():
-                        logger.error("❌ Impossible de redémarrer worker, arrêt superviseur")
+                    if not self.start_worker(profile_name):
+                        logger.error(f"❌ Impossible de redémarrer worker {profile_name}, arrêt superviseur")
+                        worker_failed = True
                         break
                 
+                if worker_failed:
+                    break
+                
                 # Vérifier beat 
                 if self.beat_process and not self.is_process_healthy(self.beat_process):
                     logger.warning("💥 Beat mort détecté, redémarrage...")
@@ -304,10 +341,20 @@ class CelerySupervisor:
                     self.beat_process = None
                     self.start_beat()
                 
+                # Vérifier le sidecar d'inférence
+                if self.inference_process and not self.is_process_healthy(self.inference_process):
+                    logger.warning("💥 Sidecar d'inférence mort détecté, redémarrage...")
+                    self.stop_process(self.inference_process, "Sidecar d'inférence")
+                    self.inference_process = None
+                    self.start_inference()
+                
                 # Stats périodiques (toutes les 2 minutes)
                 if int(time.time()) % 120 == 0:
-                    worker_stats = self.get_process_stats(self.worker_process)
-                    logger.info(f"📊 Worker stats: {worker_stats}")
+                    for profile_name, worker_process in self.worker_processes.items():
+                        worker_stats = self.get_process_stats(worker_process)
+                        logger.info(f"📊 Worker {profile_name} stats: {worker_stats}")
+                    if self.inference_process:
+                        logger.info(f"📊 Sidecar d'inférence stats: {self.get_process_stats(self.inference_process)}")
                 
                 time.sleep(5)  # Vérification toutes les 5 secondes
                 
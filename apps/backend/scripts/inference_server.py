@@ -0,0 +1,137 @@
+"""
+Serveur d'inférence local (sidecar) partagé par tous les workers Celery d'une machine
+- Charge BLIP (légendes) et OpenCLIP (embeddings) une seule fois, au démarrage
+- Regroupe dynamiquement les requêtes concurrentes (taille de batch et budget de latence)
+- Écoute sur un socket Unix ou en HTTP local (INFERENCE_SERVER_URL)
+
+Protocole: corps = frames RGB uint8 concaténées, en-tête X-Frame-Shape: "N,H,W"
+    POST /caption -> {"captions": [...]}
+    POST /embed   -> float32 (N, dim) brut, en-tête X-Embedding-Dim
+    GET  /health  -> état des modèles
+
+Usage:
+    python scripts/inference_server.py --uds /tmp/hospup-inference.sock
+    python scripts/inference_server.py --host 127.0.0.1 --port 8091
+"""
+
+import sys
+import os
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import settings
+from services.caption_engine import caption_engine
+from services.dynamic_batcher import DynamicBatcher
+from services.image_embedding_service import image_embedding_service
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Hospup inference sidecar")
+
+# Les légendes sont déjà regroupées par le caption engine; les embeddings passent par ce batcher
+embedding_batcher = DynamicBatcher(
+    lambda frames: list(image_embedding_service.embed(frames)),
+    max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+    name="embedding"
+)
+
+stats = {"started_at": time.time(), "caption_frames": 0, "embed_frames": 0, "load_seconds": {}}
+
+
+async def _read_frames(request: Request) -> list:
+    """Décode le corps de la requête en frames (N, H, W, 3)"""
+    try:
+        count, height, width = (int(value) for value in request.headers["X-Frame-Shape"].split(","))
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="X-Frame-Shape header must be 'N,H,W'")
+
+    body = await request.body()
+    if len(body) != count * height * width * 3:
+        raise HTTPException(status_code=400, detail=f"Expected {count * height * width * 3} bytes, got {len(body)}")
+
+    return list(np.frombuffer(body, dtype=np.uint8).reshape(count, height, width, 3))
+
+
+@app.post("/caption")
+async def caption(request: Request):
+    frames = await _read_frames(request)
+    captions = await run_in_threadpool(caption_engine.caption, frames)
+    stats["caption_frames"] += len(frames)
+    return {"captions": captions}
+
+
+@app.post("/embed")
+async def embed(request: Request):
+    frames = await _read_frames(request)
+    try:
+        embeddings = await run_in_threadpool(embedding_batcher.map, frames)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Embedding failed: {e}")
+    stats["embed_frames"] += len(frames)
+
+    embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(frames), -1)
+    return Response(
+        content=embeddings.tobytes(),
+        media_type="application/octet-stream",
+        headers={"X-Embedding-Dim": str(embeddings.shape[1])}
+    )
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "uptime_seconds": round(time.time() - stats["started_at"]),
+        "caption_frames": stats["caption_frames"],
+        "embed_frames": stats["embed_frames"],
+        "load_seconds": stats["load_seconds"]
+    }
+
+
+def load_models():
+    """Charge les modèles une fois, avant d'accepter des requêtes"""
+    for name, model in (("caption", caption_engine), ("embedding", image_embedding_service)):
+        started_at = time.perf_counter()
+        try:
+            model.load()
+            stats["load_seconds"][name] = round(time.perf_counter() - started_at, 1)
+            logger.info(f"✅ {name} model loaded in {stats['load_seconds'][name]}s")
+        except Exception as e:
+            logger.error(f"❌ Failed to load {name} model: {e}")
+
+
+def main():
+    default_uds = settings.INFERENCE_SERVER_URL[len("unix://"):] if settings.INFERENCE_SERVER_URL.startswith("unix://") else None
+
+    parser = argparse.ArgumentParser(description="Local inference sidecar (captions and embeddings)")
+    parser.add_argument("--uds", default=default_uds, help="Unix socket path (takes precedence over host/port)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    load_models()
+
+    if args.uds:
+        if os.path.exists(args.uds):
+            os.remove(args.uds)  # Socket laissé par un arrêt brutal
+        logger.info(f"🧠 Inference sidecar listening on unix://{args.uds}")
+        uvicorn.run(app, uds=args.uds, log_level="warning")
+    else:
+        logger.info(f"🧠 Inference sidecar listening on http://{args.host}:{args.port}")
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
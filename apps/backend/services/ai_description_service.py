@@ -0,0 +1,260 @@
+"""
+AI description of uploaded videos through the vision chat API
+Concurrent async requests over one pooled HTTP client, several videos per request
+when batching is enabled, and retries with jittered exponential backoff
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+from typing import List, Dict, Any, Optional
+
+from core.config import settings
+from services.inference_cache import inference_cache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    from openai import (
+        AsyncOpenAI,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+        RateLimitError
+    )
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+class AIDescriptionService:
+    """Describe videos from their analysis frames with bounded concurrency and batching"""
+
+    PROMPT = (
+        "Analyze this video content and provide a detailed description for social media. "
+        "Focus on: 1) Main subject/activity 2) Setting/location 3) Visual style "
+        "4) Key elements that would make it engaging. Be concise but descriptive (max 150 words)."
+    )
+    BATCH_PROMPT = (
+        "You will receive {count} different videos, each introduced by 'Video N:' and followed by its frames. "
+        "For each video, provide a detailed description for social media. Focus on: 1) Main subject/activity "
+        "2) Setting/location 3) Visual style 4) Key elements that would make it engaging. "
+        "Be concise but descriptive (max 150 words each). Reply with a JSON object "
+        '{{"descriptions": [...]}} holding exactly {count} strings, in video order.'
+    )
+    MAX_TOKENS_PER_VIDEO = 200
+    RETRY_BASE_DELAY = 1.0   # seconds
+    RETRY_MAX_DELAY = 30.0   # seconds
+
+    @property
+    def is_available(self) -> bool:
+        """A key (OpenAI) or a base URL (compatible server, local stand-in) is configured"""
+        return OPENAI_AVAILABLE and bool(settings.OPENAI_API_KEY or settings.OPENAI_BASE_URL)
+
+    @property
+    def model_version(self) -> str:
+        """Identifies the descriptions this configuration produces (inference cache key)"""
+        prompt_digest = hashlib.sha256(self.PROMPT.encode("utf-8")).hexdigest()[:12]
+        return f"{settings.AI_DESCRIPTION_MODEL}|{settings.OPENAI_BASE_URL}|{prompt_digest}"
+
+    def describe(self, frame_paths: List[str]) -> Optional[str]:
+        """
+        Describe one video from its frames
+
+        Args:
+            frame_paths: JPEG frames of the video
+
+        Returns:
+            Description, or None if the AI call failed (callers fall back to a heuristic)
+        """
+        return self.describe_many([frame_paths])[0]
+
+    def describe_many(
+        self,
+        videos_frame_paths: List[List[str]],
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[Optional[str]]:
+        """
+        Describe many videos concurrently (blocking wrapper for sync callers and Celery tasks)
+
+        Args:
+            videos_frame_paths: Frames of each video
+            concurrency: Requests in flight (default AI_DESCRIPTION_CONCURRENCY)
+            batch_size: Videos per request (default AI_DESCRIPTION_BATCH_SIZE, 1 = no batching)
+            use_cache: Reuse descriptions of videos whose frames were described before
+
+        Returns:
+            One description (or None on failure) per video, in input order
+        """
+        if not videos_frame_paths:
+            return []
+
+        def describe(missing: List[List[str]]) -> List[Optional[str]]:
+            return self._describe_uncached(missing, concurrency, batch_size)
+
+        if not use_cache:
+            return describe(videos_frame_paths)
+
+        return inference_cache.get_or_compute(
+            "vision",
+            self.model_version,
+            videos_frame_paths,
+            describe,
+            key=inference_cache.files_hash
+        )
+
+    def _describe_uncached(
+        self,
+        videos_frame_paths: List[List[str]],
+        concurrency: Optional[int],
+        batch_size: Optional[int]
+    ) -> List[Optional[str]]:
+        if not self.is_available:
+            logger.warning("⚠️ AI description unavailable (OpenAI not configured)")
+            return [None] * len(videos_frame_paths)
+
+        return asyncio.run(self.describe_many_async(videos_frame_paths, concurrency, batch_size))
+
+    async def describe_many_async(
+        self,
+        videos_frame_paths: List[List[str]],
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """Async version of describe_many"""
+        concurrency = concurrency or settings.AI_DESCRIPTION_CONCURRENCY
+        batch_size = max(1, batch_size or settings.AI_DESCRIPTION_BATCH_SIZE)
+
+        # One pooled HTTP client for every request of the run
+        async with httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=settings.AI_DESCRIPTION_TIMEOUT
+        ) as http_client:
+            client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY or "local",
+                base_url=settings.OPENAI_BASE_URL or None,
+                max_retries=0,  # Retried here, with jitter
+                http_client=http_client
+            )
+            semaphore = asyncio.Semaphore(concurrency)
+
+            images = [self._load_images(frame_paths) for frame_paths in videos_frame_paths]
+            indexes = [index for index, video_images in enumerate(images) if video_images]
+            batches = [indexes[start:start + batch_size] for start in range(0, len(indexes), batch_size)]
+
+            results: List[Optional[str]] = [None] * len(videos_frame_paths)
+
+            async def _run_batch(batch: List[int]):
+                descriptions = await self._describe_batch(client, semaphore, [images[index] for index in batch])
+                for index, description in zip(batch, descriptions):
+                    results[index] = description
+
+            await asyncio.gather(*(_run_batch(batch) for batch in batches))
+
+        described = sum(1 for description in results if description)
+        logger.info(f"✅ AI descriptions: {described}/{len(results)} videos ({len(batches)} requests)")
+        return results
+
+    async def _describe_batch(
+        self,
+        client: "AsyncOpenAI",
+        semaphore: asyncio.Semaphore,
+        batch_images: List[List[Dict[str, Any]]]
+    ) -> List[Optional[str]]:
+        """Describe a batch in one request; an unusable batched reply is retried video by video"""
+        if len(batch_images) == 1:
+            content = [{"type": "text", "text": self.PROMPT}] + batch_images[0]
+            reply = await self._complete(client, semaphore, content, json_reply=False)
+            return [reply.strip() if reply else None]
+
+        content = [{"type": "text", "text": self.BATCH_PROMPT.format(count=len(batch_images))}]
+        for number, video_images in enumerate(batch_images, start=1):
+            content.append({"type": "text", "text": f"Video {number}:"})
+            content.extend(video_images)
+
+        reply = await self._complete(client, semaphore, content, json_reply=True, videos=len(batch_images))
+        try:
+            descriptions = json.loads(reply)["descriptions"] if reply else None
+        except (ValueError, KeyError, TypeError):
+            descriptions = None
+
+        if isinstance(descriptions, list) and len(descriptions) == len(batch_images):
+            return [str(description).strip() or None for description in descriptions]
+
+        logger.warning(f"⚠️ Batched description unusable, retrying {len(batch_images)} videos one by one")
+        singles = await asyncio.gather(*(
+            self._describe_batch(client, semaphore, [video_images]) for video_images in batch_images
+        ))
+        return [single[0] for single in singles]
+
+    async def _complete(
+        self,
+        client: "AsyncOpenAI",
+        semaphore: asyncio.Semaphore,
+        content: List[Dict[str, Any]],
+        json_reply: bool,
+        videos: int = 1
+    ) -> Optional[str]:
+        """One chat completion, retried on rate limits, timeouts and server errors"""
+        request = {
+            "model": settings.AI_DESCRIPTION_MODEL,
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": self.MAX_TOKENS_PER_VIDEO * videos
+        }
+        if json_reply:
+            request["response_format"] = {"type": "json_object"}
+
+        for attempt in range(settings.AI_DESCRIPTION_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await client.chat.completions.create(**request)
+                return response.choices[0].message.content
+
+            except (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError) as e:
+                if attempt >= settings.AI_DESCRIPTION_MAX_RETRIES:
+                    logger.error(f"❌ AI description failed after {attempt + 1} attempts: {e}")
+                    return None
+                delay = self._retry_delay(attempt, e)
+                logger.warning(f"⚠️ AI description retry in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+            except Exception as e:
+                logger.error(f"❌ AI description failed: {e}")
+                return None
+
+        return None
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than a server Retry-After"""
+        delay = random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** (attempt + 1)))
+
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, min(self.RETRY_MAX_DELAY, float(retry_after))) if retry_after else delay
+        except ValueError:
+            return delay
+
+    def _load_images(self, frame_paths: List[str]) -> List[Dict[str, Any]]:
+        """Frames as data URL image parts (analysis frames are already small JPEGs)"""
+        images = []
+        for frame_path in frame_paths:
+            try:
+                with open(frame_path, "rb") as frame_file:
+                    encoded = base64.b64encode(frame_file.read()).decode("ascii")
+            except OSError as e:
+                logger.warning(f"⚠️ Cannot read analysis frame {frame_path}: {e}")
+                continue
+            images.append({
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{encoded}"}
+            })
+        return images
+
+# Create singleton instance
+ai_description_service = AIDescriptionService()
@@ -0,0 +1,116 @@
+"""
+Batched BLIP captioning engine
+- Frames from every caller (scenes of one video, videos analyzed concurrently) are
+  gathered into padded batches by one dispatcher thread
+- Inference mode, optional int8 dynamic quantization on CPU, capped torch threads
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+from core.config import settings
+from services.dynamic_batcher import DynamicBatcher
+
+logger = logging.getLogger(__name__)
+
+class CaptionEngine:
+    """Caption frames with BLIP, batching requests across callers"""
+
+    MODEL_NAME = "Salesforce/blip-image-captioning-base"
+    FALLBACK_CAPTION = "Scene description unavailable"
+
+    def __init__(self):
+        self._processor = None
+        self._model = None
+        self._device = None
+        self._load_lock = threading.Lock()
+        self._batcher = DynamicBatcher(
+            self._run_batch_or_fallback,
+            max_batch_size=settings.CAPTION_BATCH_SIZE,
+            max_wait_ms=settings.CAPTION_MAX_WAIT_MS,
+            name="caption"
+        )
+
+    def caption(self, frames: List[np.ndarray]) -> List[str]:
+        """
+        Caption frames (blocking); batched with frames submitted by other threads
+
+        Args:
+            frames: HxWx3 uint8 RGB frames
+
+        Returns:
+            One caption per frame (FALLBACK_CAPTION when inference failed)
+        """
+        return self._batcher.map(frames)
+
+    @property
+    def model_version(self) -> str:
+        """Identifies the captions this configuration produces (inference cache key)"""
+        precision = "int8" if settings.CAPTION_QUANTIZE else "fp32"
+        return f"{self.MODEL_NAME}|{precision}|max_length={settings.CAPTION_MAX_LENGTH}"
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue one frame for captioning and return a future of its caption"""
+        return self._batcher.submit(frame)
+
+    def load(self):
+        """Load the model now instead of on the first batch (long-lived servers)"""
+        with self._load_lock:
+            self._load()
+
+    def _run_batch_or_fallback(self, frames: List[np.ndarray]) -> List[str]:
+        try:
+            return self._run_batch(frames)
+        except Exception as e:
+            logger.error(f"❌ Caption batch of {len(frames)} frames failed: {e}")
+            return [self.FALLBACK_CAPTION] * len(frames)
+
+    def _load(self):
+        """Lazy load BLIP (quantized to int8 on CPU when CAPTION_QUANTIZE is set)"""
+        if self._model is not None:
+            return
+
+        import torch
+        from transformers import BlipProcessor, BlipForConditionalGeneration
+
+        # Share the worker's core budget instead of one torch thread per core
+        threads = settings.CAPTION_THREADS or max(1, (os.cpu_count() or 1) // 2)
+        torch.set_num_threads(threads)
+
+        self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f"Loading BLIP model for image captioning on {self._device} ({threads} threads)...")
+        processor = BlipProcessor.from_pretrained(self.MODEL_NAME)
+        model = BlipForConditionalGeneration.from_pretrained(self.MODEL_NAME).eval()
+
+        if self._device == "cpu" and settings.CAPTION_QUANTIZE:
+            # int8 weights for the Linear layers (most of BLIP's compute), activations stay float
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("✅ BLIP quantized to int8 (dynamic)")
+
+        self._processor = processor
+        self._model = model.to(self._device)
+
+    def _run_batch(self, frames: List[np.ndarray]) -> List[str]:
+        """One padded forward/generate pass over a batch of frames"""
+        import torch
+        from PIL import Image
+
+        self._load()
+
+        images = [Image.fromarray(frame) for frame in frames]
+        inputs = self._processor(images=images, return_tensors="pt", padding=True).to(self._device)
+
+        with torch.inference_mode():
+            output = self._model.generate(**inputs, max_length=settings.CAPTION_MAX_LENGTH)
+
+        captions = self._processor.batch_decode(output, skip_special_tokens=True)
+        logger.info(f"🧠 Captioned {len(frames)} frames in one batch")
+        return [caption.strip() or self.FALLBACK_CAPTION for caption in captions]
+
+# Create singleton instance
+caption_engine = CaptionEngine()
@@ -0,0 +1,81 @@
+"""
+Dynamic batching: items submitted by any thread are run together by one dispatcher
+thread, up to a batch size and a latency budget (how long the first item may wait
+for others)
+"""
+
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class DynamicBatcher:
+    """Gather concurrent submissions into batches for a batch function"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: int,
+        name: str = "batcher"
+    ):
+        """
+        Args:
+            run_batch: Called with a list of items, returns one result per item
+            max_batch_size: Items per call
+            max_wait_ms: How long a partial batch waits for more items, counted from its first item
+            name: Dispatcher thread name (logs)
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self.name = name
+        self._requests: "queue.Queue[tuple]" = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item and return a future of its result"""
+        self._ensure_dispatcher()
+        future: Future = Future()
+        self._requests.put((item, future))
+        return future
+
+    def map(self, items: List[Any]) -> List[Any]:
+        """Run items (blocking), batched with items submitted by other threads"""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _ensure_dispatcher(self):
+        with self._lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name=f"{self.name}-dispatcher", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._requests.get()]
+            # One budget for the whole batch: trickling items never extend the first one's wait
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._requests.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.run_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.error(f"❌ {self.name} batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
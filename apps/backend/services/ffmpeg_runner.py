@@ -0,0 +1,199 @@
+"""
+FFmpeg runner with live progress
+Parses ffmpeg's -progress key=value stream while the process runs and turns
+out_time into percent complete and an ETA
+"""
+
+import time
+import threading
+import subprocess
+import logging
+from collections import deque
+from typing import List, Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+class FFmpegRunner:
+    """Run ffmpeg commands like subprocess.run, publishing throttled progress updates"""
+
+    STDERR_TAIL_LINES = 200  # Enough of the log to explain a failure
+
+    def run(
+        self,
+        ffmpeg_cmd: List[str],
+        duration: float,
+        progress_callback: Optional[ProgressCallback] = None,
+        timeout: int = 600,
+        min_interval: float = 1.0
+    ) -> subprocess.CompletedProcess:
+        """
+        Run an ffmpeg command and report its progress
+
+        Args:
+            ffmpeg_cmd: Command starting with "ffmpeg" (progress flags are added here)
+            duration: Expected output duration in seconds (used for percent/ETA)
+            progress_callback: Called with {"percent", "out_time", "speed", "eta_seconds"}
+            timeout: Kill ffmpeg after this many seconds
+            min_interval: Minimum seconds between two callbacks (the final one always fires)
+
+        Returns:
+            CompletedProcess with returncode and the tail of stderr
+
+        Raises:
+            subprocess.TimeoutExpired: If ffmpeg did not finish in time
+        """
+        cmd = [ffmpeg_cmd[0], "-progress", "pipe:1", "-nostats"] + ffmpeg_cmd[1:]
+
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1
+        )
+
+        # Drain stderr on a thread so a chatty ffmpeg never blocks on a full pipe
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_tail.extend(process.stderr), daemon=True
+        )
+        stderr_thread.start()
+
+        timed_out = threading.Event()
+
+        def _kill():
+            timed_out.set()
+            process.kill()
+
+        watchdog = threading.Timer(timeout, _kill)
+        watchdog.start()
+
+        started_at = time.monotonic()
+        last_report = 0.0
+        block: Dict[str, str] = {}
+
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                if not key:
+                    continue
+                block[key] = value
+
+                # Every progress block ends with progress=continue|end
+                if key != "progress":
+                    continue
+
+                finished = value == "end"
+                now = time.monotonic()
+                if progress_callback and (finished or now - last_report >= min_interval):
+                    last_report = now
+                    self._report(progress_callback, block, duration, now - started_at, finished)
+                block = {}
+
+            process.wait()
+        finally:
+            watchdog.cancel()
+            stderr_thread.join(timeout=5)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, stderr="".join(stderr_tail))
+
+        return subprocess.CompletedProcess(cmd, process.returncode, "", "".join(stderr_tail))
+
+    def _report(
+        self,
+        progress_callback: ProgressCallback,
+        block: Dict[str, str],
+        duration: float,
+        elapsed: float,
+        finished: bool
+    ):
+        out_time = self._parse_out_time(block)
+        percent = 100.0 if finished else (min(99.9, out_time / duration * 100) if duration > 0 else 0.0)
+
+        eta_seconds = None
+        if finished:
+            eta_seconds = 0.0
+        elif percent > 0:
+            eta_seconds = round(elapsed * (100 - percent) / percent, 1)
+
+        try:
+            progress_callback({
+                "percent": round(percent, 1),
+                "out_time": round(out_time, 3),
+                "speed": block.get("speed", "").rstrip("x") or None,
+                "eta_seconds": eta_seconds
+            })
+        except Exception as e:
+            # Progress is best effort and must never fail the encode
+            logger.warning(f"⚠️ Progress callback failed: {e}")
+
+    def _parse_out_time(self, block: Dict[str, str]) -> float:
+        # out_time_ms is in microseconds too (historical ffmpeg naming)
+        for key in ("out_time_us", "out_time_ms"):
+            try:
+                return max(0.0, int(block[key]) / 1_000_000)
+            except (KeyError, ValueError):
+                continue
+        return 0.0
+
+
+def celery_progress_callback(
+    stage: str,
+    start_percent: float,
+    end_percent: float,
+    **extra_meta
+) -> Optional[ProgressCallback]:
+    """
+    Build a callback publishing progress of one stage to the current Celery task
+
+    The task and its id are captured here, so the callback also works from pool threads.
+
+    Args:
+        stage: Stage name reported in the task meta
+        start_percent: Overall progress when the stage starts
+        end_percent: Overall progress when the stage ends
+        **extra_meta: Extra keys for the task meta (e.g. video_id)
+
+    Returns:
+        Progress callback, or None outside a Celery task
+    """
+    from celery import current_task
+
+    task = current_task._get_current_object() if current_task else None
+    task_id = task.request.id if task else None
+    if not task_id:
+        return None
+
+    lock = threading.Lock()
+
+    def _callback(progress: Dict[str, Any]):
+        overall = start_percent + (end_percent - start_percent) * progress.get("percent", 0) / 100
+        meta = {
+            **extra_meta,
+            "stage": stage,
+            "progress": round(overall, 1),
+            "stage_progress": progress.get("percent", 0),
+            "eta_seconds": progress.get("eta_seconds")
+        }
+        with lock:
+            task.update_state(task_id=task_id, state="PROGRESS", meta=meta)
+
+    return _callback
+
+
+def scaled_progress_callback(
+    progress_callback: Optional[ProgressCallback],
+    start_percent: float,
+    end_percent: float
+) -> Optional[ProgressCallback]:
+    """Map a sub-step's 0-100% onto [start_percent, end_percent] of a parent callback"""
+    if not progress_callback:
+        return None
+
+    def _callback(progress: Dict[str, Any]):
+        percent = start_percent + (end_percent - start_percent) * progress.get("percent", 0) / 100
+        progress_callback({**progress, "percent": round(percent, 1)})
+
+    return _callback
+
+# Create singleton instance
+ffmpeg_runner = FFmpegRunner()
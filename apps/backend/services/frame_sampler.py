@@ -0,0 +1,228 @@
+"""
+Frame sampler: one sequential decode of a video for every sampled frame
+ffmpeg selects the first frame at or after each requested timestamp (or decodes
+keyframes only) and scales it in the decode pipeline; frames come back as
+uint8 RGB arrays ready for model input
+"""
+
+import subprocess
+import threading
+import logging
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class FrameSampler:
+    """Sample frames from a video without per-frame seeks"""
+
+    DEFAULT_SIZE = (512, 512)
+    FITS = ("pad", "crop", "stretch")
+    _PTS_TIME = re.compile(r"pts_time:\s*([-0-9.]+)")
+
+    def sample_at(
+        self,
+        video_path: str,
+        timestamps: List[float],
+        size: Tuple[int, int] = DEFAULT_SIZE,
+        fit: str = "pad",
+        timeout: int = 120
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Sample the first frame at or after each timestamp, in one decode
+
+        Args:
+            video_path: Video file
+            timestamps: Times in seconds (any order, duplicates allowed)
+            size: Output (width, height)
+            fit: "pad" (letterbox), "crop" (center crop) or "stretch"
+            timeout: Kill ffmpeg after this many seconds
+
+        Returns:
+            One HxWx3 uint8 RGB array per timestamp (None past the end of the video)
+        """
+        if not timestamps:
+            return []
+
+        targets = sorted({max(0.0, round(t, 3)) for t in timestamps})
+
+        # Keep a frame when a target lies in (previous kept frame, this frame]
+        terms = [f"gte(t\\,{targets[0]})*isnan(prev_selected_t)"]
+        terms += [f"gte(t\\,{target})*gt({target}\\,prev_selected_t)" for target in targets]
+        select = f"select={'+'.join(terms)}"
+
+        times, frames = self._decode(video_path, select, size, fit, keyframes_only=False, timeout=timeout)
+
+        # Each target takes the first frame at or after it
+        by_target = {}
+        frame_index = 0
+        for target in targets:
+            while frame_index < len(times) and times[frame_index] < target - 1e-3:
+                frame_index += 1
+            if frame_index < len(frames):
+                by_target[target] = frames[frame_index]
+
+        return [by_target.get(max(0.0, round(t, 3))) for t in timestamps]
+
+    def sample_uniform(
+        self,
+        video_path: str,
+        count: int,
+        duration: float,
+        size: Tuple[int, int] = DEFAULT_SIZE,
+        fit: str = "pad"
+    ) -> List[np.ndarray]:
+        """
+        Sample count frames evenly spread over the video (middle of each interval)
+
+        Args:
+            video_path: Video file
+            count: Number of frames
+            duration: Video duration in seconds
+            size: Output (width, height)
+            fit: "pad", "crop" or "stretch"
+
+        Returns:
+            Sampled frames (frames past the end are dropped)
+        """
+        if count <= 0 or duration <= 0:
+            return []
+        timestamps = [duration * (index + 0.5) / count for index in range(count)]
+        return [frame for frame in self.sample_at(video_path, timestamps, size, fit) if frame is not None]
+
+    def sample_rate(
+        self,
+        video_path: str,
+        fps: float,
+        size: Tuple[int, int] = DEFAULT_SIZE,
+        fit: str = "pad",
+        timeout: int = 120
+    ) -> Tuple[List[float], List[np.ndarray]]:
+        """
+        Sample frames at a fixed rate, in one decode
+
+        Args:
+            video_path: Video file
+            fps: Frames per second to keep
+            size: Output (width, height)
+            fit: "pad", "crop" or "stretch"
+            timeout: Kill ffmpeg after this many seconds
+
+        Returns:
+            (frame times in seconds, frames)
+        """
+        return self._decode(video_path, f"fps={fps:.4f}", size, fit, keyframes_only=False, timeout=timeout)
+
+    def sample_keyframes(
+        self,
+        video_path: str,
+        size: Tuple[int, int] = DEFAULT_SIZE,
+        fit: str = "pad",
+        max_frames: Optional[int] = None,
+        timeout: int = 120
+    ) -> Tuple[List[float], List[np.ndarray]]:
+        """
+        Decode keyframes only (the decoder skips every other frame: cheapest sampling)
+
+        Args:
+            video_path: Video file
+            size: Output (width, height)
+            fit: "pad", "crop" or "stretch"
+            max_frames: Evenly thin the keyframes down to this many
+            timeout: Kill ffmpeg after this many seconds
+
+        Returns:
+            (keyframe times in seconds, frames)
+        """
+        times, frames = self._decode(video_path, None, size, fit, keyframes_only=True, timeout=timeout)
+
+        if max_frames and len(frames) > max_frames:
+            keep = np.linspace(0, len(frames) - 1, max_frames, dtype=int)
+            times = [times[index] for index in keep]
+            frames = [frames[index] for index in keep]
+
+        return times, frames
+
+    def _decode(
+        self,
+        video_path: str,
+        select: Optional[str],
+        size: Tuple[int, int],
+        fit: str,
+        keyframes_only: bool,
+        timeout: int
+    ) -> Tuple[List[float], List[np.ndarray]]:
+        """Run one ffmpeg decode and read the selected frames (and their times) from its pipes"""
+        if fit not in self.FITS:
+            raise ValueError(f"Unknown fit {fit}, expected one of {self.FITS}")
+
+        width, height = size
+        if fit == "pad":
+            scale = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                     f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black")
+        elif fit == "crop":
+            scale = f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}"
+        else:
+            scale = f"scale={width}:{height}"
+
+        # Select before scaling: frames that are not kept are never scaled
+        filters = ([select] if select else []) + [scale, "showinfo"]
+
+        ffmpeg_cmd = ["ffmpeg", "-hide_banner", "-nostdin"]
+        if keyframes_only:
+            ffmpeg_cmd += ["-skip_frame", "nokey"]
+        ffmpeg_cmd += [
+            "-i", video_path,
+            "-map", "0:v:0",
+            "-vf", ",".join(filters),
+            "-fps_mode", "passthrough",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "pipe:1"
+        ]
+
+        process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        # showinfo logs one line per output frame on stderr: read it on a thread
+        times: List[float] = []
+        stderr_tail: List[str] = []
+
+        def _read_stderr():
+            for raw_line in process.stderr:
+                line = raw_line.decode(errors="replace")
+                if "Parsed_showinfo" in line:
+                    match = self._PTS_TIME.search(line)
+                    if match:
+                        times.append(float(match.group(1)))
+                else:
+                    stderr_tail[:] = (stderr_tail + [line])[-20:]
+
+        stderr_thread = threading.Thread(target=_read_stderr, daemon=True)
+        stderr_thread.start()
+
+        watchdog = threading.Timer(timeout, process.kill)
+        watchdog.start()
+
+        frame_bytes = width * height * 3
+        frames: List[np.ndarray] = []
+        try:
+            while True:
+                data = process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                frames.append(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3))
+            process.wait()
+        finally:
+            watchdog.cancel()
+            stderr_thread.join(timeout=5)
+
+        if process.returncode != 0:
+            logger.warning(f"⚠️ Frame sampling failed for {video_path}: {''.join(stderr_tail)[-500:]}")
+
+        count = min(len(times), len(frames))
+        logger.info(f"🎞️ Sampled {count} frames from {video_path} in one decode")
+        return times[:count], frames[:count]
+
+# Create singleton instance
+frame_sampler = FrameSampler()
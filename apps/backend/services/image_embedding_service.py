@@ -0,0 +1,214 @@
+"""
+Image embeddings (OpenCLIP ViT-B-32, 512-d) with batched CPU inference
+- "torch" backend: open_clip image tower, optionally int8 dynamically quantized
+- "onnx" backend: the same tower exported once to ONNX (optionally int8 quantized)
+  and run with onnxruntime
+- Output is float32, L2-normalized: cosine similarity is a dot product
+"""
+
+import os
+import threading
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ImageEmbeddingService:
+    """Embed RGB frames with an OpenCLIP-compatible image encoder"""
+
+    EMBEDDING_DIM = 512
+    BACKENDS = ("torch", "onnx")
+
+    # CLIP preprocessing
+    INPUT_SIZE = 224
+    MEAN = np.array([0.48145466, 0.4578275, 0.40821073], dtype=np.float32)
+    STD = np.array([0.26862954, 0.26130258, 0.27577711], dtype=np.float32)
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown embedding backend {self.backend}, expected one of {self.BACKENDS}")
+        self._model = None
+        self._session = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model_version(self) -> str:
+        """Identifies the embeddings this configuration produces (inference cache key)"""
+        precision = "int8" if settings.EMBEDDING_QUANTIZE else "fp32"
+        return f"{settings.EMBEDDING_MODEL}/{settings.EMBEDDING_PRETRAINED}|{self.backend}|{precision}"
+
+    def embed(self, frames: List[np.ndarray], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed frames in batches
+
+        Args:
+            frames: HxWx3 uint8 RGB frames (any size)
+            batch_size: Frames per forward pass (defaults to EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            (len(frames), 512) float32 array of L2-normalized embeddings
+        """
+        if not frames:
+            return np.zeros((0, self.EMBEDDING_DIM), dtype=np.float32)
+
+        self._load()
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+        embeddings = []
+        for start in range(0, len(frames), batch_size):
+            pixels = self.preprocess(frames[start:start + batch_size])
+            embeddings.append(self._run(pixels))
+
+        embeddings = np.concatenate(embeddings).astype(np.float32, copy=False)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def load(self):
+        """Load the encoder now instead of on the first batch (long-lived servers)"""
+        self._load()
+
+    def preprocess(self, frames: List[np.ndarray]) -> np.ndarray:
+        """
+        CLIP preprocessing: resize shortest side to 224, center crop, normalize
+
+        Args:
+            frames: HxWx3 uint8 RGB frames
+
+        Returns:
+            (N, 3, 224, 224) float32 NCHW batch
+        """
+        from PIL import Image
+
+        size = self.INPUT_SIZE
+        batch = np.empty((len(frames), size, size, 3), dtype=np.float32)
+        for index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            if (height, width) != (size, size):
+                scale = size / min(height, width)
+                resized_w, resized_h = max(size, round(width * scale)), max(size, round(height * scale))
+                image = Image.fromarray(frame).resize((resized_w, resized_h), Image.BICUBIC)
+                left, top = (resized_w - size) // 2, (resized_h - size) // 2
+                frame = np.asarray(image.crop((left, top, left + size, top + size)))
+            batch[index] = frame
+
+        batch /= 255.0
+        batch -= self.MEAN
+        batch /= self.STD
+        return np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+
+    def _load(self):
+        """Lazy load the encoder for the configured backend"""
+        if self._model is not None or self._session is not None:
+            return
+
+        with self._load_lock:
+            if self._model is not None or self._session is not None:
+                return
+            if self.backend == "onnx":
+                self._session = self._load_onnx()
+            else:
+                self._model = self._load_torch()
+
+    def _threads(self) -> int:
+        return settings.EMBEDDING_THREADS or max(1, (os.cpu_count() or 1) // 2)
+
+    def _create_torch_model(self):
+        """OpenCLIP image tower in eval mode (float32, CPU)"""
+        import open_clip
+
+        model, _, _ = open_clip.create_model_and_transforms(
+            settings.EMBEDDING_MODEL, pretrained=settings.EMBEDDING_PRETRAINED
+        )
+        return model.eval()
+
+    def _load_torch(self):
+        import torch
+
+        torch.set_num_threads(self._threads())
+        logger.info(f"Loading OpenCLIP {settings.EMBEDDING_MODEL} ({settings.EMBEDDING_PRETRAINED}) on cpu ({self._threads()} threads)...")
+        model = self._create_torch_model()
+
+        if settings.EMBEDDING_QUANTIZE:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("✅ OpenCLIP quantized to int8 (dynamic)")
+
+        return model
+
+    def _load_onnx(self):
+        """Export the image tower to ONNX on first use, then open an onnxruntime session"""
+        import onnxruntime
+
+        model_path = settings.EMBEDDING_ONNX_PATH
+        if settings.EMBEDDING_QUANTIZE:
+            model_path = model_path.replace(".onnx", ".int8.onnx")
+
+        if not os.path.exists(model_path):
+            self.export_onnx(settings.EMBEDDING_ONNX_PATH, quantize=settings.EMBEDDING_QUANTIZE)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self._threads()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        logger.info(f"Loading ONNX image encoder {model_path} ({self._threads()} threads)...")
+        return onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def export_onnx(self, output_path: str, quantize: bool = False) -> str:
+        """
+        Export the OpenCLIP image tower to ONNX (dynamic batch axis)
+
+        Args:
+            output_path: Float32 model path (*.onnx)
+            quantize: Also write an int8 dynamically quantized copy (*.int8.onnx)
+
+        Returns:
+            Path of the model to load
+        """
+        import torch
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        model = self._create_torch_model()
+
+        class _ImageTower(torch.nn.Module):
+            def __init__(self, clip_model):
+                super().__init__()
+                self.clip_model = clip_model
+
+            def forward(self, pixels):
+                return self.clip_model.encode_image(pixels)
+
+        dummy = torch.zeros(1, 3, self.INPUT_SIZE, self.INPUT_SIZE)
+        torch.onnx.export(
+            _ImageTower(model), dummy, output_path,
+            input_names=["pixels"], output_names=["embeddings"],
+            dynamic_axes={"pixels": {0: "batch"}, "embeddings": {0: "batch"}},
+            opset_version=17
+        )
+        logger.info(f"✅ Exported image encoder to {output_path}")
+
+        if not quantize:
+            return output_path
+
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantized_path = output_path.replace(".onnx", ".int8.onnx")
+        quantize_dynamic(output_path, quantized_path, weight_type=QuantType.QInt8)
+        logger.info(f"✅ Quantized image encoder to {quantized_path}")
+        return quantized_path
+
+    def _run(self, pixels: np.ndarray) -> np.ndarray:
+        """One forward pass over a preprocessed batch"""
+        if self._session is not None:
+            return self._session.run(None, {"pixels": pixels})[0]
+
+        import torch
+
+        with torch.inference_mode():
+            return self._model.encode_image(torch.from_numpy(pixels)).float().numpy()
+
+# Create singleton instance
+image_embedding_service = ImageEmbeddingService()
@@ -0,0 +1,268 @@
+"""
+Cache of model outputs (captions, embeddings, AI descriptions) keyed by frame content
+- Keys are a perceptual difference hash of the downscaled frame plus the model version,
+  so a re-uploaded clip, a reprocessing script or a retried task reuses earlier results
+  even when the frames were decoded from a different encode
+- Stored in SQLite on the worker host ("disk", LRU bounded by entry count) or in Redis
+  (shared, idle entries expire; run Redis with maxmemory-policy allkeys-lru)
+- A cache failure is only a miss: inference runs as if there were no cache
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class InferenceCache:
+    """Look up model outputs by perceptual frame hash before running the model"""
+
+    FLAT_FRAME_STD = 2.0  # Near-uniform thumbnails (black frames, fades) all hash alike: never cached
+    EVICT_RATIO = 0.9     # Evict down to this share of the limit, so eviction is not run on every put
+    KEY_PREFIX = "inference-cache"
+    SQL_BATCH = 500       # Keys per SELECT (SQLite variable limit)
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or settings.INFERENCE_CACHE_BACKEND
+        self.hash_size = settings.INFERENCE_CACHE_HASH_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._redis = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend in ("disk", "redis")
+
+    def frame_hash(self, frame: np.ndarray) -> Optional[str]:
+        """
+        Difference hash of an RGB frame
+
+        Args:
+            frame: HxWx3 uint8 RGB frame
+
+        Returns:
+            Hex hash, or None for a near-uniform frame
+        """
+        return self._dhash(Image.fromarray(frame))
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """Difference hash of an image file (None if unreadable or near-uniform)"""
+        try:
+            with Image.open(path) as image:
+                image.draft("L", (self.hash_size * 4, self.hash_size * 4))  # JPEG: decode at reduced size
+                return self._dhash(image)
+        except OSError as e:
+            logger.warning(f"⚠️ Inference cache cannot hash {path}: {e}")
+            return None
+
+    def files_hash(self, paths: List[str]) -> Optional[str]:
+        """Combined hash of several frames (None if any frame cannot be hashed)"""
+        hashes = [self.file_hash(path) for path in paths]
+        if not hashes or any(frame_hash is None for frame_hash in hashes):
+            return None
+        return "+".join(hashes)
+
+    def get_or_compute(
+        self,
+        kind: str,
+        model_version: str,
+        items: List[Any],
+        compute: Callable[[List[Any]], List[Any]],
+        key: Optional[Callable[[Any], Optional[str]]] = None,
+        encode: Callable[[Any], bytes] = lambda value: value.encode("utf-8"),
+        decode: Callable[[bytes], Any] = lambda data: data.decode("utf-8"),
+        cacheable: Callable[[Any], bool] = lambda value: value is not None
+    ) -> List[Any]:
+        """
+        Return cached outputs and run the model only on the items that missed
+
+        Args:
+            kind: Output family ("caption", "embedding", "vision")
+            model_version: Everything that changes the output for a given input
+            items: Model inputs (frames by default)
+            compute: Model call on the missed items, one output per item in order
+            key: Content hash of an item (default frame_hash); None = not cacheable
+            encode: Output to bytes
+            decode: Bytes to output
+            cacheable: Whether an output may be stored (fallback outputs are not)
+
+        Returns:
+            One output per item, in input order
+        """
+        if not items:
+            return []
+        if not self.enabled:
+            return compute(items)
+
+        key = key or self.frame_hash
+        keys = [self._cache_key(kind, model_version, key(item)) for item in items]
+
+        results: List[Any] = [None] * len(items)
+        stored = self._get_many([cache_key for cache_key in keys if cache_key])
+        missing = []
+        for index, cache_key in enumerate(keys):
+            data = stored.get(cache_key) if cache_key else None
+            if data is None:
+                missing.append(index)
+                continue
+            try:
+                results[index] = decode(data)
+            except Exception:
+                missing.append(index)
+
+        with self._lock:
+            self.hits += len(items) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = compute([items[index] for index in missing])
+            entries = {}
+            for index, value in zip(missing, computed):
+                results[index] = value
+                if keys[index] and cacheable(value):
+                    entries[keys[index]] = encode(value)
+            self._put_many(entries)
+
+        if len(missing) < len(items):
+            logger.info(f"♻️ Inference cache: {len(items) - len(missing)}/{len(items)} {kind} outputs reused")
+        return results
+
+    def _dhash(self, image: Image.Image) -> Optional[str]:
+        gray = image.convert("L").resize((self.hash_size + 1, self.hash_size), Image.BILINEAR)
+        pixels = np.asarray(gray, dtype=np.int16)
+        if pixels.std() < self.FLAT_FRAME_STD:
+            return None
+        return np.packbits(pixels[:, 1:] > pixels[:, :-1]).tobytes().hex()
+
+    def _cache_key(self, kind: str, model_version: str, content_hash: Optional[str]) -> Optional[str]:
+        if not content_hash:
+            return None
+        digest = hashlib.sha256(f"{model_version}|{self.hash_size}|{content_hash}".encode("utf-8")).hexdigest()
+        return f"{kind}:{digest}"
+
+    def _get_many(self, keys: List[str]) -> dict:
+        if not keys:
+            return {}
+        try:
+            if self.backend == "redis":
+                return self._redis_get_many(keys)
+            return self._disk_get_many(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ Inference cache lookup failed ({self.backend}): {e}")
+            return {}
+
+    def _put_many(self, entries: dict):
+        if not entries:
+            return
+        try:
+            if self.backend == "redis":
+                self._redis_put_many(entries)
+            else:
+                self._disk_put_many(entries)
+        except Exception as e:
+            logger.warning(f"⚠️ Inference cache write failed ({self.backend}): {e}")
+
+    # Disk backend (SQLite shared by the worker processes of the host)
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection of this process (reopened after a fork)"""
+        if self._connection is None or self._connection_pid != os.getpid():
+            os.makedirs(settings.INFERENCE_CACHE_DIR, exist_ok=True)
+            connection = sqlite3.connect(
+                os.path.join(settings.INFERENCE_CACHE_DIR, "cache.sqlite3"),
+                timeout=30,
+                check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _disk_get_many(self, keys: List[str]) -> dict:
+        rows = []
+        with self._lock:
+            db = self._db()
+            for start in range(0, len(keys), self.SQL_BATCH):
+                chunk = keys[start:start + self.SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(db.execute(f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk).fetchall())
+            if rows:
+                now = time.time()
+                db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, row[0]) for row in rows])
+                db.commit()
+        return {row[0]: bytes(row[1]) for row in rows}
+
+    def _disk_put_many(self, entries: dict):
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            db.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, last_used) VALUES (?, ?, ?)",
+                [(key, sqlite3.Binary(value), now) for key, value in entries.items()]
+            )
+            db.commit()
+            self._disk_evict(db)
+
+    def _disk_evict(self, db: sqlite3.Connection):
+        """Remove least recently used entries once the cache is over INFERENCE_CACHE_MAX_ENTRIES"""
+        max_entries = settings.INFERENCE_CACHE_MAX_ENTRIES
+        count = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count <= max_entries:
+            return
+
+        evict = count - int(max_entries * self.EVICT_RATIO)
+        db.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+            (evict,)
+        )
+        db.commit()
+        logger.info(f"🧹 Inference cache evicted {evict} entries")
+
+    # Redis backend (shared by every worker host)
+
+    def _client(self):
+        with self._lock:
+            if self._redis is None:
+                import redis
+                self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2)
+            return self._redis
+
+    def _redis_get_many(self, keys: List[str]) -> dict:
+        client = self._client()
+        values = client.mget([f"{self.KEY_PREFIX}:{key}" for key in keys])
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        if found:
+            # Used entries stay alive; idle ones expire (and allkeys-lru evicts under memory pressure)
+            pipeline = client.pipeline(transaction=False)
+            for key in found:
+                pipeline.expire(f"{self.KEY_PREFIX}:{key}", settings.INFERENCE_CACHE_TTL)
+            pipeline.execute()
+        return found
+
+    def _redis_put_many(self, entries: dict):
+        pipeline = self._client().pipeline(transaction=False)
+        for key, value in entries.items():
+            pipeline.set(f"{self.KEY_PREFIX}:{key}", value, ex=settings.INFERENCE_CACHE_TTL)
+        pipeline.execute()
+
+# Create singleton instance
+inference_cache = InferenceCache()
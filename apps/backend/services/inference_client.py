@@ -0,0 +1,108 @@
+"""
+Client of the inference sidecar (scripts/inference_server.py)
+The sidecar holds the captioning and embedding models once per host; workers send
+raw RGB frames over a Unix socket or localhost HTTP instead of loading the models
+"""
+
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class InferenceClient:
+    """Caption and embed frames through the inference sidecar"""
+
+    def __init__(self, server_url: Optional[str] = None):
+        self.server_url = server_url if server_url is not None else settings.INFERENCE_SERVER_URL
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.server_url)
+
+    def caption(self, frames: List[np.ndarray]) -> List[str]:
+        """
+        Caption frames on the sidecar
+
+        Args:
+            frames: HxWx3 uint8 RGB frames
+
+        Returns:
+            One caption per frame
+        """
+        captions = []
+        for group in self._group_by_shape(frames):
+            response = self._post("/caption", group)
+            captions.extend(response.json()["captions"])
+        return captions
+
+    def embed(self, frames: List[np.ndarray]) -> np.ndarray:
+        """
+        Embed frames on the sidecar
+
+        Args:
+            frames: HxWx3 uint8 RGB frames
+
+        Returns:
+            (len(frames), dim) float32 array of L2-normalized embeddings
+        """
+        embeddings = []
+        for group in self._group_by_shape(frames):
+            response = self._post("/embed", group)
+            dim = int(response.headers["X-Embedding-Dim"])
+            embeddings.append(np.frombuffer(response.content, dtype=np.float32).reshape(-1, dim))
+        return np.concatenate(embeddings) if embeddings else np.zeros((0, 512), dtype=np.float32)
+
+    def health(self) -> Optional[dict]:
+        """Sidecar status, or None if it is unreachable"""
+        try:
+            response = self._http().get("/health", timeout=2)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.warning(f"⚠️ Inference sidecar unreachable at {self.server_url}: {e}")
+            return None
+
+    def _group_by_shape(self, frames: List[np.ndarray]) -> List[List[np.ndarray]]:
+        """Consecutive frames of the same shape (one request each, order preserved)"""
+        groups: List[List[np.ndarray]] = []
+        for frame in frames:
+            if groups and groups[-1][0].shape == frame.shape:
+                groups[-1].append(frame)
+            else:
+                groups.append([frame])
+        return groups
+
+    def _post(self, path: str, frames: List[np.ndarray]) -> httpx.Response:
+        height, width = frames[0].shape[:2]
+        body = b"".join(np.ascontiguousarray(frame, dtype=np.uint8).tobytes() for frame in frames)
+        response = self._http().post(
+            path,
+            content=body,
+            headers={"Content-Type": "application/octet-stream", "X-Frame-Shape": f"{len(frames)},{height},{width}"}
+        )
+        response.raise_for_status()
+        return response
+
+    def _http(self) -> httpx.Client:
+        """Pooled client: "unix:///path.sock" goes over a Unix socket, anything else over HTTP"""
+        with self._lock:
+            if self._client is None:
+                base_url, transport = self._transport()
+                self._client = httpx.Client(base_url=base_url, transport=transport, timeout=settings.INFERENCE_TIMEOUT)
+            return self._client
+
+    def _transport(self) -> Tuple[str, Optional[httpx.HTTPTransport]]:
+        if self.server_url.startswith("unix://"):
+            return "http://inference", httpx.HTTPTransport(uds=self.server_url[len("unix://"):])
+        return self.server_url.rstrip("/"), None
+
+# Create singleton instance
+inference_client = InferenceClient()
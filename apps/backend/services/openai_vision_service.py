@@ -10,7 +10,6 @@ import os
 from typing import Optional, Dict, Any
 from openai import OpenAI
 from PIL import Image
-import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -41,31 +40,24 @@ class OpenAIVisionService:
             logger.error(f"❌ Failed to initialize OpenAI Vision service: {e}")
             
     def extract_video_frames(self, video_path: str, max_frames: int = 5) -> list:
-        """Extract frames from video for analysis"""
+        """Extract frames from video for analysis (evenly spread, one sequential decode)"""
         frames = []
         
         try:
-            # Open video with OpenCV
-            cap = cv2.VideoCapture(video_path)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            from services.frame_sampler import frame_sampler
+            from services.video_conversion_service import video_conversion_service
             
-            if total_frames == 0:
+            duration = video_conversion_service.get_video_metadata(video_path).get("duration", 0)
+            if duration > 0:
+                frames = frame_sampler.sample_uniform(video_path, max_frames, duration)
+            else:
+                # Still images and streams without a duration: first frame
+                frames = [frame for frame in frame_sampler.sample_at(video_path, [0.0]) if frame is not None]
+            
+            if not frames:
                 logger.warning(f"No frames found in video: {video_path}")
                 return frames
-                
-            # Calculate frame indices to extract (evenly distributed)
-            frame_indices = np.linspace(0, total_frames - 1, min(max_frames, total_frames), dtype=int)
             
-            for frame_idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-                
-                if ret:
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frames.append(frame_rgb)
-                    
-            cap.release()
             logger.info(f"✅ Extracted {len(frames)} frames from video")
             
         except Exception as e:
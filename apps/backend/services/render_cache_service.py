@@ -0,0 +1,160 @@
+"""
+Content-addressed cache of rendered timelines
+A render is keyed by everything that determines its bytes: template script, clip
+assignments, source ETags, text overlays and encoder profile
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.render_cache_entry import RenderCacheEntry
+from services.s3_service import s3_service
+from services.video_render_service import video_render_service
+
+logger = logging.getLogger(__name__)
+
+class RenderCacheService:
+    """Lookup and store finished renders so identical timelines are never encoded twice"""
+
+    KEY_VERSION = 1  # Bump to invalidate every entry when render output changes
+
+    def __init__(self):
+        self.enabled = settings.RENDER_CACHE_ENABLED
+
+    def compute_key(
+        self,
+        script: str,
+        clips: List[Dict[str, Any]],
+        text_overlays: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        Hash the canonical JSON of a render's inputs
+
+        Args:
+            script: Cleaned template script
+            clips: Clips in timeline order (order, video_id, s3_key, start, duration)
+            text_overlays: Canvas editor text overlays
+
+        Returns:
+            Hex sha256 cache key, or None if a source cannot be fingerprinted
+        """
+        if not self.enabled:
+            return None
+
+        clip_fingerprints = []
+        for clip in clips:
+            source_version = self._source_version(clip.get("s3_key"))
+            if not source_version:
+                logger.info(f"⚠️ Render cache skipped: no version for source {clip.get('video_id')}")
+                return None
+
+            clip_fingerprints.append({
+                "order": clip["order"],
+                "video_id": clip["video_id"],
+                "source_version": source_version,
+                "start": round(float(clip.get("start", 0)), 3),
+                "duration": round(float(clip["duration"]), 3)
+            })
+
+        payload = {
+            "version": self.KEY_VERSION,
+            "script": script,
+            "clips": clip_fingerprints,
+            "text_overlays": text_overlays,
+            "encoder_profile": video_render_service.get_encoder_profile(),
+            "render_engine": settings.RENDER_ENGINE
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def lookup(self, db: Session, cache_key: Optional[str]) -> Optional[RenderCacheEntry]:
+        """
+        Find a cached render whose output still exists in S3
+
+        Args:
+            db: Database session
+            cache_key: Key from compute_key
+
+        Returns:
+            The cache entry, or None on a miss
+        """
+        if not self.enabled or not cache_key:
+            return None
+
+        entry = db.query(RenderCacheEntry).filter(RenderCacheEntry.cache_key == cache_key).first()
+        if not entry:
+            return None
+
+        if not s3_service.get_file_metadata(entry.video_s3_key):
+            logger.warning(f"🗑️ Render cache entry {cache_key[:12]} points to a missing object, dropping it")
+            db.delete(entry)
+            db.commit()
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_hit_at = datetime.utcnow()
+        logger.info(f"⚡ Render cache hit {cache_key[:12]}: {entry.video_s3_key}")
+        return entry
+
+    def store(
+        self,
+        db: Session,
+        cache_key: Optional[str],
+        video_s3_key: str,
+        thumbnail_url: Optional[str],
+        duration: float,
+        generation_metadata: Dict[str, Any],
+        source_video_id: str
+    ) -> bool:
+        """
+        Record a finished render (commits on its own so a duplicate key never fails the job)
+
+        Returns:
+            True if the entry was stored
+        """
+        if not self.enabled or not cache_key:
+            return False
+
+        try:
+            db.add(RenderCacheEntry(
+                cache_key=cache_key,
+                video_s3_key=video_s3_key,
+                thumbnail_url=thumbnail_url,
+                duration=duration,
+                generation_metadata=json.dumps(generation_metadata),
+                source_video_id=source_video_id
+            ))
+            db.commit()
+            logger.info(f"📦 Render cached {cache_key[:12]}: {video_s3_key}")
+            return True
+        except SQLAlchemyError as e:
+            # Another worker rendered the same timeline concurrently
+            db.rollback()
+            logger.warning(f"⚠️ Render cache store skipped: {e}")
+            return False
+
+    def _source_version(self, s3_key: Optional[str]) -> Optional[str]:
+        """ETag of the source object (size + mtime for the local storage backend)"""
+        if not s3_key:
+            return None
+
+        if settings.STORAGE_BACKEND == "s3":
+            metadata = s3_service.get_file_metadata(s3_key)
+            return metadata["etag"] if metadata else None
+
+        try:
+            stat = os.stat(os.path.join("uploads", s3_key))
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        except OSError:
+            return None
+
+# Create singleton instance
+render_cache_service = RenderCacheService()
@@ -1,11 +1,18 @@
 try:
     import boto3
-    from botocore.exceptions import ClientError
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError, BotoCoreError
     BOTO3_AVAILABLE = True
 except ImportError:
     BOTO3_AVAILABLE = False
     ClientError = Exception
-from typing import Optional, Dict, Any
+    BotoCoreError = Exception
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+import os
+import random
+import time
 import uuid
 import logging
 from datetime import datetime, timedelta
@@ -20,6 +27,7 @@ class S3Service:
     def __init__(self):
         self.bucket_name = settings.AWS_S3_BUCKET or "hospup-files"
         self.s3_client = None
+        self.transfer_config = None
         self._init_s3_client()
     
     def _init_s3_client(self):
@@ -34,11 +42,23 @@ class S3Service:
             settings.AWS_ACCESS_KEY_ID.strip() != "" and 
             settings.AWS_SECRET_ACCESS_KEY.strip() != ""):
             try:
+                # One pooled, thread-safe client shared by every transfer of the process
                 self.s3_client = boto3.client(
                     's3',
                     aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                    region_name=settings.AWS_REGION
+                    region_name=settings.AWS_REGION,
+                    config=Config(
+                        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                        retries={'max_attempts': 5, 'mode': 'adaptive'},
+                        tcp_keepalive=True
+                    )
+                )
+                self.transfer_config = TransferConfig(
+                    multipart_threshold=settings.S3_TRANSFER_CHUNK_SIZE,
+                    multipart_chunksize=settings.S3_TRANSFER_CHUNK_SIZE,
+                    max_concurrency=settings.S3_TRANSFER_CONCURRENCY,
+                    use_threads=True
                 )
                 logger.info("✅ S3 client initialized successfully")
             except Exception as e:
@@ -238,6 +258,261 @@ class S3Service:
                 'error': str(e)
             }
     
+    def download_to_path(self, s3_key: str, local_path: str) -> bool:
+        """
+        Download an S3 object to a local file with concurrent ranged GETs
+        
+        Objects larger than S3_TRANSFER_CHUNK_SIZE are fetched as parallel byte
+        ranges over the pooled client. A failed range is retried with backoff and
+        resumes from the last byte it wrote; every range is pinned to the ETag seen
+        at the start so an overwritten object can't produce a mixed file.
+        
+        Args:
+            s3_key: S3 object key
+            local_path: Destination path (overwritten)
+            
+        Returns:
+            True if the whole object was written to local_path
+        """
+        
+        if not self.is_available:
+            logger.error("S3 service unavailable - AWS credentials not configured")
+            return False
+        
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            size = head['ContentLength']
+            etag = head['ETag']
+            
+            # Preallocate so ranges can be written in place at their offsets
+            with open(local_path, 'wb') as f:
+                f.truncate(size)
+            
+            if size == 0:
+                return True
+            
+            chunk_size = settings.S3_TRANSFER_CHUNK_SIZE
+            ranges = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+            
+            if len(ranges) == 1:
+                self._download_range(s3_key, etag, local_path, *ranges[0])
+            else:
+                workers = min(settings.S3_TRANSFER_CONCURRENCY, len(ranges))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-range") as executor:
+                    futures = [
+                        executor.submit(self._download_range, s3_key, etag, local_path, start, end)
+                        for start, end in ranges
+                    ]
+                    for future in futures:
+                        future.result()
+            
+            logger.info(f"Downloaded {s3_key} ({size:,} bytes, {len(ranges)} ranges)")
+            return True
+            
+        except (ClientError, BotoCoreError, OSError) as e:
+            logger.error(f"Error downloading file {s3_key}: {e}")
+            # Never leave the preallocated (zero-filled) file behind as if it were the object
+            try:
+                os.remove(local_path)
+            except OSError:
+                pass
+            return False
+    
+    def _download_range(self, s3_key: str, etag: str, local_path: str, start: int, end: int):
+        """Write bytes [start, end] of an object into local_path, resuming on retry"""
+        
+        offset = start
+        attempt = 0
+        while True:
+            try:
+                response = self.s3_client.get_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Range=f"bytes={offset}-{end}",
+                    IfMatch=etag
+                )
+                with open(local_path, 'r+b') as f:
+                    f.seek(offset)
+                    for chunk in response['Body'].iter_chunks(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                        offset += len(chunk)
+                
+                if offset > end:
+                    return
+                raise IOError(f"Short read for {s3_key} at byte {offset}")
+                
+            except ClientError as e:
+                # The object changed under us - resuming would mix two versions
+                if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412'):
+                    raise
+                last_error = e
+            except (BotoCoreError, OSError) as e:
+                last_error = e
+            
+            attempt += 1
+            if attempt > settings.S3_TRANSFER_MAX_RETRIES:
+                raise last_error
+            delay = min(30, 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.warning(f"Retrying range {offset}-{end} of {s3_key} in {delay:.1f}s: {last_error}")
+            time.sleep(delay)
+    
+    def upload_from_path(self, local_path: str, s3_key: str, content_type: str = None) -> Dict[str, Any]:
+        """
+        Upload a local file to S3 with concurrent multipart transfers
+        
+        Parts are sent in parallel over the pooled client (botocore retries each
+        part); a transfer that still fails is restarted with backoff.
+        
+        Args:
+            local_path: File to upload
+            s3_key: Destination S3 key
+            content_type: Optional Content-Type
+            
+        Returns:
+            Dict with success flag, s3_key, size and presigned URL (same shape as upload_file_direct)
+        """
+        
+        if not self.is_available:
+            return {
+                'success': False,
+                'error': 'S3 service unavailable - AWS credentials not configured'
+            }
+        
+        extra_args = {'ContentType': content_type} if content_type else {}
+        
+        for attempt in range(settings.S3_TRANSFER_MAX_RETRIES + 1):
+            try:
+                self.s3_client.upload_file(
+                    local_path,
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs=extra_args,
+                    Config=self.transfer_config
+                )
+                
+                file_url = self.generate_presigned_download_url(s3_key, expires_in=3600 * 24 * 7)  # 7 days
+                
+                logger.info(f"Successfully uploaded file to S3: {s3_key}")
+                return {
+                    'success': True,
+                    'url': file_url,
+                    's3_key': s3_key,
+                    'size': os.path.getsize(local_path)
+                }
+                
+            except (ClientError, BotoCoreError, OSError) as e:
+                if attempt >= settings.S3_TRANSFER_MAX_RETRIES:
+                    logger.error(f"Error uploading file to S3: {e}")
+                    return {
+                        'success': False,
+                        'error': str(e)
+                    }
+                delay = min(30, 2 ** (attempt + 1)) * random.uniform(0.5, 1.0)
+                logger.warning(f"Retrying upload of {s3_key} in {delay:.1f}s: {e}")
+                time.sleep(delay)
+    
+    def create_multipart_upload(self, s3_key: str, content_type: str = None) -> Optional[str]:
+        """Start a multipart upload and return its UploadId (None on failure)"""
+        
+        if not self.is_available:
+            return None
+        
+        try:
+            extra_args = {'ContentType': content_type} if content_type else {}
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                **extra_args
+            )
+            return response['UploadId']
+        except ClientError as e:
+            logger.error(f"Error creating multipart upload for {s3_key}: {e}")
+            return None
+    
+    def upload_part(self, s3_key: str, upload_id: str, part_number: int, body: bytes) -> Optional[str]:
+        """
+        Upload one part of a multipart upload
+        
+        Re-sending a part number replaces it, so a failed part can be retried on its own.
+        
+        Returns:
+            ETag of the stored part, or None on failure
+        """
+        
+        if not self.is_available:
+            return None
+        
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            return response['ETag']
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Error uploading part {part_number} of {s3_key}: {e}")
+            return None
+    
+    def list_parts(self, s3_key: str, upload_id: str) -> Optional[List[Dict[str, Any]]]:
+        """List the parts stored so far ([{"PartNumber", "ETag", "Size"}], None on failure)"""
+        
+        if not self.is_available:
+            return None
+        
+        try:
+            parts = []
+            paginator = self.s3_client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id):
+                parts.extend(
+                    {'PartNumber': part['PartNumber'], 'ETag': part['ETag'], 'Size': part['Size']}
+                    for part in page.get('Parts', [])
+                )
+            return parts
+        except ClientError as e:
+            logger.error(f"Error listing parts of {s3_key}: {e}")
+            return None
+    
+    def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict[str, Any]]) -> bool:
+        """Assemble uploaded parts ([{"PartNumber", "ETag"}], ascending) into the final object"""
+        
+        if not self.is_available:
+            return False
+        
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            logger.info(f"Successfully completed multipart upload to S3: {s3_key}")
+            return True
+        except ClientError as e:
+            logger.error(f"Error completing multipart upload for {s3_key}: {e}")
+            return False
+    
+    def abort_multipart_upload(self, s3_key: str, upload_id: str) -> bool:
+        """Abort a multipart upload and free its stored parts"""
+        
+        if not self.is_available:
+            return False
+        
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+                logger.info(f"Multipart upload for {s3_key} is already gone")
+                return True
+            logger.error(f"Error aborting multipart upload for {s3_key}: {e}")
+            return False
+    
     def make_file_public(self, s3_key: str) -> bool:
         """Make an existing S3 file publicly readable (deprecated - ACLs not supported)"""
         
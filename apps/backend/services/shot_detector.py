@@ -0,0 +1,186 @@
+"""
+Shot detection on small, rate-limited frames
+- Frames are decoded at DETECT_SIZE and at most SHOT_DETECT_FPS (fewer for long
+  videos, SHOT_DETECT_MAX_FRAMES overall), either from the ingest pass or in one decode
+- A cut is a frame difference above an absolute threshold and well above the recent
+  differences (camera motion raises both, a cut only the second)
+- Every shot carries its mean motion and brightness, persisted in VideoMediaIndex.shots
+"""
+
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from core.config import settings
+from services.frame_sampler import frame_sampler
+
+logger = logging.getLogger(__name__)
+
+class ShotDetector:
+    """Split a video into shots with per-shot motion and brightness"""
+
+    DETECT_SIZE = (128, 72)
+    LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    HISTORY = 8  # Differences the adaptive threshold looks back on
+
+    def sample_fps(self, duration: float, source_fps: Optional[float] = None) -> float:
+        """
+        Detection frame rate: SHOT_DETECT_FPS, lowered for long videos, never above the source
+
+        Args:
+            duration: Video duration in seconds
+            source_fps: Source frame rate (None if unknown)
+
+        Returns:
+            Frames per second to decode
+        """
+        fps = float(settings.SHOT_DETECT_FPS)
+        if duration > 0:
+            fps = min(fps, settings.SHOT_DETECT_MAX_FRAMES / duration)
+        if source_fps:
+            fps = min(fps, source_fps)
+        return max(fps, 0.5)
+
+    def detect(self, video_path: str, duration: float, source_fps: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Detect shots with one small decode of the video
+
+        Args:
+            video_path: Video file
+            duration: Video duration in seconds
+            source_fps: Source frame rate (None if unknown)
+
+        Returns:
+            [{"start", "end", "motion", "brightness"}] covering the video
+        """
+        fps = self.sample_fps(duration, source_fps)
+        times, frames = frame_sampler.sample_rate(video_path, fps, size=self.DETECT_SIZE, fit="stretch")
+        return self.shots_from_frames(times, frames, duration)
+
+    def detect_from_raw(self, raw_path: str, fps: float, duration: float) -> List[Dict[str, Any]]:
+        """
+        Detect shots from the rgb24 frames written by the ingest pass (DETECT_SIZE, fps)
+
+        Args:
+            raw_path: Raw rgb24 frame file
+            fps: Rate the frames were written at
+            duration: Video duration in seconds
+
+        Returns:
+            [{"start", "end", "motion", "brightness"}] covering the video
+        """
+        width, height = self.DETECT_SIZE
+        data = np.fromfile(raw_path, dtype=np.uint8)
+        frame_count = data.size // (width * height * 3)
+        frames = data[:frame_count * width * height * 3].reshape(frame_count, height, width, 3)
+        times = [index / fps for index in range(frame_count)]
+        return self.shots_from_frames(times, frames, duration)
+
+    def shots_from_frames(self, times: List[float], frames, duration: float) -> List[Dict[str, Any]]:
+        """
+        Split sampled frames into shots
+
+        Args:
+            times: Frame times in seconds
+            frames: HxWx3 uint8 RGB frames (list or array)
+            duration: Video duration in seconds
+
+        Returns:
+            [{"start", "end", "motion", "brightness"}], one shot covering the video if nothing was decoded
+        """
+        end_of_video = duration or (times[-1] if len(times) else 0.0)
+        if len(frames) == 0:
+            return [self._shot(0.0, end_of_video, [], [])] if end_of_video > 0 else []
+
+        # Per frame: mean luma, and mean absolute difference with the previous frame (0 for the first)
+        frame_count = len(frames)
+        brightness = np.zeros(frame_count, dtype=np.float32)
+        differences = np.zeros(frame_count, dtype=np.float32)
+        previous = None
+        for index in range(frame_count):
+            pixels = frames[index].astype(np.float32) / 255.0
+            brightness[index] = float((pixels @ self.LUMA).mean())
+            if previous is not None:
+                differences[index] = float(np.abs(pixels - previous).mean())
+            previous = pixels
+
+        cuts = self._find_cuts(times, differences)
+
+        shots = []
+        bounds = [0] + cuts + [frame_count]
+        for shot_index, (first, last) in enumerate(zip(bounds[:-1], bounds[1:])):
+            start = 0.0 if shot_index == 0 else float(times[first])
+            end = end_of_video if last == frame_count else float(times[last])
+            # The difference into the shot's first frame is the cut itself, not motion
+            shots.append(self._shot(start, end, differences[first + 1:last], brightness[first:last]))
+
+        logger.info(f"🎬 Detected {len(shots)} shots from {frame_count} frames")
+        return shots
+
+    def _find_cuts(self, times: List[float], differences: np.ndarray) -> List[int]:
+        """Indexes of the frames that start a new shot"""
+        cuts = []
+        last_cut_time = times[0]
+        for index in range(1, len(differences)):
+            history = differences[max(1, index - self.HISTORY):index]
+            baseline = float(np.median(history)) if len(history) else 0.0
+            is_cut = (
+                differences[index] >= settings.SHOT_CUT_THRESHOLD
+                and differences[index] >= settings.SHOT_ADAPTIVE_RATIO * baseline
+                and times[index] - last_cut_time >= settings.SHOT_MIN_SECONDS
+            )
+            if is_cut:
+                cuts.append(index)
+                last_cut_time = times[index]
+        return cuts
+
+    def _shot(self, start: float, end: float, motion, brightness) -> Dict[str, Any]:
+        return {
+            "start": round(start, 3),
+            "end": round(end, 3),
+            "motion": round(float(np.mean(motion)), 4) if len(motion) else 0.0,
+            "brightness": round(float(np.mean(brightness)), 4) if len(brightness) else None
+        }
+
+    def pick_thumbnail_time(self, shots: Optional[List[Dict[str, Any]]], default: float = 2.0) -> float:
+        """
+        Middle of the steadiest well-lit shot (at least SHOT_MIN_SECONDS long)
+
+        Args:
+            shots: Shots from the media index
+            default: Time to use without shots
+
+        Returns:
+            Thumbnail time in seconds
+        """
+        candidates = [
+            shot for shot in shots or []
+            if shot["end"] - shot["start"] >= settings.SHOT_MIN_SECONDS
+            and (shot.get("brightness") is None or 0.2 <= shot["brightness"] <= 0.85)
+        ]
+        if not candidates:
+            return default
+        shot = min(candidates, key=lambda candidate: candidate.get("motion") or 0.0)
+        return round((shot["start"] + shot["end"]) / 2, 3)
+
+    def snap_to_shot_start(self, shots: Optional[List[Dict[str, Any]]], time: float) -> float:
+        """
+        Move a clip in-point onto the nearest shot start within SHOT_SNAP_SECONDS, so a
+        rendered clip never opens on the last frames of the previous shot
+
+        Args:
+            shots: Shots from the media index
+            time: Requested in-point in seconds
+
+        Returns:
+            Snapped in-point (unchanged when no shot starts nearby)
+        """
+        starts = [shot["start"] for shot in shots or []]
+        if not starts:
+            return time
+        nearest = min(starts, key=lambda start: abs(start - time))
+        return nearest if abs(nearest - time) <= settings.SHOT_SNAP_SECONDS else time
+
+# Create singleton instance
+shot_detector = ShotDetector()
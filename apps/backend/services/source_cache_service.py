@@ -0,0 +1,293 @@
+"""
+Shared on-disk cache of source videos for Celery workers
+Content-addressed by S3 key + ETag, bounded by a byte budget with LRU eviction
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any
+
+from core.config import settings
+from services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+class SourceCacheService:
+    """
+    Size-bounded LRU cache of S3 source videos shared by every worker process of a host.
+
+    Entries are immutable files named after the S3 key and its ETag, so a re-uploaded
+    object never serves stale bytes. Concurrent tasks are serialized with flock: one
+    per entry while it is being filled, and one for eviction and the shared metrics.
+    """
+
+    STATS_FILE = "stats.json"
+    COUNTERS = ("hits", "misses", "bytes_from_cache", "bytes_downloaded", "evictions")
+
+    def __init__(self):
+        self.enabled = settings.SOURCE_CACHE_ENABLED
+        self.cache_dir = settings.SOURCE_CACHE_DIR
+        self.max_bytes = settings.SOURCE_CACHE_MAX_BYTES
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.locks_dir = os.path.join(self.cache_dir, "locks")
+
+        if self.enabled:
+            try:
+                os.makedirs(self.objects_dir, exist_ok=True)
+                os.makedirs(self.locks_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Source cache disabled, cannot create {self.cache_dir}: {e}")
+                self.enabled = False
+
+    def fetch(self, s3_key: str, dest_path: str) -> bool:
+        """
+        Materialize an S3 object at dest_path, downloading it into the cache on a miss
+
+        Args:
+            s3_key: Key of the source object
+            dest_path: Local path the caller will read from
+
+        Returns:
+            True if dest_path now holds the object's bytes
+        """
+        if not self.enabled:
+            return self._download(s3_key, dest_path)
+
+        metadata = s3_service.get_file_metadata(s3_key)
+        if not metadata:
+            logger.warning(f"⚠️ Source cache: cannot stat {s3_key}, downloading without cache")
+            return self._download(s3_key, dest_path)
+
+        entry_path = self._entry_path(s3_key, metadata["etag"])
+
+        if self._serve_hit(s3_key, entry_path, dest_path):
+            return True
+
+        with self._lock(os.path.basename(entry_path)):
+            # Another task may have filled the entry while we waited for the lock
+            if self._serve_hit(s3_key, entry_path, dest_path):
+                return True
+
+            partial_path = f"{entry_path}.{os.getpid()}.part"
+            if not self._download(s3_key, partial_path):
+                self._remove(partial_path)
+                return False
+            # Linked before it is published, so a concurrent eviction cannot race the caller's copy
+            linked = self._link(partial_path, dest_path)
+            self._record(misses=1, bytes_downloaded=os.path.getsize(partial_path))
+            os.replace(partial_path, entry_path)
+            logger.info(f"📥 Source cache miss: {s3_key}")
+
+        self._evict()
+        return linked
+
+    def put(self, s3_key: str, local_path: str) -> bool:
+        """
+        Seed the cache with a file that was just uploaded to s3_key
+
+        Args:
+            s3_key: Key the file was uploaded to
+            local_path: Local copy of the uploaded bytes
+
+        Returns:
+            True if the entry was stored
+        """
+        if not self.enabled:
+            return False
+
+        metadata = s3_service.get_file_metadata(s3_key)
+        if not metadata:
+            return False
+
+        entry_path = self._entry_path(s3_key, metadata["etag"])
+        with self._lock(os.path.basename(entry_path)):
+            if not os.path.exists(entry_path):
+                partial_path = f"{entry_path}.{os.getpid()}.part"
+                if not self._link(local_path, partial_path):
+                    return False
+                os.replace(partial_path, entry_path)
+                logger.info(f"📦 Source cache seeded: {s3_key}")
+
+        self._evict()
+        return True
+
+    def invalidate(self, s3_key: str) -> int:
+        """Drop every cached version of an S3 key (e.g. after deleting the object)"""
+        if not self.enabled:
+            return 0
+
+        prefix = self._key_digest(s3_key)
+        removed = 0
+        for name in os.listdir(self.objects_dir):
+            if name.startswith(prefix) and not name.endswith(".part"):
+                self._remove(os.path.join(self.objects_dir, name))
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return host-wide hit/miss counters and current disk usage"""
+        if not self.enabled:
+            return {"enabled": False}
+
+        with self._lock("global"):
+            stats = self._read_counters()
+
+        entries = self._list_entries()
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "enabled": True,
+            "cache_dir": self.cache_dir,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0
+        })
+        return stats
+
+    def _key_digest(self, s3_key: str) -> str:
+        return hashlib.sha256(s3_key.encode("utf-8")).hexdigest()[:32]
+
+    def _entry_path(self, s3_key: str, etag: str) -> str:
+        safe_etag = "".join(c for c in etag if c.isalnum() or c == "-")
+        return os.path.join(self.objects_dir, f"{self._key_digest(s3_key)}_{safe_etag}")
+
+    @contextmanager
+    def _lock(self, name: str):
+        """Inter-process exclusive lock backed by flock"""
+        with open(os.path.join(self.locks_dir, f"{name}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _serve_hit(self, s3_key: str, entry_path: str, dest_path: str) -> bool:
+        """
+        Link a cached entry to dest_path
+
+        Eviction takes no per-entry lock, so the entry can disappear between any check
+        and the link: the link is attempted directly and a missing entry is a miss.
+        Once linked, dest_path keeps the bytes even if the entry is evicted.
+
+        Returns:
+            True on a hit, False if the entry is absent (the caller downloads it)
+        """
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            try:
+                os.link(entry_path, dest_path)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                shutil.copyfile(entry_path, dest_path)
+            size = os.path.getsize(dest_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"⚠️ Source cache could not materialize {dest_path}: {e}")
+            return False
+
+        self._touch(entry_path)
+        self._record(hits=1, bytes_from_cache=size)
+        logger.info(f"⚡ Source cache hit: {s3_key}")
+        return True
+
+    def _download(self, s3_key: str, dest_path: str) -> bool:
+        """Download an S3 object to dest_path over the pooled S3 client"""
+        return s3_service.download_to_path(s3_key, dest_path)
+
+    def _link(self, source_path: str, dest_path: str) -> bool:
+        """Hard-link (or copy across filesystems) so eviction never pulls a file from under a reader"""
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            try:
+                os.link(source_path, dest_path)
+            except OSError:
+                shutil.copyfile(source_path, dest_path)
+            return True
+        except OSError as e:
+            logger.warning(f"⚠️ Source cache could not materialize {dest_path}: {e}")
+            return False
+
+    def _touch(self, entry_path: str):
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _list_entries(self):
+        """Return (path, size, last_used) for every complete entry"""
+        entries = []
+        for name in os.listdir(self.objects_dir):
+            if name.endswith(".part"):
+                continue
+            path = os.path.join(self.objects_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its byte budget"""
+        with self._lock("global"):
+            entries = self._list_entries()
+            total_bytes = sum(size for _, size, _ in entries)
+            if total_bytes <= self.max_bytes:
+                return
+
+            evicted = 0
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total_bytes <= self.max_bytes:
+                    break
+                self._remove(path)
+                total_bytes -= size
+                evicted += 1
+
+            if evicted:
+                counters = self._read_counters()
+                counters["evictions"] += evicted
+                self._write_counters(counters)
+                logger.info(f"🧹 Source cache evicted {evicted} entries")
+
+    def _record(self, **deltas):
+        with self._lock("global"):
+            counters = self._read_counters()
+            for name, delta in deltas.items():
+                counters[name] += delta
+            self._write_counters(counters)
+
+    def _read_counters(self) -> Dict[str, int]:
+        counters = dict.fromkeys(self.COUNTERS, 0)
+        try:
+            with open(os.path.join(self.cache_dir, self.STATS_FILE)) as f:
+                counters.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return counters
+
+    def _write_counters(self, counters: Dict[str, int]):
+        stats_path = os.path.join(self.cache_dir, self.STATS_FILE)
+        partial_path = f"{stats_path}.{os.getpid()}.part"
+        counters["updated_at"] = time.time()
+        with open(partial_path, "w") as f:
+            json.dump(counters, f)
+        os.replace(partial_path, stats_path)
+
+# Create singleton instance
+source_cache_service = SourceCacheService()
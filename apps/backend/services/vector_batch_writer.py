@@ -0,0 +1,202 @@
+"""
+Batched vector writes with backpressure
+- Producers queue segments into a bounded buffer and get their (client-generated)
+  ID back at once; when the buffer is full they block, then fail, instead of
+  growing memory during a backfill
+- One flusher thread writes batches of VECTOR_WRITE_BATCH_SIZE, or whatever is
+  queued after VECTOR_WRITE_FLUSH_INTERVAL_MS, retrying with jittered backoff
+- flush() waits for everything queued so far; close() flushes and stops (at exit
+  and on Celery worker shutdown)
+- IDs of dropped batches are kept until their producer claims them with pop_failed(),
+  so nothing goes on referencing a vector that was never stored
+"""
+
+import atexit
+import queue
+import random
+import threading
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class VectorBatchWriter:
+    """Buffer segment vectors and write them in bulk"""
+
+    RETRY_BASE_DELAY = 0.5  # seconds
+    RETRY_MAX_DELAY = 10.0  # seconds
+    POLL_INTERVAL = 0.02    # seconds between checks for an explicit flush
+    FAILED_IDS_KEPT = 10000 # Dropped IDs remembered for pop_failed (oldest forgotten first)
+
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], None]):
+        """
+        Args:
+            write_batch: Bulk write of [{"id", "vector", "properties"}], raising on failure
+        """
+        self.write_batch = write_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=settings.VECTOR_WRITE_BUFFER)
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._failed_ids: Dict[str, None] = {}  # Insertion-ordered set
+        self.written = 0
+        self.failed = 0
+
+    def add(self, vector: List[float], properties: Dict[str, Any]) -> str:
+        """
+        Queue one segment (blocks while the buffer is full)
+
+        Args:
+            vector: Embedding
+            properties: Segment metadata
+
+        Returns:
+            ID the segment will be stored under
+
+        Raises:
+            RuntimeError: The buffer stayed full for VECTOR_WRITE_PUT_TIMEOUT seconds, or the writer is closed
+        """
+        if self._closed:
+            raise RuntimeError("Vector batch writer is closed")
+        self._ensure_flusher()
+
+        object_id = str(uuid.uuid4())
+        try:
+            self._queue.put(
+                {"id": object_id, "vector": vector, "properties": properties},
+                timeout=settings.VECTOR_WRITE_PUT_TIMEOUT
+            )
+        except queue.Full:
+            raise RuntimeError(f"Vector write buffer full ({settings.VECTOR_WRITE_BUFFER} pending) for {settings.VECTOR_WRITE_PUT_TIMEOUT}s")
+        return object_id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything queued so far now
+
+        Args:
+            timeout: Seconds to wait (None = until done)
+
+        Returns:
+            True if the buffer drained in time (failed batches count as done, see failed)
+        """
+        self._flush_requested.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def pop_failed(self, object_ids: List[str]) -> List[str]:
+        """
+        IDs among object_ids whose batch was dropped after its retries (each reported once)
+
+        Args:
+            object_ids: IDs returned by add
+
+        Returns:
+            The dropped ones, in input order
+        """
+        with self._lock:
+            failed = [object_id for object_id in object_ids if object_id in self._failed_ids]
+            for object_id in failed:
+                del self._failed_ids[object_id]
+        return failed
+
+    def close(self, timeout: float = 30.0):
+        """Flush and stop the flusher thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            flusher = self._flusher
+
+        if flusher is None:
+            return
+        if not self.flush(timeout):
+            logger.error(f"❌ Vector writer closed with {self._queue.unfinished_tasks} segments unwritten")
+        self._queue.put(_STOP)
+        flusher.join(timeout=5)
+        logger.info(f"🧮 Vector writer closed ({self.written} written, {self.failed} failed)")
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self._queue.unfinished_tasks, "written": self.written, "failed": self.failed}
+
+    def run_with_retries(self, operation: Callable[[], Any], description: str) -> Any:
+        """Run a store operation with jittered exponential backoff (raises after the last attempt)"""
+        for attempt in range(settings.VECTOR_WRITE_MAX_RETRIES + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == settings.VECTOR_WRITE_MAX_RETRIES:
+                    raise
+                delay = random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** (attempt + 1)))
+                logger.warning(f"⚠️ {description} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="vector-writer", daemon=True)
+                self._flusher.start()
+                atexit.register(self.close)
+
+    def _flush_loop(self):
+        batch_size = settings.VECTOR_WRITE_BATCH_SIZE
+        interval = settings.VECTOR_WRITE_FLUSH_INTERVAL_MS / 1000
+
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+
+            # Fill the batch until it is full, the interval is over, or a flush is waiting on it
+            batch = [first]
+            deadline = time.monotonic() + interval
+            stop = False
+            while len(batch) < batch_size and time.monotonic() < deadline:
+                try:
+                    item = self._queue.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    if self._flush_requested.is_set():
+                        break
+                    continue
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            if self._queue.empty():
+                self._flush_requested.clear()
+
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.run_with_retries(lambda: self.write_batch(batch), f"Vector batch write of {len(batch)}")
+            self.written += len(batch)
+            logger.info(f"🧮 Wrote {len(batch)} segment vectors in one batch")
+        except Exception as e:
+            self.failed += len(batch)
+            with self._lock:
+                self._failed_ids.update(dict.fromkeys(item["id"] for item in batch))
+                for object_id in list(self._failed_ids)[:max(0, len(self._failed_ids) - self.FAILED_IDS_KEPT)]:
+                    del self._failed_ids[object_id]
+            logger.error(f"❌ Dropped {len(batch)} segment vectors after {settings.VECTOR_WRITE_MAX_RETRIES} retries: {e}")
@@ -0,0 +1,443 @@
+"""
+Embedded vector index for video segment embeddings (no external service)
+- Vectors live in a memory-mapped float32 file, one row per segment; metadata and
+  add/update/delete operations in an append-only JSON lines log. Every process
+  (API, workers) maps the same files and replays new log entries before each call
+- Search pre-filters on property_id, scene_type, confidence (and any extra equality
+  filters) with NumPy masks, then scores the remaining rows exactly (flat) or, for
+  large candidate sets, through an HNSW graph (hnswlib, optional)
+- Writers serialize on a file lock; deleted rows are tombstoned
+"""
+
+import os
+import json
+import uuid
+import fcntl
+import threading
+import logging
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class LocalVectorIndex:
+    """Cosine-similarity index persisted to memory-mapped files"""
+
+    VECTORS_FILE = "vectors.f32"
+    LOG_FILE = "segments.jsonl"
+    LOCK_FILE = "index.lock"
+    HNSW_FILE = "hnsw.bin"
+    HNSW_META_FILE = "hnsw.json"
+
+    # Metadata kept as arrays for pre-filtering
+    CODED_FIELDS = ("property_id", "scene_type")
+
+    def __init__(self, directory: str, dim: int = 512, hnsw_threshold: int = 20000):
+        """
+        Args:
+            directory: Index directory (created if missing)
+            dim: Vector dimension
+            hnsw_threshold: Filtered candidate count above which search goes through HNSW
+        """
+        self.directory = directory
+        self.dim = dim
+        self.hnsw_threshold = hnsw_threshold
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._log_offset = 0
+        self._vectors: Optional[np.memmap] = None
+
+        # Segment metadata (index = position in the log, vector_rows = row in the vectors file)
+        self._ids: List[str] = []
+        self._vector_rows: List[int] = []
+        self._rows: Dict[str, int] = {}
+        self._properties: List[Dict[str, Any]] = []
+        self._alive: List[bool] = []
+        self._confidence: List[float] = []
+        self._codes: Dict[str, Dict[Optional[str], int]] = {field: {} for field in self.CODED_FIELDS}
+        self._coded: Dict[str, List[int]] = {field: [] for field in self.CODED_FIELDS}
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+
+        self._hnsw = None
+        self._hnsw_rows = 0
+        self._hnsw_deleted: set = set()  # Labels marked deleted in the graph (persisted with it)
+
+        self._refresh()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ------------------------------------------------------------------ writes
+
+    def add(self, vector: List[float], properties: Dict[str, Any]) -> str:
+        """
+        Add one segment
+
+        Args:
+            vector: Embedding (normalized here)
+            properties: Segment metadata (video_id, property_id, scene_type, confidence_score, ...)
+
+        Returns:
+            ID of the new segment
+        """
+        return self.add_many([vector], [properties])[0]
+
+    def add_many(
+        self,
+        vectors: List[List[float]],
+        properties: List[Dict[str, Any]],
+        object_ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Add segments in one locked write of the vectors file and the log
+
+        Args:
+            vectors: Embeddings (normalized here)
+            properties: Metadata of each segment
+            object_ids: IDs to use (generated when None; existing IDs are skipped, so retries are safe)
+
+        Returns:
+            IDs of the segments, in order
+        """
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {matrix.shape[1]}")
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        object_ids = object_ids or [str(uuid.uuid4()) for _ in vectors]
+
+        with self._write_lock():
+            self._refresh()
+            new = [index for index, object_id in enumerate(object_ids) if object_id not in self._rows]
+            if new:
+                # The log records the rows: vectors written by a crashed writer are simply never referenced
+                first_row = self._vector_file_rows()
+                with open(self._path(self.VECTORS_FILE), "ab") as vectors_file:
+                    vectors_file.write(np.ascontiguousarray(matrix[new]).tobytes())
+                self._append_log_entries([
+                    {"op": "add", "id": object_ids[index], "row": first_row + offset, "properties": properties[index]}
+                    for offset, index in enumerate(new)
+                ])
+
+        self._refresh()
+        return object_ids
+
+    def update(self, object_id: str, properties: Dict[str, Any]) -> bool:
+        """Merge properties into a segment"""
+        with self._lock:
+            self._refresh()
+            if object_id not in self._rows:
+                return False
+        with self._write_lock():
+            self._append_log({"op": "update", "id": object_id, "properties": properties})
+        self._refresh()
+        return True
+
+    def delete(self, object_ids: List[str]) -> int:
+        """Tombstone segments, returns how many existed"""
+        with self._lock:
+            self._refresh()
+            existing = [object_id for object_id in object_ids if self._alive_id(object_id)]
+        if existing:
+            with self._write_lock():
+                self._append_log({"op": "delete", "ids": existing})
+            self._refresh()
+        return len(existing)
+
+    def delete_where(self, field: str, value: Any) -> int:
+        """Tombstone every live segment whose property equals value"""
+        with self._lock:
+            self._refresh()
+            object_ids = [
+                object_id for row, object_id in enumerate(self._ids)
+                if self._alive[row] and self._properties[row].get(field) == value
+            ]
+        return self.delete(object_ids)
+
+    @contextmanager
+    def _write_lock(self):
+        """Cross-process writer lock (row numbers and log order must agree)"""
+        with open(self._path(self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_log(self, entry: Dict[str, Any]):
+        self._append_log_entries([entry])
+
+    def _append_log_entries(self, entries: List[Dict[str, Any]]):
+        with open(self._path(self.LOG_FILE), "a") as log_file:
+            log_file.write("".join(json.dumps(entry, default=str) + "\n" for entry in entries))
+
+    # ------------------------------------------------------------------ reads
+
+    def search(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        property_id: Optional[str] = None,
+        scene_type: Optional[str] = None,
+        min_confidence: float = 0.0,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest segments by cosine similarity among those matching the filters
+
+        Args:
+            query_vector: Query embedding
+            limit: Maximum results
+            property_id: Only segments of this property
+            scene_type: Only segments of this scene type
+            min_confidence: Minimum confidence_score
+            where: Extra equality filters on properties (e.g. {"is_viral_reference": True})
+
+        Returns:
+            Segment properties with id, similarity_score and distance, best first
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            self._refresh()
+            if not self._ids or limit <= 0:
+                return []
+
+            candidates = np.flatnonzero(self._filter_mask(property_id, scene_type, min_confidence, where))
+            if candidates.size == 0:
+                return []
+
+            if candidates.size > self.hnsw_threshold and self._ensure_hnsw():
+                rows, scores = self._search_hnsw(query, candidates, limit)
+            else:
+                rows, scores = self._search_flat(query, candidates, limit)
+
+            return [
+                {
+                    **self._properties[row],
+                    "id": self._ids[row],
+                    "similarity_score": round(float(score), 6),
+                    "distance": round(1.0 - float(score), 6)
+                }
+                for row, score in zip(rows, scores)
+            ]
+
+    def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+        """Properties of a live segment"""
+        with self._lock:
+            self._refresh()
+            if not self._alive_id(object_id):
+                return None
+            return {**self._properties[self._rows[object_id]], "id": object_id}
+
+    def live_properties(self) -> List[Dict[str, Any]]:
+        """Properties of every live segment"""
+        with self._lock:
+            self._refresh()
+            return [
+                {**properties, "id": object_id}
+                for object_id, properties, alive in zip(self._ids, self._properties, self._alive)
+                if alive
+            ]
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(sum(self._alive))
+
+    def _alive_id(self, object_id: str) -> bool:
+        row = self._rows.get(object_id)
+        return row is not None and self._alive[row]
+
+    def _filter_mask(
+        self,
+        property_id: Optional[str],
+        scene_type: Optional[str],
+        min_confidence: float,
+        where: Optional[Dict[str, Any]]
+    ) -> np.ndarray:
+        arrays = self._get_arrays()
+        mask = arrays["alive"].copy()
+
+        for field, value in (("property_id", property_id), ("scene_type", scene_type)):
+            if value is not None:
+                code = self._codes[field].get(value)
+                if code is None:
+                    return np.zeros_like(mask)
+                mask &= arrays[field] == code
+
+        if min_confidence > 0:
+            mask &= arrays["confidence"] >= min_confidence
+
+        for field, value in (where or {}).items():
+            rows = np.flatnonzero(mask)
+            keep = [row for row in rows if self._properties[row].get(field) == value]
+            mask = np.zeros_like(mask)
+            mask[keep] = True
+
+        return mask
+
+    def _search_flat(self, query: np.ndarray, candidates: np.ndarray, limit: int):
+        """Exact scores of the candidates (one gather + one matrix-vector product)"""
+        scores = self._vectors[self._get_arrays()["vector_row"][candidates]] @ query
+        if candidates.size > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-scores[top])]
+        return candidates[top].tolist(), scores[top].tolist()
+
+    def _search_hnsw(self, query: np.ndarray, candidates: np.ndarray, limit: int):
+        """Approximate search restricted to the candidates"""
+        allowed = np.zeros(len(self._ids), dtype=bool)
+        allowed[candidates] = True
+        labels, distances = self._hnsw.knn_query(
+            query, k=min(limit, candidates.size), filter=lambda label: bool(allowed[label])
+        )
+        # hnswlib cosine distance is 1 - similarity
+        return labels[0].tolist(), (1.0 - distances[0]).tolist()
+
+    # ------------------------------------------------------------------ HNSW
+
+    def _ensure_hnsw(self) -> bool:
+        """Build (or load, then extend) the HNSW graph; False when hnswlib is unavailable"""
+        try:
+            import hnswlib
+        except ImportError:
+            return False
+
+        row_count = len(self._ids)
+        if self._hnsw is None:
+            index = hnswlib.Index(space="cosine", dim=self.dim)
+            saved_rows, saved_deleted = 0, set()
+            if os.path.exists(self._path(self.HNSW_FILE)) and os.path.exists(self._path(self.HNSW_META_FILE)):
+                with open(self._path(self.HNSW_META_FILE)) as meta_file:
+                    meta = json.load(meta_file)
+                saved_rows, saved_deleted = meta.get("rows", 0), set(meta.get("deleted", []))
+            if 0 < saved_rows <= row_count:
+                index.load_index(self._path(self.HNSW_FILE), max_elements=max(row_count * 2, 1024), allow_replace_deleted=False)
+            else:
+                saved_rows, saved_deleted = 0, set()
+                index.init_index(max_elements=max(row_count * 2, 1024), ef_construction=200, M=16)
+            index.set_ef(128)
+            self._hnsw = index
+            self._hnsw_rows = saved_rows
+            # The saved graph already holds the deletions made before it was written
+            self._hnsw_deleted = saved_deleted
+            for row in range(saved_rows):
+                if not self._alive[row]:
+                    self._mark_hnsw_deleted(row)
+
+        if self._hnsw_rows < row_count:
+            if self._hnsw.get_max_elements() < row_count:
+                self._hnsw.resize_index(row_count * 2)
+            new_rows = np.arange(self._hnsw_rows, row_count)
+            vector_rows = self._get_arrays()["vector_row"][self._hnsw_rows:row_count]
+            self._hnsw.add_items(np.asarray(self._vectors[vector_rows]), new_rows)
+            for row in new_rows:
+                if not self._alive[row]:
+                    self._mark_hnsw_deleted(int(row))
+            self._hnsw_rows = row_count
+            self._save_hnsw()
+
+        return True
+
+    def _mark_hnsw_deleted(self, row: int):
+        """Mark a label deleted once (hnswlib raises on a label that is already deleted)"""
+        if row in self._hnsw_deleted:
+            return
+        try:
+            self._hnsw.mark_deleted(row)
+        except RuntimeError:
+            pass  # Deleted in a graph saved without its deleted labels
+        self._hnsw_deleted.add(row)
+
+    def _save_hnsw(self):
+        """Write the graph then its row count and deleted labels, each through an atomic rename (readers never see half a file)"""
+        try:
+            temporary_path = self._path(f"{self.HNSW_FILE}.{os.getpid()}.tmp")
+            self._hnsw.save_index(temporary_path)
+            os.replace(temporary_path, self._path(self.HNSW_FILE))
+            with open(temporary_path, "w") as meta_file:
+                json.dump({"rows": self._hnsw_rows, "deleted": sorted(self._hnsw_deleted)}, meta_file)
+            os.replace(temporary_path, self._path(self.HNSW_META_FILE))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not persist HNSW graph: {e}")
+
+    # ------------------------------------------------------------------ log replay
+
+    def _refresh(self):
+        """Replay log entries written since the last call (by this or another process)"""
+        with self._lock:
+            log_path = self._path(self.LOG_FILE)
+            if not os.path.exists(log_path) or os.path.getsize(log_path) == self._log_offset:
+                return
+
+            with open(log_path) as log_file:
+                log_file.seek(self._log_offset)
+                while True:
+                    line = log_file.readline()
+                    if not line.endswith("\n"):
+                        break  # Partial line of a concurrent write: next refresh
+                    self._log_offset += len(line.encode())
+                    self._apply(json.loads(line))
+
+            self._arrays = None
+            needed_rows = max(self._vector_rows) + 1 if self._vector_rows else 0
+            if needed_rows and (self._vectors is None or self._vectors.shape[0] < needed_rows):
+                self._vectors = np.memmap(
+                    self._path(self.VECTORS_FILE), dtype=np.float32, mode="r",
+                    shape=(self._vector_file_rows(), self.dim)
+                )
+
+    def _vector_file_rows(self) -> int:
+        vectors_path = self._path(self.VECTORS_FILE)
+        return os.path.getsize(vectors_path) // (self.dim * 4) if os.path.exists(vectors_path) else 0
+
+    def _apply(self, entry: Dict[str, Any]):
+        op = entry["op"]
+        if op == "add":
+            properties = entry["properties"]
+            self._rows[entry["id"]] = len(self._ids)
+            self._ids.append(entry["id"])
+            self._vector_rows.append(entry["row"])
+            self._properties.append(properties)
+            self._alive.append(True)
+            self._confidence.append(float(properties.get("confidence_score") or 0.0))
+            for field in self.CODED_FIELDS:
+                self._coded[field].append(self._code(field, properties.get(field)))
+        elif op == "update":
+            row = self._rows.get(entry["id"])
+            if row is None:
+                return
+            self._properties[row] = {**self._properties[row], **entry["properties"]}
+            self._confidence[row] = float(self._properties[row].get("confidence_score") or 0.0)
+            for field in self.CODED_FIELDS:
+                self._coded[field][row] = self._code(field, self._properties[row].get(field))
+        elif op == "delete":
+            for object_id in entry["ids"]:
+                row = self._rows.get(object_id)
+                if row is not None and self._alive[row]:
+                    self._alive[row] = False
+                    if self._hnsw is not None and row < self._hnsw_rows:
+                        self._mark_hnsw_deleted(row)
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _get_arrays(self) -> Dict[str, np.ndarray]:
+        """Filter arrays, rebuilt after log entries were applied"""
+        if self._arrays is None:
+            self._arrays = {
+                "alive": np.array(self._alive, dtype=bool),
+                "vector_row": np.array(self._vector_rows, dtype=np.int64),
+                "confidence": np.array(self._confidence, dtype=np.float32),
+                **{field: np.array(self._coded[field], dtype=np.int32) for field in self.CODED_FIELDS}
+            }
+        return self._arrays
@@ -2,16 +2,15 @@
 Service for analyzing uploaded videos into segments with AI-powered scene detection and description.
 
 This service handles:
-1. Scene detection with PySceneDetect
+1. Shot detection on small frames (reused from the ingest media index)
 2. Frame analysis with BLIP for descriptions
 3. Visual embeddings with OpenCLIP
 4. Storage in Weaviate vector database
 """
 
 import os
-import cv2
-import torch
 import numpy as np
+from PIL import Image
 from typing import List, Dict, Any, Optional, Tuple
 import tempfile
 import logging
@@ -19,20 +18,20 @@ from datetime import datetime
 import json
 
 # Video processing
-from scenedetect import VideoManager, SceneManager
-from scenedetect.detectors import ContentDetector
 import ffmpeg
 
-# AI models for analysis
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from PIL import Image
-# import open_clip  # Temporarily disabled - will install later
-
 # Database
 from sqlalchemy.orm import Session
 from models.video import Video
 from models.video_segment import VideoSegment
+from models.video_media_index import VideoMediaIndex
 from services.weaviate_service import weaviate_service
+from services.frame_sampler import frame_sampler
+from services.shot_detector import shot_detector
+from services.caption_engine import caption_engine
+from services.image_embedding_service import image_embedding_service
+from services.inference_cache import inference_cache
+from services.inference_client import inference_client
 from core.database import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -40,35 +39,22 @@ logger = logging.getLogger(__name__)
 class VideoAnalysisService:
     """Service for comprehensive video analysis and segmentation"""
     
+    # BLIP resizes its input to 384x384 (stretched); OpenCLIP center-crops a native-aspect frame
+    ANALYSIS_FRAME_SIZE = (384, 384)
+    EMBEDDING_INPUT = "native-aspect"  # Part of the embedding cache key (stretched inputs were cached before)
+    
     def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self._blip_processor = None
-        self._blip_model = None
-        self._clip_model = None
-        self._clip_preprocess = None
-        self._clip_tokenizer = None
-        
-    def _load_models(self):
-        """Lazy load AI models to save memory"""
-        if self._blip_processor is None:
-            logger.info("Loading BLIP model for image captioning...")
-            self._blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-            self._blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base").to(self.device)
-            
-        if self._clip_model is None:
-            logger.info("OpenCLIP temporarily disabled - using placeholder embeddings")
-            # TODO: Install open-clip-torch and uncomment this
-            # self._clip_model, _, self._clip_preprocess = open_clip.create_model_and_transforms('ViT-B-32', pretrained='openai')
-            # self._clip_tokenizer = open_clip.get_tokenizer('ViT-B-32')
-            # self._clip_model = self._clip_model.to(self.device)
+        # Models run in the inference sidecar when configured: the worker never loads them
+        self.use_sidecar = inference_client.is_configured
     
-    def analyze_video(self, video_id: str, video_path: str) -> bool:
+    def analyze_video(self, video_id: str, video_path: str, s3_key: Optional[str] = None) -> bool:
         """
         Main entry point for video analysis
         
         Args:
             video_id: Database ID of the video
             video_path: Local path to video file
+            s3_key: Key the file was downloaded from (lets the analysis reuse the ingest shots)
             
         Returns:
             bool: Success status
@@ -76,17 +62,51 @@ class VideoAnalysisService:
         try:
             logger.info(f"Starting analysis for video {video_id}")
             
-            # 1. Detect scenes in video
-            scenes = self._detect_scenes(video_path)
+            # 1. Probe once, then get the shots (from the ingest index when available)
+            video_info = self._get_video_info(video_path)
+            scenes = self._get_shots(video_id, video_path, video_info, s3_key)
             logger.info(f"Detected {len(scenes)} scenes")
             
-            # 2. Extract and analyze key frames for each scene
+            # 2. Extract the middle frame of every scene in one decode (native aspect), then analyze each scene
+            frames = frame_sampler.sample_at(
+                video_path,
+                [(start_time + end_time) / 2 for start_time, end_time in scenes],
+                size=self._sampling_size(video_info),
+                fit="crop"
+            )
+            
+            # Caption (stretched to the BLIP input) and embed (undistorted) every scene frame in batched passes
+            scene_frames = [frame for frame in frames if frame is not None]
+            captions = iter(self._generate_descriptions([self._caption_input(frame) for frame in scene_frames]))
+            embeddings = iter(self._generate_embeddings(scene_frames))
+            descriptions, frame_embeddings = [], []
+            for frame in frames:
+                descriptions.append(next(captions) if frame is not None else None)
+                frame_embeddings.append(next(embeddings) if frame is not None else None)
+            
+            # Stored with every vector so searches can pre-filter on them
+            segment_context = self._get_segment_context(video_id)
+            
             segments_data = []
-            for i, (start_time, end_time) in enumerate(scenes):
-                segment_data = self._analyze_scene(video_path, start_time, end_time, i)
+            scene_inputs = zip(scenes, frames, descriptions, frame_embeddings)
+            for i, ((start_time, end_time), frame, description, embedding) in enumerate(scene_inputs):
+                segment_data = self._analyze_scene(
+                    frame, description, embedding, video_info, start_time, end_time, i, segment_context
+                )
                 if segment_data:
                     segments_data.append(segment_data)
             
+            # Every vector of the video in bulk before its segments reference them; a segment
+            # whose vector was dropped keeps no embedding_id (no reference to a missing object)
+            unstored_ids = set(weaviate_service.flush_video_segments(
+                [segment_data["embedding_id"] for segment_data in segments_data]
+            ))
+            if unstored_ids:
+                logger.error(f"❌ {len(unstored_ids)} segment vectors of video {video_id} were not stored")
+                for segment_data in segments_data:
+                    if segment_data["embedding_id"] in unstored_ids:
+                        segment_data["embedding_id"] = ""
+            
             # 3. Save segments to database
             self._save_segments_to_db(video_id, segments_data)
             
@@ -101,92 +121,91 @@ class VideoAnalysisService:
             self._update_video_status(video_id, "analysis_failed")
             return False
     
-    def _detect_scenes(self, video_path: str, threshold: float = 30.0) -> List[Tuple[float, float]]:
+    def _get_shots(self, video_id: str, video_path: str, video_info: Dict[str, Any], s3_key: Optional[str]) -> List[Tuple[float, float]]:
         """
-        Detect scene changes in video using PySceneDetect
+        Shot boundaries of the video: the ones persisted at ingest when they describe this file,
+        otherwise detected on small frames (and persisted for the next consumers)
         
         Args:
+            video_id: Database ID of the video
             video_path: Path to video file
-            threshold: Sensitivity threshold for scene detection
+            video_info: Video metadata from _get_video_info
+            s3_key: Key the file was downloaded from (None = unknown, stored shots are not trusted)
             
         Returns:
             List of (start_time, end_time) tuples in seconds
         """
+        db = SessionLocal()
         try:
-            # Create video manager and scene manager
-            video_manager = VideoManager([video_path])
-            scene_manager = SceneManager()
-            
-            # Add content detector with specified threshold
-            scene_manager.add_detector(ContentDetector(threshold=threshold))
-            
-            # Start video manager
-            video_manager.start()
-            
-            # Perform scene detection
-            scene_manager.detect_scenes(frame_source=video_manager)
-            
-            # Get scene list
-            scene_list = scene_manager.get_scene_list()
-            
-            # Convert to seconds and return
-            scenes = []
-            for scene in scene_list:
-                start_sec = scene[0].get_seconds()
-                end_sec = scene[1].get_seconds()
-                scenes.append((start_sec, end_sec))
-            
-            video_manager.release()
-            return scenes
+            media_index = db.query(VideoMediaIndex).filter(VideoMediaIndex.video_id == video_id).first()
+            indexed = media_index is not None and s3_key is not None and media_index.s3_key == s3_key
+            if indexed and media_index.shots:
+                logger.info(f"Reusing {len(media_index.shots)} shots from the media index")
+                return media_index.shot_bounds()
+            
+            shots = shot_detector.detect(video_path, video_info.get("duration", 0), video_info.get("fps"))
+            if indexed:
+                media_index.shots = shots
+                db.commit()
+            return [(shot["start"], shot["end"]) for shot in shots]
             
         except Exception as e:
-            logger.error(f"Error detecting scenes: {e}")
+            logger.error(f"Error detecting shots: {e}")
             return []
+        finally:
+            db.close()
     
-    def _analyze_scene(self, video_path: str, start_time: float, end_time: float, scene_index: int) -> Optional[Dict[str, Any]]:
+    def _analyze_scene(
+        self,
+        frame: Optional[np.ndarray],
+        description: Optional[str],
+        embedding: Optional[np.ndarray],
+        video_info: Dict[str, Any],
+        start_time: float,
+        end_time: float,
+        scene_index: int,
+        segment_context: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Analyze a single scene segment
         
         Args:
-            video_path: Path to video file
+            frame: Representative (middle) frame of the scene, RGB
+            description: BLIP caption of the frame
+            embedding: L2-normalized 512-d OpenCLIP embedding of the frame (None if embedding failed)
+            video_info: Video metadata from _get_video_info
             start_time: Scene start time in seconds
             end_time: Scene end time in seconds
             scene_index: Index of the scene
+            segment_context: video_id, property_id and user_id stored with the vector
             
         Returns:
             Dictionary with analysis results
         """
         try:
-            # Extract middle frame as representative
-            mid_time = (start_time + end_time) / 2
-            frame = self._extract_frame(video_path, mid_time)
-            
             if frame is None:
                 return None
             
-            # Load models if needed
-            self._load_models()
-            
-            # Generate description with BLIP
-            description = self._generate_description(frame)
-            
-            # Generate visual embedding with CLIP
-            embedding = self._generate_embedding(frame)
-            
-            # Store embedding in Weaviate
-            embedding_id = self._store_embedding_in_weaviate(embedding, {
-                "description": description,
-                "start_time": start_time,
-                "end_time": end_time,
-                "duration": end_time - start_time,
-                "scene_index": scene_index
-            })
-            
             # Extract scene type from description (basic keyword matching)
             scene_type = self._extract_scene_type(description)
-            
-            # Get video metadata
-            video_info = self._get_video_info(video_path)
+            confidence_score = 0.8  # Default confidence
+            tags = self._extract_tags_from_description(description)
+            
+            # Store embedding in Weaviate (no vector rather than a meaningless one when embedding failed)
+            embedding_id = ""
+            if embedding is not None:
+                embedding_id = self._store_embedding_in_weaviate(embedding, {
+                    **(segment_context or {}),
+                    "description": description,
+                    "scene_type": scene_type,
+                    "confidence_score": confidence_score,
+                    "tags": tags,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": end_time - start_time,
+                    "scene_index": scene_index,
+                    "is_viral_reference": False
+                })
             
             return {
                 "start_time": start_time,
@@ -195,91 +214,113 @@ class VideoAnalysisService:
                 "description": description,
                 "scene_type": scene_type,
                 "embedding_id": embedding_id,
-                "confidence_score": 0.8,  # Default confidence
+                "confidence_score": confidence_score,
                 "frame_count": int((end_time - start_time) * video_info.get("fps", 30)),
                 "resolution_width": video_info.get("width"),
                 "resolution_height": video_info.get("height"),
-                "tags": self._extract_tags_from_description(description)
+                "tags": tags
             }
             
         except Exception as e:
             logger.error(f"Error analyzing scene {scene_index}: {e}")
             return None
     
-    def _extract_frame(self, video_path: str, time_sec: float) -> Optional[np.ndarray]:
-        """Extract a frame from video at specified time"""
+    def _get_segment_context(self, video_id: str) -> Dict[str, Any]:
+        """Owner and property of the video (empty values for viral templates, which have no Video row)"""
+        db = SessionLocal()
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            # Set position to desired time
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_number = int(time_sec * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            ret, frame = cap.read()
-            cap.release()
-            
-            if ret:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                return frame_rgb
-            return None
-            
+            video = db.query(Video).filter(Video.id == video_id).first()
+            return {
+                "video_id": video_id,
+                "property_id": video.property_id if video else None,
+                "user_id": video.user_id if video else None
+            }
         except Exception as e:
-            logger.error(f"Error extracting frame at {time_sec}s: {e}")
-            return None
+            logger.error(f"Error loading video {video_id} for segment context: {e}")
+            return {"video_id": video_id}
+        finally:
+            db.close()
+    
+    def _sampling_size(self, video_info: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Frame size with the displayed aspect ratio of the video and its short side at the BLIP
+        input size (falls back to a square center crop when the dimensions are unknown)
+        """
+        short_side = min(self.ANALYSIS_FRAME_SIZE)
+        width, height = video_info.get("width"), video_info.get("height")
+        if not width or not height:
+            return self.ANALYSIS_FRAME_SIZE
+        
+        # ffmpeg autorotates before filtering: a 90° phone video is decoded upright
+        if video_info.get("rotation", 0) % 180 == 90:
+            width, height = height, width
+        
+        scale = short_side / min(width, height)
+        return (max(short_side, round(width * scale / 2) * 2), max(short_side, round(height * scale / 2) * 2))
     
-    def _generate_description(self, frame: np.ndarray) -> str:
-        """Generate description for frame using BLIP"""
+    def _caption_input(self, frame: np.ndarray) -> np.ndarray:
+        """Stretch a frame to the BLIP input size (the sidecar then receives no larger frame than needed)"""
+        width, height = self.ANALYSIS_FRAME_SIZE
+        if frame.shape[:2] == (height, width):
+            return frame
+        return np.asarray(Image.fromarray(frame).resize((width, height), Image.BICUBIC))
+    
+    def _generate_descriptions(self, frames: List[np.ndarray]) -> List[str]:
+        """Generate BLIP descriptions for frames; frames seen before are served from the inference cache"""
+        return inference_cache.get_or_compute(
+            "caption",
+            caption_engine.model_version,
+            frames,
+            self._caption_frames,
+            cacheable=lambda caption: caption != caption_engine.FALLBACK_CAPTION
+        )
+    
+    def _caption_frames(self, frames: List[np.ndarray]) -> List[str]:
+        """Run BLIP on frames, on the inference sidecar when configured"""
+        if self.use_sidecar:
+            try:
+                return inference_client.caption(frames)
+            except Exception as e:
+                logger.warning(f"⚠️ Inference sidecar captioning failed, using in-process model: {e}")
+        
         try:
-            # Convert to PIL Image
-            image = Image.fromarray(frame)
-            
-            # Process with BLIP
-            inputs = self._blip_processor(image, return_tensors="pt").to(self.device)
-            out = self._blip_model.generate(**inputs, max_length=50)
-            description = self._blip_processor.decode(out[0], skip_special_tokens=True)
-            
-            return description
+            return caption_engine.caption(frames)
             
         except Exception as e:
             logger.error(f"Error generating description: {e}")
-            return "Scene description unavailable"
+            return [caption_engine.FALLBACK_CAPTION] * len(frames)
+    
+    def _generate_embeddings(self, frames: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Generate L2-normalized OpenCLIP embeddings for frames; frames seen before are served from the inference cache"""
+        return inference_cache.get_or_compute(
+            "embedding",
+            f"{image_embedding_service.model_version}|{self.EMBEDDING_INPUT}",
+            frames,
+            self._embed_frames,
+            encode=lambda embedding: np.asarray(embedding, dtype=np.float32).tobytes(),
+            decode=lambda data: np.frombuffer(data, dtype=np.float32).copy()
+        )
     
-    def _generate_embedding(self, frame: np.ndarray) -> np.ndarray:
-        """Generate visual embedding using OpenCLIP (placeholder for now)"""
+    def _embed_frames(self, frames: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Run OpenCLIP on frames in batched passes (sidecar when configured)"""
+        if self.use_sidecar:
+            try:
+                return list(inference_client.embed(frames))
+            except Exception as e:
+                logger.warning(f"⚠️ Inference sidecar embedding failed, using in-process model: {e}")
+        
         try:
-            # TODO: Implement OpenCLIP embedding generation
-            # For now, create a simple hash-based embedding
-            import hashlib
-            
-            # Create a simple feature vector from image statistics
-            mean_color = np.mean(frame, axis=(0, 1))
-            std_color = np.std(frame, axis=(0, 1))
-            
-            # Create hash from frame data for consistency
-            frame_bytes = frame.tobytes()
-            hash_obj = hashlib.md5(frame_bytes)
-            hash_int = int(hash_obj.hexdigest()[:8], 16)
-            
-            # Create 512-dimensional embedding (same as OpenCLIP would produce)
-            embedding = np.random.RandomState(hash_int).randn(512).astype(np.float32)
-            
-            # Add some actual image features
-            embedding[:3] = mean_color / 255.0  # Normalized RGB means
-            embedding[3:6] = std_color / 255.0  # Normalized RGB stds
-            
-            return embedding
+            return list(image_embedding_service.embed(frames))
             
         except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            return np.zeros(512)  # Default empty embedding
+            logger.error(f"Error generating embeddings: {e}")
+            return [None] * len(frames)
     
     def _store_embedding_in_weaviate(self, embedding: np.ndarray, metadata: Dict[str, Any]) -> str:
-        """Store embedding and metadata in Weaviate"""
+        """Queue embedding and metadata for the next bulk write to Weaviate (flushed at the end of the video)"""
         try:
             # Store in Weaviate vector database
-            object_id = weaviate_service.add_video_segment(
+            object_id = weaviate_service.queue_video_segment(
                 vector=embedding.tolist(),
                 properties=metadata
             )
@@ -336,9 +377,14 @@ class VideoAnalysisService:
             video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
             
             if video_stream:
+                # Display rotation: "rotate" tag (older ffmpeg) or display matrix side data
+                rotation = int(video_stream.get('tags', {}).get('rotate', 0))
+                for side_data in video_stream.get('side_data_list', []):
+                    rotation = int(side_data.get('rotation', rotation))
                 return {
                     "width": int(video_stream.get('width', 0)),
                     "height": int(video_stream.get('height', 0)),
+                    "rotation": rotation,
                     "fps": eval(video_stream.get('r_frame_rate', '30/1')),
                     "duration": float(video_stream.get('duration', 0))
                 }
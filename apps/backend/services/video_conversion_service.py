@@ -1,10 +1,16 @@
 import os
+import time
 import tempfile
 import subprocess
+import threading
 import logging
-from typing import Tuple, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Any, List
 from pathlib import Path
 
+from services.ffmpeg_runner import ffmpeg_runner, ProgressCallback
+from services.shot_detector import shot_detector
+
 logger = logging.getLogger(__name__)
 
 class VideoConversionService:
@@ -17,8 +23,20 @@ class VideoConversionService:
     VIDEO_CODEC = "libx264"
     AUDIO_CODEC = "aac"
     AUDIO_BITRATE = "128k"
+    AUDIO_SAMPLE_RATE = 44100
+    ACCEPTED_SAMPLE_RATES = (44100, 48000)  # Copied as-is, every player handles both
+    FRAMERATE_TOLERANCE = 1.0  # fps around TARGET_FRAMERATE copied as-is (29.97 phone footage)
     CRF = 23  # Constant Rate Factor for quality
     PRESET = "veryfast"
+    GOP_SIZE = 30  # One keyframe per second: any in-point is at most 1s of decode away
+    MAX_GOP_DURATION = 2.0  # Longer source GOPs get a mezzanine re-encode
+    ESTIMATED_ENCODE_SPEED = 1.5  # x realtime of the veryfast 1080x1920 encode on a worker (encode time avoided by a copy)
+    
+    # Scrub sprite sheet written during ingest (one 9:16 tile per interval)
+    SPRITE_COLUMNS = 10
+    SPRITE_ROWS = 10
+    SPRITE_TILE_WIDTH = 108
+    SPRITE_TILE_HEIGHT = 192
     
     def __init__(self):
         self.temp_dir = None
@@ -26,24 +44,31 @@ class VideoConversionService:
     def convert_to_standard_format(
         self, 
         input_file_path: str, 
-        output_file_path: str
+        output_file_path: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Convert video to standard format:
         - Resolution: 1080x1920 (portrait)
         - Framerate: 30 fps
         - Codec: H.264 (libx264), preset veryfast, CRF 23
+        - Fixed GOP of 30 frames (no scene-cut keyframes) so cuts land on keyframes
         - Audio: AAC 128 kbps
+        Streams the plan marks as compliant are copied instead of re-encoded.
         
         Args:
             input_file_path: Path to input video file
             output_file_path: Path to output video file
+            progress_callback: Optional callback receiving live encode progress
+            plan: Conversion plan from get_conversion_plan (None = transcode every stream)
             
         Returns:
             Dict with conversion result and metadata
         """
         try:
             logger.info(f"🎬 Converting video: {input_file_path} -> {output_file_path}")
+            started_at = time.monotonic()
             
             # Get input video metadata first
             input_metadata = self.get_video_metadata(input_file_path)
@@ -53,36 +78,25 @@ class VideoConversionService:
             ffmpeg_cmd = [
                 "ffmpeg", "-y",  # Overwrite output file
                 "-i", input_file_path,  # Input file
-                
-                # Video filters for scaling and padding
-                "-vf", f"scale={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:force_original_aspect_ratio=decrease,"
-                       f"pad={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black",
-                
-                # Video codec settings
-                "-c:v", self.VIDEO_CODEC,
-                "-preset", self.PRESET,
-                "-crf", str(self.CRF),
-                "-r", str(self.TARGET_FRAMERATE),  # Target framerate
-                
-                # Audio codec settings
-                "-c:a", self.AUDIO_CODEC,
-                "-b:a", self.AUDIO_BITRATE,
-                "-ar", "44100",  # Audio sample rate
-                
-                # Container settings
-                "-movflags", "+faststart",  # Optimize for web streaming
-                "-pix_fmt", "yuv420p",  # Ensure compatibility
-                
-                output_file_path
             ]
             
+            if not plan or plan["video"]["action"] == "transcode":
+                # Video filters for scaling and padding
+                ffmpeg_cmd += [
+                    "-filter_complex",
+                    f"[0:v:0]scale={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:force_original_aspect_ratio=decrease,"
+                    f"pad={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black[vout]"
+                ]
+            
+            ffmpeg_cmd += self._stream_output_args(plan, "[vout]") + [output_file_path]
+            
             logger.info(f"🔧 FFmpeg command: {' '.join(ffmpeg_cmd)}")
             
-            # Execute FFmpeg conversion
-            result = subprocess.run(
-                ffmpeg_cmd, 
-                capture_output=True, 
-                text=True, 
+            # Execute FFmpeg conversion, streaming progress while it runs
+            result = ffmpeg_runner.run(
+                ffmpeg_cmd,
+                duration=input_metadata.get("duration", 0),
+                progress_callback=progress_callback,
                 timeout=300  # 5 minute timeout
             )
             
@@ -114,8 +128,9 @@ class VideoConversionService:
                 "input_metadata": input_metadata,
                 "output_metadata": output_metadata,
                 "output_size": output_size,
+                "conversion_seconds": round(time.monotonic() - started_at, 2),
                 "compression_ratio": input_metadata.get("size", 0) / output_size if output_size > 0 else 0,
-                "ffmpeg_output": result.stdout
+                "ffmpeg_output": result.stderr
             }
             
         except subprocess.TimeoutExpired:
@@ -131,6 +146,340 @@ class VideoConversionService:
                 "error": str(e)
             }
     
+    def convert_with_artifacts(
+        self,
+        input_file_path: str,
+        output_dir: str,
+        output_file_path: Optional[str] = None,
+        frame_count: int = 8,
+        progress_callback: Optional[ProgressCallback] = None,
+        plan: Optional[Dict[str, Any]] = None,
+        keyframes_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Decode the source once and write every ingest output from that single pass:
+        - Standard format MP4 (same settings and conversion plan as convert_to_standard_format),
+          if output_file_path is set
+        - JPEG thumbnail (640x1138, padded to 9:16) at 2 seconds
+        - frame_count evenly spaced analysis frames (512x512 JPEG)
+        - Scrub sprite sheet (SPRITE_COLUMNS x SPRITE_ROWS tiles)
+        - Shots with motion/brightness stats, detected on small frames from the same decode
+        
+        Args:
+            input_file_path: Path to input video file
+            output_dir: Directory for the thumbnail, frames and sprite
+            output_file_path: Path of the converted MP4 (None when no conversion is needed)
+            frame_count: Number of analysis frames
+            progress_callback: Optional callback receiving live encode progress
+            plan: Conversion plan from get_conversion_plan (None = transcode every stream)
+            keyframes_only: Decode keyframes only (-skip_frame nokey), for a short-GOP video that is
+                already converted: about GOP_SIZE times cheaper, shots are found at keyframe resolution
+            
+        Returns:
+            Dict with success, output_metadata, thumbnail_path, frame_paths, sprite_path, sprite layout and shots
+        """
+        try:
+            started_at = time.monotonic()
+            input_metadata = self.get_video_metadata(input_file_path)
+            duration = input_metadata.get("duration", 0) or 1.0
+            
+            thumbnail_path = os.path.join(output_dir, "thumbnail.jpg")
+            frame_pattern = os.path.join(output_dir, "frame_%02d.jpg")
+            sprite_path = os.path.join(output_dir, "sprite.jpg")
+            shot_frames_path = os.path.join(output_dir, "shot_frames.rgb")
+            
+            thumbnail_time = 2 if duration > 2 else 0
+            sprite_tiles = self.SPRITE_COLUMNS * self.SPRITE_ROWS
+            sprite_interval = duration / sprite_tiles
+            w, h = self.TARGET_WIDTH, self.TARGET_HEIGHT
+            tw, th = self.SPRITE_TILE_WIDTH, self.SPRITE_TILE_HEIGHT
+            shot_fps = shot_detector.sample_fps(duration, input_metadata.get("framerate"))
+            if keyframes_only:
+                # Never sample shots faster than the keyframes arrive (repeated frames hide cuts)
+                shot_fps = max(0.5, min(shot_fps, (input_metadata.get("framerate") or self.TARGET_FRAMERATE) / self.GOP_SIZE))
+            sw, sh = shot_detector.DETECT_SIZE
+            
+            # A compliant video stream is copied into the MP4: no scaling branch to encode
+            transcode_video = bool(output_file_path) and (not plan or plan["video"]["action"] == "transcode")
+            branches = ["thumb", "frames", "sprite", "shots"] + (["main"] if transcode_video else [])
+            chains = [
+                f"[0:v:0]split={len(branches)}" + "".join(f"[v{name}]" for name in branches),
+                f"[vthumb]trim=start={thumbnail_time},setpts=PTS-STARTPTS,"
+                f"scale=640:1138:force_original_aspect_ratio=decrease,pad=640:1138:(ow-iw)/2:(oh-ih)/2:black,"
+                f"format=yuvj420p[thumb]",
+                f"[vframes]fps={frame_count}/{duration},scale=512:512,format=yuvj420p[frames]",
+                f"[vsprite]fps=1/{sprite_interval},"
+                f"scale={tw}:{th}:force_original_aspect_ratio=decrease,pad={tw}:{th}:(ow-iw)/2:(oh-ih)/2:black,"
+                f"tile={self.SPRITE_COLUMNS}x{self.SPRITE_ROWS},format=yuvj420p[sprite]",
+                f"[vshots]fps={shot_fps:.4f},scale={sw}:{sh},format=rgb24[shots]"
+            ]
+            if transcode_video:
+                chains.append(
+                    f"[vmain]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                    f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:black,format=yuv420p[vout]"
+                )
+            
+            ffmpeg_cmd = ["ffmpeg", "-y"] + (["-skip_frame", "nokey"] if keyframes_only else [])
+            ffmpeg_cmd += ["-i", input_file_path, "-filter_complex", ";".join(chains)]
+            
+            if output_file_path:
+                ffmpeg_cmd += self._stream_output_args(plan, "[vout]") + [output_file_path]
+            
+            ffmpeg_cmd += [
+                "-map", "[thumb]", "-frames:v", "1", "-q:v", "2", thumbnail_path,
+                "-map", "[frames]", "-frames:v", str(frame_count), "-q:v", "3", frame_pattern,
+                "-map", "[sprite]", "-frames:v", "1", "-q:v", "4", sprite_path,
+                "-map", "[shots]", "-f", "rawvideo", shot_frames_path
+            ]
+            
+            logger.info(f"🔧 FFmpeg multi-output command: {' '.join(ffmpeg_cmd)}")
+            
+            result = ffmpeg_runner.run(
+                ffmpeg_cmd,
+                duration=duration,
+                progress_callback=progress_callback,
+                timeout=300  # 5 minute timeout
+            )
+            
+            if result.returncode != 0:
+                logger.error(f"❌ FFmpeg multi-output pass failed: {result.stderr}")
+                return {"success": False, "error": f"Conversion failed: {result.stderr}"}
+            
+            if output_file_path and not os.path.exists(output_file_path):
+                return {"success": False, "error": "Output file was not created"}
+            
+            frame_paths = sorted(
+                os.path.join(output_dir, name) for name in os.listdir(output_dir)
+                if name.startswith("frame_") and name.endswith(".jpg")
+            )
+            
+            shots = None
+            if os.path.exists(shot_frames_path):
+                shots = shot_detector.detect_from_raw(shot_frames_path, shot_fps, input_metadata.get("duration", 0))
+                os.remove(shot_frames_path)
+            
+            conversion = {
+                "success": True,
+                "input_metadata": input_metadata,
+                "thumbnail_path": thumbnail_path if os.path.exists(thumbnail_path) else None,
+                "frame_paths": frame_paths,
+                "sprite_path": sprite_path if os.path.exists(sprite_path) else None,
+                "sprite": {
+                    "columns": self.SPRITE_COLUMNS,
+                    "rows": self.SPRITE_ROWS,
+                    "tile_width": tw,
+                    "tile_height": th,
+                    "interval": round(sprite_interval, 3)
+                },
+                "shots": shots
+            }
+            
+            if output_file_path:
+                output_size = os.path.getsize(output_file_path)
+                conversion.update({
+                    "output_metadata": self.get_video_metadata(output_file_path),
+                    "output_size": output_size,
+                    "conversion_seconds": round(time.monotonic() - started_at, 2),
+                    "compression_ratio": input_metadata.get("size", 0) / output_size if output_size > 0 else 0
+                })
+            
+            logger.info(f"✅ Single-decode pass: mp4={bool(output_file_path)}, {len(frame_paths)} frames, "
+                        f"thumbnail={bool(conversion['thumbnail_path'])}, sprite={bool(conversion['sprite_path'])}, "
+                        f"{len(shots or [])} shots")
+            return conversion
+            
+        except subprocess.TimeoutExpired:
+            logger.error("❌ FFmpeg multi-output pass timed out")
+            return {"success": False, "error": "Conversion timed out (exceeded 5 minutes)"}
+        except Exception as e:
+            logger.error(f"❌ Multi-output conversion error: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def plan_chunks(
+        self,
+        duration: float,
+        keyframes: List[Dict[str, float]],
+        max_workers: int,
+        min_chunk_seconds: float
+    ) -> List[Tuple[float, Optional[float]]]:
+        """
+        Split a video into independently encodable chunks at source keyframes
+        
+        Args:
+            duration: Source duration in seconds
+            keyframes: Source keyframe index (chunk starts must be keyframes)
+            max_workers: Upper bound on the chunk count (parallel encoders)
+            min_chunk_seconds: Minimum chunk length (process startup and seek cost)
+            
+        Returns:
+            List of (start, duration) pairs; the last chunk has no duration (runs to the end)
+        """
+        chunk_count = min(max_workers, int(duration // min_chunk_seconds)) if min_chunk_seconds > 0 else max_workers
+        keyframe_times = sorted({keyframe["time"] for keyframe in keyframes if keyframe["time"] > 0})
+        if chunk_count < 2 or not keyframe_times:
+            return [(0.0, None)]
+        
+        # Nearest keyframe to each even split point, keeping chunks in order and non-empty
+        starts = [0.0]
+        for index in range(1, chunk_count):
+            target = duration * index / chunk_count
+            candidates = [t for t in keyframe_times if t > starts[-1]]
+            if not candidates:
+                break
+            start = min(candidates, key=lambda t: abs(t - target))
+            if duration - start < min_chunk_seconds / 2:
+                break
+            starts.append(start)
+        
+        ends = starts[1:] + [None]
+        return [(start, round(end - start, 6) if end is not None else None) for start, end in zip(starts, ends)]
+    
+    def convert_chunked(
+        self,
+        input_file_path: str,
+        output_file_path: str,
+        work_dir: str,
+        keyframes: List[Dict[str, float]],
+        max_workers: int = 0,
+        min_chunk_seconds: float = 30,
+        progress_callback: Optional[ProgressCallback] = None,
+        plan: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Convert video to standard format by encoding keyframe-aligned chunks in parallel
+        
+        Each chunk is seeked on the input side (its start is a source keyframe, so no
+        frame is decoded twice) and encoded with the standard settings; the audio track
+        is converted once on its own. The chunks are then joined with the concat demuxer
+        and stream copy, so the output has one continuous timeline.
+        
+        Args:
+            input_file_path: Path to input video file
+            output_file_path: Path to output video file
+            work_dir: Directory for the chunk files
+            keyframes: Source keyframe index
+            max_workers: Parallel chunk encoders (0 = CPU count)
+            min_chunk_seconds: Minimum chunk length; shorter videos use a single chunk
+            progress_callback: Optional callback receiving live encode progress
+            plan: Conversion plan from get_conversion_plan (None = transcode every stream)
+            
+        Returns:
+            Dict with conversion result and metadata (chunks = number of chunks encoded)
+        """
+        try:
+            started_at = time.monotonic()
+            input_metadata = self.get_video_metadata(input_file_path)
+            duration = input_metadata.get("duration", 0)
+            
+            cores = os.cpu_count() or 1
+            chunks = self.plan_chunks(duration, keyframes, max_workers or cores, min_chunk_seconds)
+            if len(chunks) < 2:
+                return {"success": False, "error": "Video too short to split into chunks", "chunks": len(chunks)}
+            
+            # Split the cores between concurrent encodes instead of oversubscribing them
+            encoder_threads = max(1, cores // len(chunks))
+            logger.info(f"🧩 Chunked conversion: {len(chunks)} chunks, {encoder_threads} encoder threads each")
+            
+            chunk_progress = [0.0] * len(chunks)
+            progress_lock = threading.Lock()
+            
+            def _chunk_callback(index: int) -> Optional[ProgressCallback]:
+                if not progress_callback:
+                    return None
+                
+                def _callback(progress: Dict[str, Any]):
+                    with progress_lock:
+                        chunk_progress[index] = progress.get("out_time", 0)
+                        done = sum(chunk_progress)
+                    # The final concat is a fast stream copy: keep the last 5% for it
+                    percent = min(95.0, done / duration * 95) if duration > 0 else 0.0
+                    progress_callback({"percent": round(percent, 1), "eta_seconds": None})
+                
+                return _callback
+            
+            def _encode_chunk(index: int) -> str:
+                start, chunk_duration = chunks[index]
+                chunk_path = os.path.join(work_dir, f"chunk_{index:03d}.mp4")
+                cmd = ["ffmpeg", "-y", "-ss", str(start), "-i", input_file_path]
+                if chunk_duration is not None:
+                    cmd += ["-t", str(chunk_duration)]
+                cmd += [
+                    "-map", "0:v:0", "-an",
+                    "-vf", f"scale={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:force_original_aspect_ratio=decrease,"
+                           f"pad={self.TARGET_WIDTH}:{self.TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+                ] + self._video_encoder_args() + ["-threads", str(encoder_threads), chunk_path]
+                
+                result = ffmpeg_runner.run(
+                    cmd,
+                    duration=chunk_duration or max(0.0, duration - start),
+                    progress_callback=_chunk_callback(index),
+                    timeout=300
+                )
+                if result.returncode != 0 or not os.path.exists(chunk_path):
+                    raise RuntimeError(f"Chunk {index} encode failed: {result.stderr[-500:]}")
+                return chunk_path
+            
+            audio_action = plan["audio"]["action"] if plan else "transcode"
+            audio_source = input_file_path
+            
+            with ThreadPoolExecutor(max_workers=len(chunks) + 1, thread_name_prefix="chunk") as executor:
+                chunk_futures = [executor.submit(_encode_chunk, index) for index in range(len(chunks))]
+                
+                audio_future = None
+                if audio_action == "transcode" and input_metadata.get("audio_codec"):
+                    audio_source = os.path.join(work_dir, "audio.m4a")
+                    audio_future = executor.submit(
+                        subprocess.run,
+                        ["ffmpeg", "-y", "-i", input_file_path, "-map", "0:a:0", "-vn",
+                         "-c:a", self.AUDIO_CODEC, "-b:a", self.AUDIO_BITRATE,
+                         "-ar", str(self.AUDIO_SAMPLE_RATE), audio_source],
+                        capture_output=True, text=True, timeout=300
+                    )
+                
+                chunk_paths = [future.result() for future in chunk_futures]
+                if audio_future and audio_future.result().returncode != 0:
+                    raise RuntimeError(f"Audio encode failed: {audio_future.result().stderr[-500:]}")
+            
+            # Join the chunks losslessly; concat offsets each chunk by the previous durations
+            concat_list_path = os.path.join(work_dir, "chunks.txt")
+            with open(concat_list_path, "w") as concat_list:
+                for chunk_path in chunk_paths:
+                    concat_list.write(f"file '{chunk_path}'\n")
+            
+            concat_cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list_path]
+            if audio_action != "none":
+                concat_cmd += ["-i", audio_source, "-map", "0:v:0", "-map", "1:a:0?"]
+            concat_cmd += ["-c", "copy", "-movflags", "+faststart", output_file_path]
+            
+            result = subprocess.run(concat_cmd, capture_output=True, text=True, timeout=120)
+            if result.returncode != 0 or not os.path.exists(output_file_path):
+                raise RuntimeError(f"Chunk concat failed: {result.stderr[-500:]}")
+            
+            if progress_callback:
+                progress_callback({"percent": 100.0, "eta_seconds": 0.0})
+            
+            output_metadata = self.get_video_metadata(output_file_path)
+            output_size = os.path.getsize(output_file_path)
+            conversion_seconds = round(time.monotonic() - started_at, 2)
+            logger.info(f"✅ Chunked conversion successful: {len(chunks)} chunks in {conversion_seconds}s")
+            
+            return {
+                "success": True,
+                "input_metadata": input_metadata,
+                "output_metadata": output_metadata,
+                "output_size": output_size,
+                "conversion_seconds": conversion_seconds,
+                "compression_ratio": input_metadata.get("size", 0) / output_size if output_size > 0 else 0,
+                "chunks": len(chunks)
+            }
+            
+        except subprocess.TimeoutExpired:
+            logger.error("❌ Chunked conversion timed out")
+            return {"success": False, "error": "Chunk conversion timed out (exceeded 5 minutes)"}
+        except Exception as e:
+            logger.error(f"❌ Chunked conversion error: {e}")
+            return {"success": False, "error": str(e)}
+    
     def get_video_metadata(self, file_path: str) -> Dict[str, Any]:
         """
         Get video metadata using FFprobe
@@ -176,6 +525,7 @@ class VideoConversionService:
                 "size": int(format_info.get("size", 0)),
                 "bitrate": int(format_info.get("bit_rate", 0)),
                 "format_name": format_info.get("format_name", "unknown"),
+                "major_brand": (format_info.get("tags", {}).get("major_brand") or "").strip(),
             }
             
             if video_stream:
@@ -184,7 +534,9 @@ class VideoConversionService:
                     "height": int(video_stream.get("height", 0)),
                     "video_codec": video_stream.get("codec_name", "unknown"),
                     "framerate": self._parse_framerate(video_stream.get("r_frame_rate", "0/1")),
-                    "pixel_format": video_stream.get("pix_fmt", "unknown")
+                    "pixel_format": video_stream.get("pix_fmt", "unknown"),
+                    "video_profile": video_stream.get("profile"),
+                    "video_level": video_stream.get("level")
                 })
             
             if audio_stream:
@@ -204,6 +556,54 @@ class VideoConversionService:
             logger.warning(f"⚠️ Error getting video metadata: {e}")
             return {"error": str(e)}
     
+    def get_keyframe_index(self, file_path: str) -> List[Dict[str, float]]:
+        """
+        List the video keyframes of a file from its packet index (no decoding)
+        
+        Args:
+            file_path: Path to video file
+            
+        Returns:
+            List of {"time": seconds, "pos": byte offset} sorted by time (empty on error)
+        """
+        try:
+            ffprobe_cmd = [
+                "ffprobe", "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,pos,flags",
+                "-of", "csv=p=0",
+                file_path
+            ]
+            
+            result = subprocess.run(ffprobe_cmd, capture_output=True, text=True, timeout=60)
+            
+            if result.returncode != 0:
+                logger.warning(f"⚠️ Keyframe probe failed: {result.stderr}")
+                return []
+            
+            keyframes = []
+            for line in result.stdout.splitlines():
+                fields = line.strip().split(",")
+                if len(fields) < 3 or "K" not in fields[2]:
+                    continue
+                try:
+                    keyframes.append({
+                        "time": float(fields[0]),
+                        "pos": int(fields[1]) if fields[1] not in ("", "N/A") else -1
+                    })
+                except ValueError:
+                    continue
+            
+            keyframes.sort(key=lambda keyframe: keyframe["time"])
+            return keyframes
+            
+        except subprocess.TimeoutExpired:
+            logger.warning("⚠️ Keyframe probe timed out")
+            return []
+        except Exception as e:
+            logger.warning(f"⚠️ Error probing keyframes: {e}")
+            return []
+    
     def _parse_framerate(self, framerate_str: str) -> float:
         """Parse framerate string like '30/1' to float"""
         try:
@@ -214,46 +614,208 @@ class VideoConversionService:
         except:
             return 0.0
     
-    def is_conversion_needed(self, metadata: Dict[str, Any]) -> bool:
+    def get_gop_stats(self, keyframes: List[Dict[str, float]], duration: float) -> Dict[str, Any]:
         """
-        Check if video needs conversion based on current format
+        Summarize the GOP structure of a keyframe index
+        
+        Args:
+            keyframes: Keyframe index from get_keyframe_index
+            duration: Video duration in seconds
+            
+        Returns:
+            Dict with keyframe_count and max_gop_duration (seconds)
+        """
+        times = [keyframe["time"] for keyframe in keyframes]
+        if duration > 0:
+            times.append(duration)
+        
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        return {
+            "keyframe_count": len(keyframes),
+            "max_gop_duration": round(max(gaps), 3) if gaps else duration
+        }
+    
+    def get_conversion_plan(
+        self,
+        metadata: Dict[str, Any],
+        keyframes: Optional[List[Dict[str, float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Decide per stream what the standard format needs: copy compliant streams,
+        transcode only the others, remux when only the container is off
         
         Args:
             metadata: Video metadata dict
+            keyframes: Optional keyframe index; long-GOP video needs a mezzanine re-encode
             
         Returns:
-            True if conversion is needed
+            Dict with video/audio actions ("copy", "transcode", "none") and their reasons,
+            container action ("keep", "remux") and needs_conversion
         """
         if metadata.get("error"):
-            return True  # If we can't read metadata, convert to be safe
+            # If we can't read metadata, convert to be safe
+            return {
+                "video": {"action": "transcode", "reasons": ["unreadable metadata"]},
+                "audio": {"action": "transcode", "reasons": ["unreadable metadata"]},
+                "container": "remux",
+                "needs_conversion": True
+            }
+        
+        video_reasons = []
         
         # Check resolution
         width = metadata.get("width", 0)
         height = metadata.get("height", 0)
         if width != self.TARGET_WIDTH or height != self.TARGET_HEIGHT:
-            logger.info(f"🔄 Resolution conversion needed: {width}x{height} -> {self.TARGET_WIDTH}x{self.TARGET_HEIGHT}")
-            return True
+            video_reasons.append(f"resolution {width}x{height}")
         
         # Check framerate (allow some tolerance)
         framerate = metadata.get("framerate", 0)
-        if abs(framerate - self.TARGET_FRAMERATE) > 1:
-            logger.info(f"🔄 Framerate conversion needed: {framerate} -> {self.TARGET_FRAMERATE}")
-            return True
+        if abs(framerate - self.TARGET_FRAMERATE) > self.FRAMERATE_TOLERANCE:
+            video_reasons.append(f"framerate {framerate}")
         
-        # Check video codec
+        # Check video codec and pixel format
         video_codec = metadata.get("video_codec", "")
         if video_codec not in ["h264", "libx264"]:
-            logger.info(f"🔄 Video codec conversion needed: {video_codec} -> {self.VIDEO_CODEC}")
-            return True
+            video_reasons.append(f"video codec {video_codec}")
+        pixel_format = metadata.get("pixel_format", "")
+        if pixel_format != "yuv420p":
+            video_reasons.append(f"pixel format {pixel_format}")
+        
+        # Check GOP length (phone footage often has one keyframe every few seconds)
+        if keyframes is not None:
+            gop_stats = self.get_gop_stats(keyframes, metadata.get("duration", 0))
+            if not keyframes or gop_stats["max_gop_duration"] > self.MAX_GOP_DURATION:
+                video_reasons.append(f"GOP {gop_stats['max_gop_duration']}s")
+        
+        # Check audio codec and sample rate
+        audio_reasons = []
+        audio_codec = metadata.get("audio_codec")
+        if audio_codec:
+            if audio_codec != "aac":
+                audio_reasons.append(f"audio codec {audio_codec}")
+            if metadata.get("sample_rate") not in self.ACCEPTED_SAMPLE_RATES:
+                audio_reasons.append(f"sample rate {metadata.get('sample_rate')}")
+        
+        # QuickTime (.mov) and other containers are remuxed to MP4
+        is_mp4 = "mp4" in metadata.get("format_name", "") and metadata.get("major_brand") != "qt"
+        
+        plan = {
+            "video": {"action": "transcode" if video_reasons else "copy", "reasons": video_reasons},
+            "audio": {
+                "action": "none" if not audio_codec else ("transcode" if audio_reasons else "copy"),
+                "reasons": audio_reasons
+            },
+            "container": "keep" if is_mp4 else "remux"
+        }
+        plan["needs_conversion"] = bool(video_reasons or audio_reasons or not is_mp4)
+        
+        if plan["needs_conversion"]:
+            logger.info(f"🔄 Conversion plan: video={plan['video']['action']} {video_reasons}, "
+                        f"audio={plan['audio']['action']} {audio_reasons}, container={plan['container']}")
+        else:
+            logger.info("✅ Video already in standard format, no conversion needed")
+        return plan
+    
+    def get_copy_savings(
+        self,
+        plan: Optional[Dict[str, Any]],
+        input_metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        What the conversion plan saved by copying compliant streams instead of transcoding them
+        
+        Args:
+            plan: Conversion plan from get_conversion_plan (None = everything transcoded)
+            input_metadata: Metadata of the uploaded video
+            
+        Returns:
+            Dict with copied_streams, encode_seconds_avoided (estimated from the duration and
+            ESTIMATED_ENCODE_SPEED) and bytes_saved (the original is stored as-is: no converted
+            copy is written or uploaded)
+        """
+        if not plan:
+            return {"copied_streams": [], "encode_seconds_avoided": 0.0, "bytes_saved": 0}
+        
+        copied_streams = [stream for stream in ("video", "audio") if plan[stream]["action"] == "copy"]
+        video_copied = "video" in copied_streams
+        duration = input_metadata.get("duration", 0) or 0
+        return {
+            "copied_streams": copied_streams,
+            "encode_seconds_avoided": round(duration / self.ESTIMATED_ENCODE_SPEED, 1) if video_copied else 0.0,
+            "bytes_saved": 0 if plan["needs_conversion"] else input_metadata.get("size", 0)
+        }
+    
+    def is_conversion_needed(
+        self,
+        metadata: Dict[str, Any],
+        keyframes: Optional[List[Dict[str, float]]] = None
+    ) -> bool:
+        """
+        Check if video needs conversion based on current format
+        
+        Args:
+            metadata: Video metadata dict
+            keyframes: Optional keyframe index; long-GOP sources need a mezzanine re-encode
+            
+        Returns:
+            True if conversion is needed
+        """
+        return self.get_conversion_plan(metadata, keyframes)["needs_conversion"]
+    
+    def get_mezzanine_profile(self) -> Dict[str, Any]:
+        """
+        Encoder settings of the ingest video re-encode, recorded in the media index of
+        every video whose stream it wrote (GOPs are only stream-copied between sources
+        encoded with the same settings, so their SPS/PPS match)
+        """
+        return {
+            "video_codec": self.VIDEO_CODEC,
+            "preset": self.PRESET,
+            "crf": self.CRF,
+            "framerate": self.TARGET_FRAMERATE,
+            "gop_size": self.GOP_SIZE,
+            "pixel_format": "yuv420p"
+        }
+    
+    def _video_encoder_args(self) -> List[str]:
+        """FFmpeg video codec args of the standard format (shared by whole-file and chunked encodes)"""
+        return [
+            "-c:v", self.VIDEO_CODEC,
+            "-preset", self.PRESET,
+            "-crf", str(self.CRF),
+            "-r", str(self.TARGET_FRAMERATE),  # Target framerate
+            "-g", str(self.GOP_SIZE),  # Short fixed GOP for cheap seeking
+            "-keyint_min", str(self.GOP_SIZE),
+            "-sc_threshold", "0",
+            "-pix_fmt", "yuv420p"  # Ensure compatibility
+        ]
+    
+    def _stream_output_args(self, plan: Optional[Dict[str, Any]], video_label: str = "0:v:0") -> List[str]:
+        """FFmpeg map/codec args of the standard format MP4 for a conversion plan (None = transcode all)"""
+        video_action = plan["video"]["action"] if plan else "transcode"
+        audio_action = plan["audio"]["action"] if plan else "transcode"
+        
+        args = ["-map", video_label if video_action == "transcode" else "0:v:0"]
+        if video_action == "transcode":
+            args += self._video_encoder_args()
+        else:
+            args += ["-c:v", "copy"]
         
-        # Check audio codec
-        audio_codec = metadata.get("audio_codec", "")
-        if audio_codec not in ["aac"]:
-            logger.info(f"🔄 Audio codec conversion needed: {audio_codec} -> {self.AUDIO_CODEC}")
-            return True
+        if audio_action != "none":
+            args += ["-map", "0:a:0?"]
+            if audio_action == "transcode":
+                args += [
+                    "-c:a", self.AUDIO_CODEC,
+                    "-b:a", self.AUDIO_BITRATE,
+                    "-ar", str(self.AUDIO_SAMPLE_RATE)
+                ]
+            else:
+                args += ["-c:a", "copy"]
         
-        logger.info("✅ Video already in standard format, no conversion needed")
-        return False
+        # Container settings
+        args += ["-movflags", "+faststart"]  # Optimize for web streaming
+        return args
     
     def estimate_output_size(self, input_metadata: Dict[str, Any]) -> int:
         """
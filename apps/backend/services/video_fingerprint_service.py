@@ -0,0 +1,151 @@
+"""
+Near-duplicate detection of uploaded videos
+A fingerprint is the duration plus a 64-bit difference hash of evenly spaced frames,
+sampled in one small decode; re-uploads of the same footage (renamed, re-encoded,
+resized) match by mean Hamming distance among videos of the same property
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.video import Video
+from models.video_fingerprint import VideoFingerprint
+from services.frame_sampler import frame_sampler
+
+logger = logging.getLogger(__name__)
+
+class VideoFingerprintService:
+    """Fingerprint uploads and find an already processed copy of the same footage"""
+
+    HASH_GRID = (9, 8)          # (width, height) of the grid compared for the 64-bit difference hash
+    SAMPLE_SCALE = 4            # Frames are sampled at 4x the grid and block-averaged (no aliasing)
+    FLAT_FRAME_STD = 2.0        # Near-uniform frames (black, fades) all hash alike: left out
+    DURATION_TOLERANCE_RATIO = 0.02
+    MIN_COMPARED_RATIO = 0.5    # Share of frames both fingerprints must hash to be compared
+    REUSABLE_STATUSES = ("ready", "uploaded")
+    GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    def compute(self, video_path: str, duration: float) -> Optional[Dict[str, Any]]:
+        """
+        Fingerprint a video
+
+        Args:
+            video_path: Local video file
+            duration: Duration in seconds (from the probe)
+
+        Returns:
+            {"duration", "frame_hashes"}, or None if too few frames could be hashed
+        """
+        if not duration or duration <= 0:
+            return None
+
+        frame_count = settings.FINGERPRINT_FRAMES
+        grid_width, grid_height = self.HASH_GRID
+        try:
+            frames = frame_sampler.sample_at(
+                video_path,
+                [duration * (index + 0.5) / frame_count for index in range(frame_count)],
+                size=(grid_width * self.SAMPLE_SCALE, grid_height * self.SAMPLE_SCALE),
+                fit="stretch"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Fingerprint sampling failed for {video_path}: {e}")
+            return None
+
+        frame_hashes = [self.frame_hash(frame) if frame is not None else None for frame in frames]
+        if sum(1 for frame_hash in frame_hashes if frame_hash) < frame_count * self.MIN_COMPARED_RATIO:
+            logger.info(f"⚠️ Fingerprint skipped: too few distinct frames in {video_path}")
+            return None
+
+        return {"duration": float(duration), "frame_hashes": frame_hashes}
+
+    def frame_hash(self, frame: np.ndarray) -> Optional[str]:
+        """64-bit difference hash (hex) of a frame sampled at SAMPLE_SCALE times the grid, None if near-uniform"""
+        grid_width, grid_height = self.HASH_GRID
+        gray = frame.astype(np.float32) @ self.GRAY_WEIGHTS
+        grid = gray.reshape(grid_height, self.SAMPLE_SCALE, grid_width, self.SAMPLE_SCALE).mean(axis=(1, 3))
+        if grid.std() < self.FLAT_FRAME_STD:
+            return None
+        return np.packbits(grid[:, 1:] > grid[:, :-1]).tobytes().hex()
+
+    def distance(self, hashes: List[Optional[str]], other_hashes: List[Optional[str]]) -> Optional[float]:
+        """
+        Mean Hamming distance of the frames both fingerprints hashed
+
+        Returns:
+            Bits per frame (0-64), or None if too few frames are comparable
+        """
+        pairs = [(a, b) for a, b in zip(hashes, other_hashes) if a and b]
+        if not pairs or len(pairs) < max(len(hashes), len(other_hashes)) * self.MIN_COMPARED_RATIO:
+            return None
+        return sum(bin(int(a, 16) ^ int(b, 16)).count("1") for a, b in pairs) / len(pairs)
+
+    def store(self, db: Session, video_id: str, property_id: str, fingerprint: Dict[str, Any]) -> VideoFingerprint:
+        """Insert or replace the fingerprint of a video (a retried ingest replaces its own row)"""
+        entry = db.query(VideoFingerprint).filter(VideoFingerprint.video_id == video_id).first()
+        if not entry:
+            entry = VideoFingerprint(video_id=video_id)
+            db.add(entry)
+
+        entry.property_id = property_id
+        entry.duration = fingerprint["duration"]
+        entry.frame_hashes = fingerprint["frame_hashes"]
+        db.commit()
+        return entry
+
+    def find_duplicate(
+        self,
+        db: Session,
+        video_id: str,
+        property_id: str,
+        fingerprint: Dict[str, Any]
+    ) -> Optional[Tuple[Video, float]]:
+        """
+        Closest processed video of the property with the same footage
+
+        Args:
+            db: Database session
+            video_id: Video being ingested (never matched with itself)
+            property_id: Property the upload belongs to
+            fingerprint: Fingerprint of the upload
+
+        Returns:
+            (video, mean Hamming distance), or None if nothing is close enough
+        """
+        duration = fingerprint["duration"]
+        tolerance = max(settings.FINGERPRINT_DURATION_TOLERANCE, duration * self.DURATION_TOLERANCE_RATIO)
+
+        # Index range scan on (property_id, duration), then Hamming distance on the few candidates
+        candidates = db.query(VideoFingerprint, Video).join(Video, Video.id == VideoFingerprint.video_id).filter(
+            VideoFingerprint.property_id == property_id,
+            VideoFingerprint.duration.between(duration - tolerance, duration + tolerance),
+            VideoFingerprint.video_id != video_id,
+            Video.status.in_(self.REUSABLE_STATUSES)
+        ).all()
+
+        best = None
+        for candidate, video in candidates:
+            distance = self.distance(fingerprint["frame_hashes"], candidate.frame_hashes or [])
+            if distance is None or distance > settings.FINGERPRINT_MAX_DISTANCE:
+                continue
+            if not self._has_processed_outputs(video):
+                continue
+            if best is None or distance < best[1]:
+                best = (video, distance)
+
+        return best
+
+    def _has_processed_outputs(self, video: Video) -> bool:
+        """The ingest of the video finished (its processing metadata names the stored video)"""
+        try:
+            return bool(json.loads(video.source_data or "{}").get("s3_key"))
+        except (ValueError, AttributeError):
+            return False
+
+# Create singleton instance
+video_fingerprint_service = VideoFingerprintService()
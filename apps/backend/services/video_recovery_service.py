@@ -10,6 +10,7 @@ from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.celery_queues import PRIORITY_BACKGROUND
 from models.video import Video
 from tasks.video_processing_tasks import process_uploaded_video
 from tasks.video_generation_v3 import generate_video_from_timeline_v3
@@ -125,8 +126,9 @@ class VideoRecoveryService:
                                     'text_overlays': source_data.get('text_overlays', [])
                                 }
                                 
-                                task = generate_video_from_timeline_v3.delay(
-                                    str(video.id), property_id, user_id, timeline_data, template_id
+                                task = generate_video_from_timeline_v3.apply_async(
+                                    args=[str(video.id), property_id, user_id, timeline_data, template_id],
+                                    priority=PRIORITY_BACKGROUND
                                 )
                                 
                             else:
@@ -140,7 +142,9 @@ class VideoRecoveryService:
                                 else:
                                     s3_key = f"properties/{video.property_id}/videos/{video.title}"
                                 
-                                task = process_uploaded_video.delay(str(video.id), s3_key)
+                                task = process_uploaded_video.apply_async(
+                                    args=[str(video.id), s3_key], priority=PRIORITY_BACKGROUND
+                                )
                                 
                         else:
                             # Fallback - traiter comme vidéo uploadée
@@ -152,7 +156,9 @@ class VideoRecoveryService:
                             else:
                                 s3_key = f"properties/{video.property_id}/videos/{video.title}"
                             
-                            task = process_uploaded_video.delay(str(video.id), s3_key)
+                            task = process_uploaded_video.apply_async(
+                                args=[str(video.id), s3_key], priority=PRIORITY_BACKGROUND
+                            )
                         
                         if task:
                             # Mettre à jour le task ID
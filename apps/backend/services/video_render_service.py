@@ -0,0 +1,497 @@
+"""
+Single-pass timeline renderer
+Builds one FFmpeg filter_complex (trim, scale/pad, concat, drawtext) so a
+generated video is encoded exactly once, or smart-cuts sources that are
+already in the render profile
+"""
+
+import os
+import subprocess
+import logging
+from fractions import Fraction
+from typing import List, Dict, Any, Optional
+
+from core.config import settings
+from services.ffmpeg_runner import ffmpeg_runner, ProgressCallback
+from services.video_conversion_service import video_conversion_service
+
+logger = logging.getLogger(__name__)
+
+class VideoRenderService:
+    """Service for rendering timelines to the 9:16 output format in one encode"""
+
+    # Output format specifications (9:16 portrait)
+    TARGET_WIDTH = 1080
+    TARGET_HEIGHT = 1920
+    TARGET_FRAMERATE = 30
+    VIDEO_CODEC = "libx264"
+    AUDIO_CODEC = "aac"
+    AUDIO_BITRATE = "128k"
+    AUDIO_SAMPLE_RATE = 44100
+    CRF = 23
+    PRESET = "fast"
+
+    def get_encoder_profile(self) -> Dict[str, Any]:
+        """Return the output encoding parameters (part of the render cache key)"""
+        return {
+            "width": self.TARGET_WIDTH,
+            "height": self.TARGET_HEIGHT,
+            "framerate": self.TARGET_FRAMERATE,
+            "video_codec": self.VIDEO_CODEC,
+            "audio_codec": self.AUDIO_CODEC,
+            "audio_bitrate": self.AUDIO_BITRATE,
+            "audio_sample_rate": self.AUDIO_SAMPLE_RATE,
+            "crf": self.CRF,
+            "preset": self.PRESET,
+            "font": self.font_option()
+        }
+
+    def font_option(self) -> str:
+        """drawtext font option: RENDER_FONT_FILE when it exists, else the RENDER_FONT fontconfig family"""
+        if settings.RENDER_FONT_FILE and os.path.exists(settings.RENDER_FONT_FILE):
+            return f"fontfile={settings.RENDER_FONT_FILE}"
+        return f"font='{settings.RENDER_FONT}'"
+
+    def is_drawtext_error(self, error: Optional[str]) -> bool:
+        """Whether an FFmpeg failure comes from the text overlays (a re-encode with the same filters fails too)"""
+        return bool(error) and any(marker in error for marker in ("drawtext", "Could not load font", "fontconfig"))
+
+    def build_drawtext_filters(self, text_overlays: List[Dict[str, Any]]) -> List[str]:
+        """
+        Build FFmpeg drawtext filters from Canvas editor text overlays
+
+        Args:
+            text_overlays: Text overlays with content, timing, position (0-100%) and style
+
+        Returns:
+            List of drawtext filter strings (empty texts are skipped)
+        """
+        video_width = self.TARGET_WIDTH
+        video_height = self.TARGET_HEIGHT
+        font = self.font_option()
+
+        text_filters = []
+        for i, text_info in enumerate(text_overlays):
+            content = text_info.get("content", "").strip()
+            if not content:
+                logger.warning(f"📝 Skipping empty text content at index {i}")
+                continue
+
+            start_time = text_info.get("start_time", 0)
+            end_time = text_info.get("end_time", start_time + 3)
+            position = text_info.get("position", {})
+            style = text_info.get("style", {})
+
+            # COORDONNÉES NORMALISÉES Canvas (0-100%) → pixels vidéo
+            x_percent = float(position.get("x", 50))  # Default center (50%)
+            y_percent = float(position.get("y", 50))  # Default center (50%)
+            anchor = position.get("anchor", "center")
+
+            # Conversion pourcentages → pixels vidéo
+            x_pixels = int((x_percent / 100) * video_width)
+            y_pixels = int((y_percent / 100) * video_height)
+
+            logger.info(f"🎯 Canvas text '{content}': {x_percent}%,{y_percent}% → {x_pixels}px,{y_pixels}px (anchor: {anchor})")
+
+            # Taille de police en pourcentage de la hauteur vidéo (comme Canvas editor)
+            font_size_percent = float(style.get("font_size", 8))  # Default 8% de la hauteur
+            font_size = int((font_size_percent / 100) * video_height)
+
+            font_color = style.get("color", "#FFFFFF")
+
+            # Convert color format
+            if font_color.startswith("#"):
+                font_color = f"0x{font_color[1:]}"
+            else:
+                font_color = "white"
+
+            # FFmpeg positioning - Canvas uses center-based positioning, FFmpeg uses top-left corner
+            if anchor == "center":
+                # Centre le texte autour du point demandé
+                ffmpeg_x = f"{x_pixels}-(text_w/2)"
+                ffmpeg_y = f"{y_pixels}-(text_h/2)"
+            else:
+                # Position top-left classique
+                ffmpeg_x = str(max(0, min(x_pixels, video_width - 50)))
+                ffmpeg_y = str(max(0, min(y_pixels, video_height - 50)))
+
+            logger.info(f"📍 FFmpeg positioning: '{content}' at ({ffmpeg_x},{ffmpeg_y}) with anchor={anchor}")
+
+            # Escape text for FFmpeg
+            safe_text = (content
+                        .replace("\\", "\\\\")
+                        .replace("'", "\\'")
+                        .replace('"', '\\"')
+                        .replace(":", "\\:")
+                        .replace("=", "\\=")
+                        .replace(",", "\\,")
+                        .replace("[", "\\[")
+                        .replace("]", "\\]"))
+
+            text_filter = f"drawtext=text='{safe_text}':{font}:fontsize={font_size}:fontcolor={font_color}:x={ffmpeg_x}:y={ffmpeg_y}"
+
+            # Add text effects based on style
+            if style.get("shadow", True):  # Default shadow on
+                text_filter += ":shadowcolor=black@0.8:shadowx=2:shadowy=2"
+
+            if style.get("outline", False):
+                text_filter += ":bordercolor=black:borderw=2"
+
+            if style.get("background", False):
+                text_filter += ":box=1:boxcolor=black@0.5:boxborderw=10"
+
+            # Add timing
+            text_filter += f":enable='between(t,{start_time},{end_time})'"
+            text_filters.append(text_filter)
+
+        return text_filters
+
+    def build_filter_graph(
+        self,
+        sources: List[Dict[str, Any]],
+        text_filters: List[str]
+    ) -> str:
+        """
+        Build the filter_complex for a list of clip sources
+
+        Each input is trimmed to its clip duration, normalized to 1080x1920 @ 30 fps,
+        then all inputs are concatenated and the drawtext filters applied on top.
+        Sources without an audio stream get generated silence so concat stays aligned.
+
+        Args:
+            sources: Clip sources in timeline order (path, duration, has_audio)
+            text_filters: drawtext filters to apply to the concatenated video
+
+        Returns:
+            filter_complex string producing [vout] and [aout]
+        """
+        w, h = self.TARGET_WIDTH, self.TARGET_HEIGHT
+        chains = []
+        concat_inputs = ""
+
+        for i, source in enumerate(sources):
+            duration = source["duration"]
+            chains.append(
+                f"[{i}:v]trim=duration={duration},setpts=PTS-STARTPTS,fps={self.TARGET_FRAMERATE},"
+                f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:black,setsar=1,format=yuv420p[v{i}]"
+            )
+            if source.get("has_audio", True):
+                chains.append(
+                    f"[{i}:a]atrim=duration={duration},asetpts=PTS-STARTPTS,"
+                    f"aresample={self.AUDIO_SAMPLE_RATE},aformat=sample_fmts=fltp:channel_layouts=stereo[a{i}]"
+                )
+            else:
+                chains.append(
+                    f"anullsrc=r={self.AUDIO_SAMPLE_RATE}:cl=stereo,atrim=duration={duration}[a{i}]"
+                )
+            concat_inputs += f"[v{i}][a{i}]"
+
+        video_label = "vout" if not text_filters else "vcat"
+        chains.append(f"{concat_inputs}concat=n={len(sources)}:v=1:a=1[{video_label}][aout]")
+
+        if text_filters:
+            chains.append(f"[vcat]{','.join(text_filters)}[vout]")
+
+        return ";".join(chains)
+
+    def render_timeline(
+        self,
+        sources: List[Dict[str, Any]],
+        text_overlays: List[Dict[str, Any]],
+        output_path: str,
+        encoder_threads: int = 0,
+        timeout: int = 600,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Render clip sources and text overlays into the final video with a single encode
+
+        Args:
+            sources: Clip sources in timeline order (path, duration, has_audio, optional start)
+            text_overlays: Canvas editor text overlays
+            output_path: Path of the rendered MP4
+            encoder_threads: libx264 threads (0 = auto)
+            timeout: FFmpeg timeout in seconds
+            progress_callback: Optional callback receiving live encode progress
+
+        Returns:
+            Dict with success flag, output path and error if any
+        """
+        if not sources:
+            return {"success": False, "error": "No sources to render"}
+
+        try:
+            text_filters = self.build_drawtext_filters(text_overlays or [])
+            filter_graph = self.build_filter_graph(sources, text_filters)
+
+            ffmpeg_cmd = ["ffmpeg", "-y"]
+            for source in sources:
+                # Input-side -ss seeks to the keyframe before the in-point instead of
+                # decoding from 0; -t stops demuxing each source right after its clip
+                ffmpeg_cmd += [
+                    "-ss", str(source.get("start", 0)),
+                    "-t", str(source["duration"]),
+                    "-i", source["path"]
+                ]
+
+            ffmpeg_cmd += [
+                "-filter_complex", filter_graph,
+                "-map", "[vout]", "-map", "[aout]",
+                "-c:v", self.VIDEO_CODEC,
+                "-preset", self.PRESET,
+                "-crf", str(self.CRF),
+                "-r", str(self.TARGET_FRAMERATE),
+                "-pix_fmt", "yuv420p",
+                "-threads", str(encoder_threads),
+                "-c:a", self.AUDIO_CODEC,
+                "-b:a", self.AUDIO_BITRATE,
+                "-movflags", "+faststart",
+                output_path
+            ]
+
+            logger.info(f"🎞️ Single-pass render: {len(sources)} clips, {len(text_filters)} text overlays")
+
+            total_duration = sum(float(source["duration"]) for source in sources)
+            result = ffmpeg_runner.run(
+                ffmpeg_cmd, total_duration, progress_callback=progress_callback, timeout=timeout
+            )
+
+            if result.returncode != 0 or not os.path.exists(output_path):
+                logger.error(f"❌ Single-pass render failed: {result.stderr}")
+                return {"success": False, "error": result.stderr}
+
+            logger.info(f"✅ Single-pass render completed: {output_path}")
+            return {"success": True, "output_path": output_path}
+
+        except subprocess.TimeoutExpired:
+            logger.error("❌ Single-pass render timed out")
+            return {"success": False, "error": f"Render timed out (exceeded {timeout}s)"}
+        except Exception as e:
+            logger.error(f"❌ Single-pass render error: {e}")
+            return {"success": False, "error": str(e)}
+
+    def is_smart_cut_eligible(self, metadata: Dict[str, Any]) -> bool:
+        """
+        Check whether a source is in a profile the ingest conversion plan copies as-is,
+        so its GOPs can be stream-copied (1080x1920, ~30 fps, H.264 yuv420p, AAC 44.1
+        or 48 kHz; same tolerances as VideoConversionService.get_conversion_plan)
+        """
+        if not metadata or metadata.get("error"):
+            return False
+
+        return (
+            metadata.get("width") == self.TARGET_WIDTH
+            and metadata.get("height") == self.TARGET_HEIGHT
+            and abs(metadata.get("framerate", 0) - self.TARGET_FRAMERATE) <= video_conversion_service.FRAMERATE_TOLERANCE
+            and metadata.get("video_codec") == "h264"
+            and metadata.get("pixel_format") == "yuv420p"
+            and metadata.get("audio_codec") == "aac"
+            and metadata.get("sample_rate") in video_conversion_service.ACCEPTED_SAMPLE_RATES
+        )
+
+    def can_smart_cut(self, sources: List[Dict[str, Any]]) -> bool:
+        """
+        Check whether a timeline can be smart-cut: every source is eligible, is an ingest
+        mezzanine of the current encoder profile (the concat demuxer keeps the first part's
+        SPS/PPS, so GOPs of footage encoded elsewhere would decode against the wrong
+        parameter sets), and they all share one framerate and sample rate (parts are joined
+        without resampling, and edges are re-encoded at that shared rate)
+
+        Args:
+            sources: Clip sources with their probed metadata and media index encoder_profile
+        """
+        mezzanine_profile = video_conversion_service.get_mezzanine_profile()
+        if not sources or not all(
+            self.is_smart_cut_eligible(source.get("metadata")) and source.get("encoder_profile") == mezzanine_profile
+            for source in sources
+        ):
+            return False
+
+        framerates = [source["metadata"]["framerate"] for source in sources]
+        sample_rates = {source["metadata"]["sample_rate"] for source in sources}
+        return max(framerates) - min(framerates) <= 0.01 and len(sample_rates) == 1
+
+    def render_smart_cut(
+        self,
+        sources: List[Dict[str, Any]],
+        output_path: str,
+        work_dir: str,
+        timeout: int = 300,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Render already-normalized sources by stream-copying whole GOPs
+
+        For each clip [start, start + duration] only the partial GOPs before the first
+        and after the last keyframe inside the cut are re-encoded; everything between
+        is copied. All parts are then joined with the concat demuxer without re-encoding.
+
+        Args:
+            sources: Clip sources in timeline order (path, duration, metadata, encoder_profile,
+                optional start and keyframes)
+            output_path: Path of the rendered MP4
+            work_dir: Directory for intermediate parts
+            timeout: FFmpeg timeout in seconds per step
+            progress_callback: Optional callback, called as each clip is cut
+
+        Returns:
+            Dict with success flag, copied/encoded seconds and error if any
+        """
+        try:
+            parts = []
+            copied_seconds = 0.0
+            encoded_seconds = 0.0
+            total_duration = sum(float(source["duration"]) for source in sources)
+
+            for i, source in enumerate(sources):
+                if progress_callback and total_duration > 0:
+                    # Parts run far faster than real time: report per clip
+                    progress_callback({
+                        "percent": round((copied_seconds + encoded_seconds) / total_duration * 100, 1),
+                        "eta_seconds": None
+                    })
+
+                start = float(source.get("start", 0))
+                end = start + float(source["duration"])
+
+                keyframes = source.get("keyframes")
+                if keyframes is None:
+                    keyframes = video_conversion_service.get_keyframe_index(source["path"])
+                times = [keyframe["time"] for keyframe in keyframes]
+
+                # Keyframes bounding the copyable span inside the cut
+                copy_start = next((t for t in times if t >= start - 0.001), None)
+                copy_end = next((t for t in reversed(times) if t <= end + 0.001), None)
+
+                if copy_start is None or copy_end is None or copy_end - copy_start <= 0.001:
+                    # The whole cut sits inside one GOP
+                    parts.append(self._encode_part(source, start, end - start, work_dir, f"{i}_full", timeout))
+                    encoded_seconds += end - start
+                    continue
+
+                if copy_start - start > 0.001:
+                    parts.append(self._encode_part(source, start, copy_start - start, work_dir, f"{i}_head", timeout))
+                    encoded_seconds += copy_start - start
+
+                parts.append(self._copy_part(source, copy_start, copy_end - copy_start, work_dir, f"{i}_body", timeout))
+                copied_seconds += copy_end - copy_start
+
+                if end - copy_end > 0.001:
+                    parts.append(self._encode_part(source, copy_end, end - copy_end, work_dir, f"{i}_tail", timeout))
+                    encoded_seconds += end - copy_end
+
+            concat_list_path = os.path.join(work_dir, "smart_cut_concat.txt")
+            with open(concat_list_path, "w", encoding="utf-8") as f:
+                for part_path in parts:
+                    path = part_path.replace("'", "\\'")
+                    f.write(f"file '{path}'\n")
+
+            concat_cmd = [
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+                "-i", concat_list_path,
+                "-c", "copy",
+                "-movflags", "+faststart",
+                output_path
+            ]
+            result = subprocess.run(concat_cmd, capture_output=True, text=True, timeout=timeout)
+
+            if result.returncode != 0 or not os.path.exists(output_path):
+                logger.error(f"❌ Smart-cut concat failed: {result.stderr}")
+                return {"success": False, "error": result.stderr}
+
+            logger.info(f"✂️ Smart-cut render: {copied_seconds:.2f}s copied, {encoded_seconds:.2f}s re-encoded")
+            return {
+                "success": True,
+                "output_path": output_path,
+                "copied_seconds": round(copied_seconds, 3),
+                "encoded_seconds": round(encoded_seconds, 3)
+            }
+
+        except subprocess.TimeoutExpired:
+            logger.error("❌ Smart-cut render timed out")
+            return {"success": False, "error": f"Smart-cut timed out (exceeded {timeout}s)"}
+        except Exception as e:
+            logger.error(f"❌ Smart-cut render error: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _copy_part(
+        self,
+        source: Dict[str, Any],
+        start: float,
+        duration: float,
+        work_dir: str,
+        name: str,
+        timeout: int
+    ) -> str:
+        """Stream-copy whole GOPs starting on a keyframe"""
+        part_path = os.path.join(work_dir, f"smart_{name}.mp4")
+        copy_cmd = [
+            "ffmpeg", "-y",
+            "-ss", str(start), "-i", source["path"],
+            "-t", str(duration),
+            "-map", "0:v:0", "-map", "0:a:0",
+            "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            part_path
+        ]
+        result = subprocess.run(copy_cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not os.path.exists(part_path):
+            raise Exception(f"Stream copy of {name} failed: {result.stderr}")
+        return part_path
+
+    def _encode_part(
+        self,
+        source: Dict[str, Any],
+        start: float,
+        duration: float,
+        work_dir: str,
+        name: str,
+        timeout: int
+    ) -> str:
+        """
+        Re-encode a partial GOP with the encoder settings of the copied stream (the source's
+        mezzanine profile, framerate and sample rate), so its parameter sets match
+        """
+        part_path = os.path.join(work_dir, f"smart_{name}.mp4")
+        metadata = source.get("metadata", {})
+        profile = source.get("encoder_profile") or video_conversion_service.get_mezzanine_profile()
+        framerate = metadata.get("framerate") or self.TARGET_FRAMERATE
+        sample_rate = metadata.get("sample_rate") or self.AUDIO_SAMPLE_RATE
+
+        encode_cmd = [
+            "ffmpeg", "-y",
+            "-ss", str(start), "-i", source["path"],
+            "-t", str(duration),
+            "-map", "0:v:0", "-map", "0:a:0",
+            "-c:v", profile["video_codec"],
+            "-preset", profile["preset"],
+            "-crf", str(profile["crf"]),
+            "-r", str(Fraction(framerate).limit_denominator(1001)),  # 29.97 -> 30000/1001
+            "-g", str(profile["gop_size"]),
+            "-keyint_min", str(profile["gop_size"]),
+            "-sc_threshold", "0",
+            "-pix_fmt", profile["pixel_format"]
+        ]
+        # Concat without re-encoding needs the same H.264 profile/level as the copied GOPs
+        profile = (metadata.get("video_profile") or "").lower()
+        if profile in ("baseline", "main", "high"):
+            encode_cmd += ["-profile:v", profile]
+        level = metadata.get("video_level") or 0
+        if level > 0:
+            encode_cmd += ["-level", str(level / 10)]
+
+        encode_cmd += [
+            "-c:a", self.AUDIO_CODEC,
+            "-b:a", self.AUDIO_BITRATE,
+            "-ar", str(sample_rate),
+            "-avoid_negative_ts", "make_zero",
+            part_path
+        ]
+        result = subprocess.run(encode_cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not os.path.exists(part_path):
+            raise Exception(f"Edge re-encode of {name} failed: {result.stderr}")
+        return part_path
+
+# Create singleton instance
+video_render_service = VideoRenderService()
@@ -5,6 +5,9 @@ This service manages:
 1. Vector storage for video segment embeddings
 2. Similarity search for matching segments
 3. Metadata filtering for scene types
+
+VECTOR_BACKEND selects where vectors live: "weaviate", or "local" (embedded index
+in services/vector_index.py, same API, no service to run).
 """
 
 import weaviate
@@ -12,24 +15,42 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 from core.config import settings
+from services.vector_index import LocalVectorIndex
+from services.vector_batch_writer import VectorBatchWriter
 
 logger = logging.getLogger(__name__)
 
 class WeaviateService:
     """Service for managing video embeddings in Weaviate vector database"""
     
+    EMBEDDING_DIM = 512
+    
     def __init__(self):
         self.client = None
-        self._connect()
-        self._ensure_schema()
+        self.local_index: Optional[LocalVectorIndex] = None
+        self.batch_writer = VectorBatchWriter(self.add_video_segments)
+        if settings.VECTOR_BACKEND == "local":
+            self._open_local_index()
+        else:
+            self._connect()
+            self._ensure_schema()
+    
+    def _open_local_index(self):
+        """Open the embedded vector index"""
+        try:
+            self.local_index = LocalVectorIndex(
+                settings.LOCAL_VECTOR_INDEX_DIR,
+                dim=self.EMBEDDING_DIM,
+                hnsw_threshold=settings.LOCAL_VECTOR_HNSW_THRESHOLD
+            )
+            logger.info(f"Using local vector index at {settings.LOCAL_VECTOR_INDEX_DIR}")
+        except Exception as e:
+            logger.error(f"Error opening local vector index: {e}")
+            self.local_index = None
     
     def _connect(self):
         """Connect to Weaviate instance"""
         try:
-            # Temporarily disable Weaviate connection for development
-            logger.warning("Weaviate connection disabled for development")
-            self.client = None
-            return
             self.client = weaviate.Client(
                 url=settings.WEAVIATE_URL,
                 additional_headers={
@@ -140,6 +161,15 @@ class WeaviateService:
         Returns:
             String ID of created object
         """
+        if self.local_index:
+            try:
+                object_id = self.local_index.add(vector, properties)
+                logger.info(f"Added video segment to local index: {object_id}")
+                return object_id
+            except Exception as e:
+                logger.error(f"Error adding video segment to local index: {e}")
+                return ""
+        
         if not self.client:
             logger.error("Weaviate client not available")
             return ""
@@ -160,6 +190,84 @@ class WeaviateService:
             logger.error(f"Error adding video segment to Weaviate: {e}")
             return ""
     
+    def queue_video_segment(self, vector: List[float], properties: Dict[str, Any]) -> str:
+        """
+        Queue a video segment embedding for the next bulk write (blocks while the write buffer is full)
+        
+        Args:
+            vector: OpenCLIP embedding vector
+            properties: Metadata properties
+            
+        Returns:
+            String ID the object will be stored under ("" if it could not be queued)
+        """
+        if not self.local_index and not self.client:
+            logger.error("Weaviate client not available")
+            return ""
+        
+        try:
+            return self.batch_writer.add(vector, properties)
+        except Exception as e:
+            logger.error(f"Error queueing video segment: {e}")
+            return ""
+    
+    def flush_video_segments(self, object_ids: Optional[List[str]] = None, timeout: Optional[float] = None) -> List[str]:
+        """
+        Write every queued segment now (end of a video, shutdown)
+        
+        Args:
+            object_ids: IDs from queue_video_segment the caller is about to reference
+            timeout: Seconds to wait (None = until everything queued is written or dropped)
+            
+        Returns:
+            The object_ids that are not stored: their batch was dropped after its retries,
+            or (timeout) the buffer had not drained yet
+        """
+        object_ids = [object_id for object_id in (object_ids or []) if object_id]
+        if not self.batch_writer.flush(timeout):
+            logger.warning(f"⚠️ Vector writes still pending after {timeout}s, treating {len(object_ids)} segments as unstored")
+            self.batch_writer.pop_failed(object_ids)
+            return object_ids
+        return self.batch_writer.pop_failed(object_ids)
+    
+    def add_video_segments(self, segments: List[Dict[str, Any]]):
+        """
+        Add video segment embeddings in one bulk write (raises on failure, for the caller to retry)
+        
+        Args:
+            segments: [{"id": client-generated UUID, "vector": embedding, "properties": metadata}]
+        """
+        if not segments:
+            return
+        
+        if self.local_index:
+            self.local_index.add_many(
+                [segment["vector"] for segment in segments],
+                [segment["properties"] for segment in segments],
+                object_ids=[segment["id"] for segment in segments]
+            )
+            return
+        
+        if not self.client:
+            raise RuntimeError("Weaviate client not available")
+        
+        # Client-side UUIDs: a retried batch overwrites instead of duplicating
+        for segment in segments:
+            self.client.batch.add_data_object(
+                data_object=segment["properties"],
+                class_name="VideoSegment",
+                uuid=segment["id"],
+                vector=segment["vector"]
+            )
+        results = self.client.batch.create_objects() or []
+        
+        errors = [
+            result["result"]["errors"] for result in results
+            if result.get("result", {}).get("errors")
+        ]
+        if errors:
+            raise RuntimeError(f"{len(errors)}/{len(segments)} objects rejected: {errors[0]}")
+    
     def search_similar_segments(
         self, 
         query_vector: List[float], 
@@ -181,6 +289,21 @@ class WeaviateService:
         Returns:
             List of similar segments with metadata and similarity scores
         """
+        if self.local_index:
+            try:
+                segments = self.local_index.search(
+                    query_vector,
+                    limit=limit,
+                    property_id=property_id,
+                    scene_type=scene_type,
+                    min_confidence=min_confidence
+                )
+                logger.info(f"Found {len(segments)} similar segments")
+                return segments
+            except Exception as e:
+                logger.error(f"Error searching similar segments: {e}")
+                return []
+        
         if not self.client:
             logger.error("Weaviate client not available")
             return []
@@ -265,6 +388,9 @@ class WeaviateService:
         Returns:
             List of matching segments
         """
+        if self.local_index:
+            return self._search_local_by_keywords(text_query, limit)
+        
         if not self.client:
             return []
             
@@ -286,6 +412,50 @@ class WeaviateService:
             logger.error(f"Error searching by text: {e}")
             return []
     
+    def _search_local_by_keywords(self, text_query: str, limit: int) -> List[Dict[str, Any]]:
+        """Keyword search over local segment descriptions and tags (the local backend has no text encoder)"""
+        terms = {term for term in text_query.lower().split() if len(term) > 2}
+        if not terms:
+            return []
+        
+        scored = []
+        for segment in self.local_index.live_properties():
+            words = set((segment.get("description") or "").lower().split())
+            words.update(tag.lower() for tag in segment.get("tags") or [])
+            matched = len(terms & words)
+            if matched:
+                scored.append({**segment, "certainty": round(matched / len(terms), 3)})
+        
+        scored.sort(key=lambda segment: segment["certainty"], reverse=True)
+        return scored[:limit]
+    
+    def update_video_segment(self, object_id: str, properties: Dict[str, Any]) -> bool:
+        """
+        Merge properties into a stored segment
+        
+        Args:
+            object_id: ID returned by add_video_segment
+            properties: Properties to set
+            
+        Returns:
+            Success status
+        """
+        try:
+            if self.local_index:
+                return self.local_index.update(object_id, properties)
+            if not self.client:
+                return False
+            self.client.data_object.update(
+                uuid=object_id,
+                class_name="VideoSegment",
+                data_object=properties
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating video segment {object_id}: {e}")
+            return False
+    
     def delete_video_segments(self, video_id: str) -> bool:
         """
         Delete all segments for a specific video
@@ -296,18 +466,32 @@ class WeaviateService:
         Returns:
             Success status
         """
-        if not self.client:
+        if not self.local_index and not self.client:
             return False
-            
+        
+        # Queued segments of the video must land before the delete, not after it
+        self.batch_writer.flush()
+        
         try:
-            # Delete all objects with matching video_id
-            self.client.batch.delete_objects(
-                class_name="VideoSegment",
-                where={
-                    "path": ["video_id"],
-                    "operator": "Equal",
-                    "valueString": video_id
-                }
+            if self.local_index:
+                deleted = self.batch_writer.run_with_retries(
+                    lambda: self.local_index.delete_where("video_id", video_id),
+                    f"Delete of video {video_id} segments"
+                )
+                logger.info(f"Deleted {deleted} segments for video {video_id}")
+                return True
+            
+            # Delete all objects with matching video_id (one bulk request)
+            self.batch_writer.run_with_retries(
+                lambda: self.client.batch.delete_objects(
+                    class_name="VideoSegment",
+                    where={
+                        "path": ["video_id"],
+                        "operator": "Equal",
+                        "valueString": video_id
+                    }
+                ),
+                f"Delete of video {video_id} segments"
             )
             
             logger.info(f"Deleted segments for video {video_id}")
@@ -319,6 +503,17 @@ class WeaviateService:
     
     def get_segment_stats(self) -> Dict[str, Any]:
         """Get statistics about stored segments"""
+        if self.local_index:
+            scene_distribution = {}
+            for segment in self.local_index.live_properties():
+                scene_type = segment.get("scene_type")
+                scene_distribution[scene_type] = scene_distribution.get(scene_type, 0) + 1
+            return {
+                "total_segments": sum(scene_distribution.values()),
+                "scene_distribution": scene_distribution,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        
         if not self.client:
             return {}
             
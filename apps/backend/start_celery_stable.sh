@@ -89,7 +89,7 @@ trap cleanup SIGTERM SIGINT
 echo -e "${BLUE}🚀 Choisissez le mode de lancement:${NC}"
 echo "1) Worker seul (recommandé pour tests)"  
 echo "2) Worker + Beat (complet avec tâches périodiques)"
-echo "3) Superviseur automatique (redémarrage auto)"
+echo "3) Superviseur automatique (un worker par queue, redémarrage auto)"
 read -p "Choix [1-3]: " choice
 
 case $choice in
@@ -106,6 +106,7 @@ case $choice in
             --without-gossip \
             --without-mingle \
             --without-heartbeat \
+            --queues=celery,ingest,render,ai,maintenance \
             --hostname=stable-worker@%h
         ;;
     2)
@@ -127,6 +128,7 @@ case $choice in
             --without-gossip \
             --without-mingle \
             --without-heartbeat \
+            --queues=celery,ingest,render,ai,maintenance \
             --hostname=stable-worker@%h
         ;;
     3)
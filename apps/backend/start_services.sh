@@ -49,8 +49,19 @@ fi
 # Démarrer le serveur FastAPI backend
 start_service "Backend API" "python main.py"
 
-# Démarrer le worker Celery pour le processing vidéo
-start_service "Celery Worker" "celery -A core.celery_app worker --loglevel=info --concurrency=8"
+# Démarrer le sidecar d'inférence (modèles chargés une fois, partagés par les workers) si configuré
+INFERENCE_SERVER_URL=$(python -c "from core.config import settings; print(settings.INFERENCE_SERVER_URL)")
+if [ -n "$INFERENCE_SERVER_URL" ]; then
+    start_service "Inference Sidecar" "python scripts/inference_server.py"
+fi
+
+# Démarrer un worker Celery par queue (pool, concurrence et limites : core/celery_queues.WORKER_PROFILES,
+# source unique partagée avec scripts/celery_supervisor.py)
+WORKER_PROFILES=$(python -c "from core.celery_queues import WORKER_PROFILES; print(' '.join(WORKER_PROFILES))")
+for profile in $WORKER_PROFILES; do
+    worker_args=$(python -c "import sys; from core.celery_queues import worker_command_args; print(' '.join(worker_command_args(sys.argv[1])))" "$profile")
+    start_service "Celery Worker ($profile)" "celery -A core.celery_app worker --loglevel=info $worker_args"
+done
 
 # Démarrer Celery Beat pour les tâches périodiques (récupération automatique)
 start_service "Celery Beat (Auto-Recovery)" "celery -A core.celery_app beat --loglevel=info"
@@ -68,7 +79,8 @@ echo ""
 echo "📝 Services actifs:"
 echo "   - Backend API: http://localhost:8000"
 echo "   - Frontend: http://localhost:3000"
-echo "   - Celery Worker: actif pour le processing vidéo"
+echo "   - Celery Workers: $WORKER_PROFILES"
+[ -n "$INFERENCE_SERVER_URL" ] && echo "   - Inference Sidecar: $INFERENCE_SERVER_URL"
 echo "   - Celery Beat: récupération automatique toutes les 2min"
 echo "   - Redis: actif pour les tâches Celery"
 echo ""
@@ -30,6 +30,7 @@ stop_service() {
 stop_service "Frontend (npm)" "npm run dev"
 stop_service "Celery Beat" "celery -A core.celery_app beat"
 stop_service "Celery Worker" "celery -A core.celery_app worker"
+stop_service "Inference Sidecar" "python scripts/inference_server.py"
 stop_service "Backend API" "python main.py"
 
 # Optionnel: arrêter Redis si souhaité (décommentez la ligne suivante)
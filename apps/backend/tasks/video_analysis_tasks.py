@@ -56,7 +56,7 @@ def analyze_uploaded_video(self, video_id: str, s3_key: str):
         
         # Analyze video
         logger.info(f"Starting analysis of video file: {temp_file_path}")
-        analysis_success = video_analysis_service.analyze_video(video_id, temp_file_path)
+        analysis_success = video_analysis_service.analyze_video(video_id, temp_file_path, s3_key=s3_key)
         
         if not analysis_success:
             raise Exception(f"Video analysis failed for video {video_id}")
@@ -109,18 +109,11 @@ def _download_video_from_s3(s3_key: str, local_path: str) -> bool:
         Success status
     """
     try:
-        import boto3
-        from botocore.exceptions import ClientError
-        
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        
-        # Download file
-        s3_client.download_file(settings.AWS_S3_BUCKET, s3_key, local_path)
+        # Pooled, ranged download through the worker's source cache
+        from services.source_cache_service import source_cache_service
+        if not source_cache_service.fetch(s3_key, local_path):
+            logger.error(f"Failed to download {s3_key}")
+            return False
         
         # Verify file was downloaded
         if os.path.exists(local_path) and os.path.getsize(local_path) > 0:
@@ -130,9 +123,6 @@ def _download_video_from_s3(s3_key: str, local_path: str) -> bool:
             logger.error(f"Downloaded file is empty or missing: {local_path}")
             return False
             
-    except ClientError as e:
-        logger.error(f"AWS S3 error downloading {s3_key}: {e}")
-        return False
     except Exception as e:
         logger.error(f"Error downloading {s3_key}: {e}")
         return False
@@ -194,11 +184,7 @@ def _mark_segments_as_viral_reference(video_id: str):
             from services.weaviate_service import weaviate_service
             if segment.embedding_id:
                 # Update the object in Weaviate with viral reference flag
-                weaviate_service.client.data_object.update(
-                    uuid=segment.embedding_id,
-                    class_name="VideoSegment",
-                    data_object={"is_viral_reference": True}
-                )
+                weaviate_service.update_video_segment(segment.embedding_id, {"is_viral_reference": True})
         
         db.close()
         logger.info(f"Marked {len(segments)} segments as viral reference for video {video_id}")
@@ -9,8 +9,9 @@ import uuid
 import tempfile
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 
 from celery import current_task
 from core.celery_app import celery_app
@@ -19,7 +20,14 @@ from core.config import settings
 from models.video import Video
 from models.property import Property
 from models.viral_video_template import ViralVideoTemplate
+from models.video_media_index import VideoMediaIndex
 from services.s3_service import s3_service
+from services.source_cache_service import source_cache_service
+from services.video_conversion_service import video_conversion_service
+from services.video_render_service import video_render_service
+from services.render_cache_service import render_cache_service
+from services.shot_detector import shot_detector
+from services.ffmpeg_runner import ffmpeg_runner, ProgressCallback, celery_progress_callback, scaled_progress_callback
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +47,12 @@ def generate_video_from_timeline_v3(
     WORKFLOW:
     1. Get viral template script (clips with durations and descriptions)
     2. Get slot assignments (which video goes in which slot)
+       (an identical timeline already rendered is served from the render cache)
     3. For each clip in template: download assigned video, extract segment based on clip duration
+       (clips are processed concurrently on a bounded worker pool)
     4. Concatenate all segments in order
     5. Add text overlays if any
+       (4 and 5 run as one filter_complex encode unless RENDER_ENGINE is "legacy")
     6. Upload final video
     """
     
@@ -114,13 +125,15 @@ def generate_video_from_timeline_v3(
         for i, clip in enumerate(template_clips):
             logger.info(f"  Clip {i+1}: {clip.get('duration', 'no duration')}s - {clip.get('description', 'no description')[:50]}...")
         
-        # Create slot mapping: slotId -> videoId
+        # Create slot mapping: slotId -> videoId (and optional in-point in the source)
         slot_mapping = {}
+        slot_starts = {}
         for assignment in slot_assignments:
             slot_id = assignment.get("slotId")
             video_id_assigned = assignment.get("videoId")
             if slot_id and video_id_assigned:
                 slot_mapping[slot_id] = video_id_assigned
+                slot_starts[slot_id] = max(0.0, float(assignment.get("startTime") or 0))
         
         logger.info(f"🔗 Slot mapping: {slot_mapping}")
         
@@ -134,41 +147,76 @@ def generate_video_from_timeline_v3(
             meta={"stage": "processing_clips", "progress": 25}
         )
         
-        # Process each clip according to template order
-        video_segments = []
+        # Resolve each clip's source up front: the DB session stays on this thread
+        clip_jobs = []
         for i, clip in enumerate(template_clips):
-            try:
-                logger.info(f"🎬 Processing clip {i+1}/{len(template_clips)}")
-                
-                # Get assigned video for this slot
-                slot_id = f"slot_{i}"
-                assigned_video_id = slot_mapping.get(slot_id)
-                
-                if not assigned_video_id:
-                    logger.warning(f"No video assigned to {slot_id}, skipping clip {i+1}")
-                    continue
-                
-                # Get clip duration from template
-                clip_duration = clip.get("duration", 3.0)
-                clip_description = clip.get("description", "No description")
-                
-                logger.info(f"📏 Clip {i+1}: {clip_duration}s - {assigned_video_id}")
-                logger.info(f"📖 Description: {clip_description}")
-                
-                # Process this video segment
-                segment_info = _process_video_segment_v3(
-                    assigned_video_id, clip_duration, temp_dir, db, i
-                )
-                
-                if segment_info:
-                    video_segments.append(segment_info)
-                    logger.info(f"✅ Processed clip {i+1} successfully")
-                else:
-                    logger.warning(f"⚠️ Failed to process clip {i+1}")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error processing clip {i+1}: {e}")
+            slot_id = f"slot_{i}"
+            assigned_video_id = slot_mapping.get(slot_id)
+            
+            if not assigned_video_id:
+                logger.warning(f"No video assigned to {slot_id}, skipping clip {i+1}")
+                continue
+            
+            source_video = db.query(Video).filter(Video.id == assigned_video_id).first()
+            if not source_video or not source_video.video_url:
+                logger.warning(f"Video {assigned_video_id} not found or no URL, skipping clip {i+1}")
                 continue
+            
+            clip_duration = clip.get("duration", 3.0)
+            logger.info(f"📏 Clip {i+1}: {clip_duration}s - {assigned_video_id}")
+            logger.info(f"📖 Description: {clip.get('description', 'No description')}")
+            
+            # Keyframe and shot index persisted at ingest, if it still describes the stored file
+            source_s3_key = _extract_s3_key_v3(source_video.video_url)
+            media_index = db.query(VideoMediaIndex).filter(VideoMediaIndex.video_id == assigned_video_id).first()
+            keyframes = None
+            encoder_profile = None
+            start = slot_starts.get(slot_id, 0.0)
+            if media_index and media_index.s3_key == source_s3_key:
+                keyframes = media_index.keyframes
+                encoder_profile = media_index.encoder_profile
+                snapped_start = shot_detector.snap_to_shot_start(media_index.shots, start)
+                if snapped_start != start:
+                    logger.info(f"✂️ Clip {i+1} in-point snapped to shot start: {start}s -> {snapped_start}s")
+                    start = snapped_start
+            
+            clip_jobs.append({
+                "video_id": assigned_video_id,
+                "video_url": source_video.video_url,
+                "s3_key": source_s3_key,
+                "duration": clip_duration,
+                "start": start,
+                "keyframes": keyframes,
+                "encoder_profile": encoder_profile,
+                "order": i
+            })
+        
+        # An identical timeline (retry, regeneration) reuses the stored render
+        render_cache_key = render_cache_service.compute_key(clean_script, clip_jobs, text_overlays)
+        cached_render = render_cache_service.lookup(db, render_cache_key)
+        if cached_render:
+            return _complete_from_render_cache_v3(video, cached_render, render_cache_key, template_id, db)
+        
+        # Download the clips concurrently, keeping template order. The legacy engine
+        # also encodes each segment here; the single-pass engine only probes sources.
+        if settings.RENDER_ENGINE == "legacy":
+            video_segments = _run_clip_pool(
+                clip_jobs,
+                lambda job, threads: _process_video_segment_v3(
+                    job["video_id"], job["video_url"], job["duration"], temp_dir, job["order"], threads,
+                    start=job["start"]
+                ),
+                progress_callback=celery_progress_callback("processing_clips", 25, 60)
+            )
+        else:
+            video_segments = _run_clip_pool(
+                clip_jobs,
+                lambda job, threads: _prepare_clip_source_v3(
+                    job["video_id"], job["video_url"], job["duration"], temp_dir, job["order"],
+                    start=job["start"], keyframes=job["keyframes"], encoder_profile=job["encoder_profile"]
+                ),
+                progress_callback=celery_progress_callback("processing_clips", 25, 60)
+            )
         
         if not video_segments:
             raise ValueError("No video segments could be processed")
@@ -182,13 +230,24 @@ def generate_video_from_timeline_v3(
         )
         
         # Assemble final video
-        final_video_path = _assemble_final_video_v3(
-            video_segments=video_segments,
-            text_overlays=text_overlays,
-            template_texts=template_texts,
-            temp_dir=temp_dir,
-            video_id=video_id
-        )
+        render_mode = settings.RENDER_ENGINE
+        if settings.RENDER_ENGINE == "legacy":
+            final_video_path = _assemble_final_video_v3(
+                video_segments=video_segments,
+                text_overlays=text_overlays,
+                template_texts=template_texts,
+                temp_dir=temp_dir,
+                video_id=video_id,
+                progress_callback=celery_progress_callback("assembling_video", 60, 85)
+            )
+        else:
+            final_video_path, render_mode = _render_final_video_v3(
+                clip_sources=video_segments,
+                text_overlays=text_overlays,
+                temp_dir=temp_dir,
+                video_id=video_id,
+                progress_callback=celery_progress_callback("assembling_video", 60, 85)
+            )
         
         # Update progress
         current_task.update_state(
@@ -199,6 +258,7 @@ def generate_video_from_timeline_v3(
         # Upload to S3
         logger.info(f"📤 About to upload video to S3: {final_video_path}")
         video_url, thumbnail_url = _upload_to_s3_v3(final_video_path, video_id, property_id)
+        final_s3_key = _generated_video_s3_key(video_id, property_id)
         logger.info(f"✅ Upload completed. Video URL: {video_url}, Thumbnail URL: {thumbnail_url}")
         
         # Calculate total duration
@@ -219,6 +279,9 @@ def generate_video_from_timeline_v3(
             "actual_duration": actual_duration,
             "expected_duration": sum(clip.get("duration", 0) for clip in template_clips),
             "generation_method": "timeline_v3",
+            "render_engine": settings.RENDER_ENGINE,
+            "render_mode": render_mode,
+            "render_cache": "miss" if render_cache_key else "disabled",
             "segments": [{"video_id": seg.get("video_id"), "duration": seg.get("duration")} for seg in video_segments]
         }
         video.source_data = json.dumps(generation_metadata)
@@ -228,6 +291,12 @@ def generate_video_from_timeline_v3(
         
         db.commit()
         
+        # The description is stored with the render: a cache hit reuses it instead of calling Groq
+        render_cache_service.store(
+            db, render_cache_key, final_s3_key, thumbnail_url,
+            actual_duration, {**generation_metadata, "ai_description": video.ai_description}, video_id
+        )
+        
         # Final progress update
         current_task.update_state(
             state="SUCCESS",
@@ -279,94 +348,305 @@ def generate_video_from_timeline_v3(
                 logger.warning(f"Failed to cleanup temp directory: {e}")
 
 
+def _get_clip_worker_count(clip_count: int) -> int:
+    """Size the clip pool from RENDER_CLIP_WORKERS, defaulting to the host's cores"""
+    max_workers = settings.RENDER_CLIP_WORKERS or os.cpu_count() or 1
+    return max(1, min(max_workers, clip_count))
+
+
+def _run_clip_pool(
+    clip_jobs: List[Dict[str, Any]],
+    worker_fn: Callable[[Dict[str, Any], int], Optional[Dict[str, Any]]],
+    progress_callback: Optional[ProgressCallback] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run worker_fn(job, encoder_threads) for every clip on a bounded worker pool.
+    
+    A failed clip is logged and dropped without discarding the others, and the
+    returned results are sorted back into template order. progress_callback is
+    called as each clip finishes.
+    """
+    if not clip_jobs:
+        return []
+    
+    workers = _get_clip_worker_count(len(clip_jobs))
+    # Split the cores between concurrent encodes instead of oversubscribing them
+    encoder_threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"⚡ Processing {len(clip_jobs)} clips with {workers} workers ({encoder_threads} encoder threads each)")
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip") as executor:
+        futures = {executor.submit(worker_fn, job, encoder_threads): job for job in clip_jobs}
+        
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            if progress_callback:
+                progress_callback({"percent": done_count / len(clip_jobs) * 100, "eta_seconds": None})
+            
+            clip_number = futures[future]["order"] + 1
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"❌ Error processing clip {clip_number}: {e}")
+                continue
+            
+            if result:
+                results.append(result)
+                logger.info(f"✅ Processed clip {clip_number} successfully")
+            else:
+                logger.warning(f"⚠️ Failed to process clip {clip_number}")
+    
+    results.sort(key=lambda item: item["order"])
+    return results
+
+
+def _extract_s3_key_v3(video_url: str) -> Optional[str]:
+    """Extract the object key from an s3://bucket/key video URL"""
+    if not video_url or not video_url.startswith("s3://"):
+        return None
+    
+    # Format: s3://bucket-name/key -> extract key part
+    url_without_protocol = video_url[5:]  # Remove "s3://"
+    
+    # Remove any query parameters (like AWS signature parameters)
+    if '?' in url_without_protocol:
+        url_without_protocol = url_without_protocol.split('?')[0]
+    
+    parts = url_without_protocol.split("/", 1)  # Remove bucket name, keep key
+    return parts[1] if len(parts) == 2 else None
+
+
+def _download_clip_source_v3(
+    video_id: str,
+    video_url: str,
+    temp_dir: str,
+    segment_index: int
+) -> Optional[str]:
+    """Download the source video of a clip into temp_dir and return its local path"""
+    s3_key = _extract_s3_key_v3(video_url)
+    if not s3_key:
+        logger.warning(f"Invalid video URL format: {video_url}")
+        return None
+    logger.info(f"📦 Extracted clean S3 key: {s3_key} from URL: {video_url}")
+    
+    # Download video (adapt based on storage backend)
+    local_video_path = os.path.join(temp_dir, f"source_{segment_index}.mp4")
+    
+    logger.info(f"🔧 Storage backend: {settings.STORAGE_BACKEND}")
+    
+    if settings.STORAGE_BACKEND == "s3":
+        # Library clips are reused across renders: serve them from the worker's cache
+        if not source_cache_service.fetch(s3_key, local_video_path):
+            logger.warning(f"Failed to download video {video_id}")
+            return None
+    else:
+        # Local storage - copy file directly
+        local_source_path = os.path.join("uploads", s3_key)
+        
+        if not os.path.exists(local_source_path):
+            logger.warning(f"Local file not found: {local_source_path}")
+            return None
+        
+        import shutil
+        shutil.copy2(local_source_path, local_video_path)
+    
+    return local_video_path
+
+
+def _encode_segment_v3(
+    source_path: str,
+    duration: float,
+    temp_dir: str,
+    segment_index: int,
+    encoder_threads: int = 0,
+    start: float = 0.0
+) -> Optional[str]:
+    """Encode `duration` seconds of a source from `start` into a standalone segment"""
+    segment_path = os.path.join(temp_dir, f"segment_{segment_index}.mp4")
+    
+    # Input-side seek: jumps to the keyframe before `start` instead of decoding from 0
+    ffmpeg_cmd = [
+        "ffmpeg", "-y", "-ss", str(start), "-i", source_path,
+        "-t", str(duration),
+        "-c:v", "libx264", "-c:a", "aac", 
+        "-r", "30", "-crf", "23",
+        "-threads", str(encoder_threads),
+        "-avoid_negative_ts", "make_zero",
+        segment_path
+    ]
+    
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=60)
+    
+    if result.returncode == 0 and os.path.exists(segment_path):
+        return segment_path
+    
+    logger.warning(f"FFmpeg failed for segment {segment_index}: {result.stderr}")
+    return None
+
+
 def _process_video_segment_v3(
     video_id: str, 
+    video_url: str,
     duration: float, 
     temp_dir: str, 
-    db, 
-    segment_index: int
+    segment_index: int,
+    encoder_threads: int = 0,
+    start: float = 0.0
 ) -> Optional[Dict[str, Any]]:
-    """Process a single video segment according to viral template duration"""
+    """Process a single video segment according to viral template duration (legacy engine)"""
     try:
         logger.info(f"🎬 Processing segment {segment_index}: video={video_id}, duration={duration}s")
         
-        # Get video from database
-        video_record = db.query(Video).filter(Video.id == video_id).first()
-        if not video_record or not video_record.video_url:
-            logger.warning(f"Video {video_id} not found or no URL")
+        local_video_path = _download_clip_source_v3(video_id, video_url, temp_dir, segment_index)
+        if not local_video_path:
             return None
         
-        # Extract S3 key from video URL
-        if video_record.video_url.startswith("s3://"):
-            # Format: s3://bucket-name/key -> extract key part
-            url_without_protocol = video_record.video_url[5:]  # Remove "s3://"
-            
-            # Remove any query parameters (like AWS signature parameters)
-            if '?' in url_without_protocol:
-                url_without_protocol = url_without_protocol.split('?')[0]
-            
-            s3_key = url_without_protocol.split("/", 1)[1]  # Remove bucket name, keep key
-            logger.info(f"📦 Extracted clean S3 key: {s3_key} from URL: {video_record.video_url}")
-        else:
-            logger.warning(f"Invalid video URL format: {video_record.video_url}")
+        # Extract segment with specified duration from the in-point
+        segment_path = _encode_segment_v3(
+            local_video_path, duration, temp_dir, segment_index, encoder_threads, start
+        )
+        if not segment_path:
             return None
         
-        # Download video (adapt based on storage backend)
-        local_video_path = os.path.join(temp_dir, f"source_{segment_index}.mp4")
-        
-        logger.info(f"🔧 Storage backend: {settings.STORAGE_BACKEND}")
+        # Cleanup source
+        os.remove(local_video_path)
         
-        if settings.STORAGE_BACKEND == "s3":
-            download_url = s3_service.generate_presigned_download_url(s3_key)
-            
-            download_cmd = ["curl", "-s", "--max-time", "60", "-o", local_video_path, download_url]
-            result = subprocess.run(download_cmd, capture_output=True, text=True, timeout=120)
-            
-            if result.returncode != 0 or not os.path.exists(local_video_path):
-                logger.warning(f"Failed to download video {video_id}: {result.stderr}")
-                return None
-        else:
-            # Local storage - copy file directly
-            local_source_path = os.path.join("uploads", s3_key)
-            
-            if not os.path.exists(local_source_path):
-                logger.warning(f"Local file not found: {local_source_path}")
-                return None
+        return {
+            "path": segment_path,
+            "duration": duration,
+            "order": segment_index,
+            "video_id": video_id
+        }
             
-            import shutil
-            shutil.copy2(local_source_path, local_video_path)
+    except Exception as e:
+        logger.error(f"Error processing video segment {segment_index}: {e}")
+        return None
+
+
+def _prepare_clip_source_v3(
+    video_id: str,
+    video_url: str,
+    duration: float,
+    temp_dir: str,
+    segment_index: int,
+    start: float = 0.0,
+    keyframes: Optional[List[Dict[str, float]]] = None,
+    encoder_profile: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Download and probe a clip source for the single-pass renderer (no encode)"""
+    try:
+        logger.info(f"🎬 Preparing clip source {segment_index}: video={video_id}, duration={duration}s")
         
-        # Extract segment with specified duration from the beginning
-        segment_path = os.path.join(temp_dir, f"segment_{segment_index}.mp4")
+        local_video_path = _download_clip_source_v3(video_id, video_url, temp_dir, segment_index)
+        if not local_video_path:
+            return None
         
-        ffmpeg_cmd = [
-            "ffmpeg", "-y", "-i", local_video_path,
-            "-ss", "0", "-t", str(duration),
-            "-c:v", "libx264", "-c:a", "aac", 
-            "-r", "30", "-crf", "23",
-            "-avoid_negative_ts", "make_zero",
-            segment_path
-        ]
+        metadata = video_conversion_service.get_video_metadata(local_video_path)
+        if metadata.get("error"):
+            logger.warning(f"Failed to probe source {segment_index}: {metadata['error']}")
+            return None
         
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=60)
+        # A source shorter than its slot only contributes what it has after the in-point
+        source_duration = metadata.get("duration", 0)
+        if source_duration > 0 and start >= source_duration:
+            logger.warning(f"In-point {start}s is past the end of source {segment_index}, using 0")
+            start = 0.0
+        clip_duration = min(duration, source_duration - start) if source_duration > 0 else duration
+        
+        return {
+            "path": local_video_path,
+            "duration": clip_duration,
+            "order": segment_index,
+            "video_id": video_id,
+            "has_audio": bool(metadata.get("audio_codec")),
+            "start": start,
+            "keyframes": keyframes,
+            "encoder_profile": encoder_profile,
+            "metadata": metadata
+        }
         
-        if result.returncode == 0 and os.path.exists(segment_path):
-            # Cleanup source
-            os.remove(local_video_path)
-            
-            return {
-                "path": segment_path,
-                "duration": duration,
-                "order": segment_index,
-                "video_id": video_id
-            }
-        else:
-            logger.warning(f"FFmpeg failed for segment {segment_index}: {result.stderr}")
-            return None
-            
     except Exception as e:
-        logger.error(f"Error processing video segment {segment_index}: {e}")
+        logger.error(f"Error preparing clip source {segment_index}: {e}")
+        return None
+
+
+def _encode_clip_source_v3(
+    source: Dict[str, Any],
+    temp_dir: str,
+    encoder_threads: int = 0
+) -> Optional[Dict[str, Any]]:
+    """Encode an already downloaded clip source into a legacy segment"""
+    segment_path = _encode_segment_v3(
+        source["path"], source["duration"], temp_dir, source["order"], encoder_threads,
+        source.get("start", 0.0)
+    )
+    if not segment_path:
         return None
+    return {**source, "path": segment_path}
+
+
+def _render_final_video_v3(
+    clip_sources: List[Dict[str, Any]],
+    text_overlays: List[Dict[str, Any]],
+    temp_dir: str,
+    video_id: str,
+    progress_callback: Optional[ProgressCallback] = None
+) -> tuple[str, str]:
+    """
+    Render the timeline, cheapest path first: smart-cut (stream copy) when every source
+    is an ingest mezzanine in the render profile and nothing is drawn on top, then a single encode,
+    then the legacy segment chain.
+    
+    Returns:
+        Tuple of (final video path, render mode used)
+    """
+    final_video_path = os.path.join(temp_dir, f"final_{video_id}.mp4")
+    
+    has_text = bool(video_render_service.build_drawtext_filters(text_overlays))
+    if (
+        settings.RENDER_SMART_CUT
+        and not has_text
+        and video_render_service.can_smart_cut(clip_sources)
+    ):
+        smart_cut_dir = os.path.join(temp_dir, "smart_cut")
+        os.makedirs(smart_cut_dir, exist_ok=True)
+        
+        smart_cut_result = video_render_service.render_smart_cut(
+            clip_sources, final_video_path, smart_cut_dir, progress_callback=progress_callback
+        )
+        if smart_cut_result["success"]:
+            return final_video_path, "smart_cut"
+        logger.warning("🔄 Smart-cut render failed, falling back to single-pass encode")
+    
+    render_result = video_render_service.render_timeline(
+        clip_sources, text_overlays, final_video_path,
+        encoder_threads=os.cpu_count() or 0,
+        progress_callback=progress_callback
+    )
+    if render_result["success"]:
+        return final_video_path, "filtergraph"
+    
+    # The legacy chain draws the same text with the same filters: it would only fail again, slower
+    if has_text and video_render_service.is_drawtext_error(render_result.get("error")):
+        raise Exception(f"Text overlay rendering failed: {render_result['error'][-500:]}")
+    
+    logger.warning("🔄 Single-pass render failed, falling back to segment encode + concat")
+    video_segments = _run_clip_pool(
+        clip_sources,
+        lambda source, threads: _encode_clip_source_v3(source, temp_dir, threads),
+        progress_callback=scaled_progress_callback(progress_callback, 0, 50)
+    )
+    if not video_segments:
+        raise ValueError("No video segments could be encoded")
+    
+    final_video_path = _assemble_final_video_v3(
+        video_segments=video_segments,
+        text_overlays=text_overlays,
+        template_texts=[],
+        temp_dir=temp_dir,
+        video_id=video_id,
+        progress_callback=scaled_progress_callback(progress_callback, 50, 100)
+    )
+    return final_video_path, "segment_fallback"
 
 
 def _assemble_final_video_v3(
@@ -374,7 +654,8 @@ def _assemble_final_video_v3(
     text_overlays: List[Dict[str, Any]],
     template_texts: List[Dict[str, Any]],
     temp_dir: str,
-    video_id: str
+    video_id: str,
+    progress_callback: Optional[ProgressCallback] = None
 ) -> str:
     """Assemble final video with proper concatenation"""
     
@@ -382,6 +663,11 @@ def _assemble_final_video_v3(
     video_segments.sort(key=lambda x: x.get("order", 0))
     
     final_video_path = os.path.join(temp_dir, f"final_{video_id}.mp4")
+    total_duration = sum(segment.get("duration", 0) for segment in video_segments)
+    
+    # The text overlay pass is a second full encode: give each pass its share
+    concat_end = 50 if text_overlays else 100
+    concat_progress = scaled_progress_callback(progress_callback, 0, concat_end)
     
     if len(video_segments) == 1:
         # Single segment - scale to 9:16 format for social media
@@ -393,7 +679,7 @@ def _assemble_final_video_v3(
             final_video_path
         ]
         
-        result = subprocess.run(scale_cmd, capture_output=True, text=True, timeout=300)
+        result = ffmpeg_runner.run(scale_cmd, total_duration, progress_callback=concat_progress, timeout=300)
         
         if result.returncode != 0:
             logger.error(f"Single segment scaling failed: {result.stderr}")
@@ -420,7 +706,7 @@ def _assemble_final_video_v3(
             final_video_path
         ]
         
-        result = subprocess.run(concat_cmd, capture_output=True, text=True, timeout=300)
+        result = ffmpeg_runner.run(concat_cmd, total_duration, progress_callback=concat_progress, timeout=300)
         
         if result.returncode != 0:
             logger.error(f"Concatenation failed: {result.stderr}")
@@ -432,7 +718,8 @@ def _assemble_final_video_v3(
     if text_overlays:
         logger.info(f"📝 Applying {len(text_overlays)} custom text overlays")
         final_video_path = _apply_text_overlays_v3(
-            final_video_path, text_overlays, [], temp_dir, video_id
+            final_video_path, text_overlays, [], temp_dir, video_id,
+            progress_callback=scaled_progress_callback(progress_callback, concat_end, 100)
         )
     else:
         logger.info("📝 No text overlays to apply")
@@ -448,7 +735,8 @@ def _apply_text_overlays_v3(
     text_overlays: List[Dict[str, Any]],
     template_texts: List[Dict[str, Any]],
     temp_dir: str,
-    video_id: str
+    video_id: str,
+    progress_callback: Optional[ProgressCallback] = None
 ) -> str:
     """Apply text overlays to video using FFmpeg drawtext filters"""
     try:
@@ -473,100 +761,8 @@ def _apply_text_overlays_v3(
             logger.info("📝 No text content to apply")
             return input_video_path
         
-        # Video dimensions (9:16 portrait format)
-        video_width = 1080
-        video_height = 1920
-        
-        # Build FFmpeg drawtext filters
-        text_filters = []
-        for i, text_info in enumerate(all_texts):
-            content = text_info.get("content", "").strip()
-            if not content:
-                logger.warning(f"📝 Skipping empty text content at index {i}")
-                continue
-                
-            start_time = text_info.get("start_time", 0)
-            end_time = text_info.get("end_time", start_time + 3)
-            position = text_info.get("position", {})
-            style = text_info.get("style", {})
-            
-            # COORDONNÉES NORMALISÉES Canvas (0-100%) → pixels vidéo
-            x_percent = float(position.get("x", 50))  # Default center (50%)
-            y_percent = float(position.get("y", 50))  # Default center (50%)
-            anchor = position.get("anchor", "center")
-            
-            # Conversion pourcentages → pixels vidéo
-            x_pixels = int((x_percent / 100) * video_width)
-            y_pixels = int((y_percent / 100) * video_height)
-            
-            logger.info(f"🎯 Canvas text '{content}': {x_percent}%,{y_percent}% → {x_pixels}px,{y_pixels}px (anchor: {anchor})")
-            
-            # Font configuration
-            font_file = "/System/Library/Fonts/Helvetica.ttc"
-            
-            # Taille de police en pourcentage de la hauteur vidéo (comme Canvas editor)
-            font_size_percent = float(style.get("font_size", 8))  # Default 8% de la hauteur
-            font_size = int((font_size_percent / 100) * video_height)
-            
-            font_color = style.get("color", "#FFFFFF")
-            
-            # Convert color format
-            if font_color.startswith("#"):
-                font_color = f"0x{font_color[1:]}"
-            else:
-                font_color = "white"
-            
-            # FFmpeg positioning - adjust for anchor center
-            # Canvas uses center-based positioning, FFmpeg uses top-left corner
-            if anchor == "center":
-                # Pour centrer le texte, on utilise FFmpeg's text positioning
-                # x=W/2:y=H/2 avec text_align=center et text_valign=middle
-                ffmpeg_x = f"(w-text_w)/2"  # Centre horizontal
-                ffmpeg_y = f"(h-text_h)/2"  # Centre vertical
-                
-                # Mais on veut placer à une position spécifique, pas au centre de l'écran
-                # Donc on utilise la position directe mais on centre le texte autour de ce point
-                ffmpeg_x = f"{x_pixels}-(text_w/2)"  # Centre le texte horizontalement autour du point
-                ffmpeg_y = f"{y_pixels}-(text_h/2)"  # Centre le texte verticalement autour du point
-            else:
-                # Position top-left classique
-                ffmpeg_x = str(max(0, min(x_pixels, video_width - 50)))
-                ffmpeg_y = str(max(0, min(y_pixels, video_height - 50)))
-            
-            logger.info(f"📍 FFmpeg positioning: '{content}' at ({ffmpeg_x},{ffmpeg_y}) with anchor={anchor}")
-            
-            # Escape text for FFmpeg
-            safe_text = (content
-                        .replace("\\", "\\\\")
-                        .replace("'", "\\'")
-                        .replace('"', '\\"')
-                        .replace(":", "\\:")
-                        .replace("=", "\\=")
-                        .replace(",", "\\,")
-                        .replace("[", "\\[")
-                        .replace("]", "\\]"))
-            
-            # Create drawtext filter
-            # Get text alignment for multiline text
-            text_align = text_info.get("style", {}).get("text_align", "center")
-            alignment_map = {"left": "left", "center": "center", "right": "right"}
-            text_alignment = alignment_map.get(text_align, "center")
-            
-            text_filter = f"drawtext=text='{safe_text}':fontfile={font_file}:fontsize={font_size}:fontcolor={font_color}:x={ffmpeg_x}:y={ffmpeg_y}"
-            
-            # Add text effects based on style
-            if style.get("shadow", True):  # Default shadow on
-                text_filter += ":shadowcolor=black@0.8:shadowx=2:shadowy=2"
-            
-            if style.get("outline", False):
-                text_filter += ":bordercolor=black:borderw=2"
-            
-            if style.get("background", False):
-                text_filter += ":box=1:boxcolor=black@0.5:boxborderw=10"
-            
-            # Add timing
-            text_filter += f":enable='between(t,{start_time},{end_time})'"
-            text_filters.append(text_filter)
+        # Build FFmpeg drawtext filters (shared with the single-pass renderer)
+        text_filters = video_render_service.build_drawtext_filters(all_texts)
         
         if not text_filters:
             logger.info("📝 No valid text filters created")
@@ -587,7 +783,8 @@ def _apply_text_overlays_v3(
             output_video_path
         ]
         
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=300)
+        input_duration = video_conversion_service.get_video_metadata(input_video_path).get("duration", 0)
+        result = ffmpeg_runner.run(ffmpeg_cmd, input_duration, progress_callback=progress_callback, timeout=300)
         
         if result.returncode != 0 or not os.path.exists(output_video_path):
             logger.error(f"❌ Text overlay application failed: {result.stderr}")
@@ -602,15 +799,65 @@ def _apply_text_overlays_v3(
         return input_video_path
 
 
+def _generated_video_s3_key(video_id: str, property_id: str) -> str:
+    """S3 key of a generated video"""
+    return f"generated-videos/{property_id}/{video_id}.mp4"
+
+
+def _complete_from_render_cache_v3(
+    video: Video,
+    cached_render,
+    render_cache_key: str,
+    template_id: str,
+    db
+) -> Dict[str, Any]:
+    """Complete a generation job with the stored output of an identical timeline"""
+    video_url = s3_service.generate_presigned_download_url(cached_render.video_s3_key, expires_in=86400)
+    
+    video.status = "completed"
+    video.video_url = video_url
+    video.thumbnail_url = cached_render.thumbnail_url
+    video.duration = cached_render.duration
+    video.completed_at = datetime.now()
+    
+    generation_metadata = json.loads(cached_render.generation_metadata or "{}")
+    cached_description = generation_metadata.pop("ai_description", None)
+    generation_metadata.update({
+        "render_cache": "hit",
+        "render_cache_key": render_cache_key,
+        "rendered_by_video_id": cached_render.source_video_id
+    })
+    video.source_data = json.dumps(generation_metadata)
+    
+    # Same timeline, same property: reuse the stored description (entries cached before it was stored call Groq)
+    _post_process_video_metadata(video.id, template_id, db, ai_description=cached_description)
+    
+    db.commit()
+    
+    current_task.update_state(
+        state="SUCCESS",
+        meta={"stage": "completed", "progress": 100}
+    )
+    
+    logger.info(f"🎉 Video generation v3 completed from render cache: {video.id}")
+    
+    return {
+        "video_id": video.id,
+        "video_url": video_url,
+        "thumbnail_url": cached_render.thumbnail_url,
+        "status": "completed",
+        "segments_processed": generation_metadata.get("segments_count", 0),
+        "duration": cached_render.duration,
+        "render_cache": "hit"
+    }
+
+
 def _upload_to_s3_v3(video_path: str, video_id: str, property_id: str) -> tuple[str, str]:
     """Upload video to S3 and return URLs"""
     
-    s3_key = f"generated-videos/{property_id}/{video_id}.mp4"
+    s3_key = _generated_video_s3_key(video_id, property_id)
     
-    with open(video_path, 'rb') as video_file:
-        upload_result = s3_service.upload_file_direct(
-            video_file, s3_key, content_type="video/mp4", public_read=False
-        )
+    upload_result = s3_service.upload_from_path(video_path, s3_key, content_type="video/mp4")
     
     if not upload_result.get('success'):
         raise Exception("S3 upload failed")
@@ -639,8 +886,16 @@ def _upload_to_s3_v3(video_path: str, video_id: str, property_id: str) -> tuple[
     return video_url, thumbnail_url
 
 
-def _post_process_video_metadata(video_id: str, template_id: str, db):
-    """Generate AI description and add Instagram audio URL after video completion"""
+def _post_process_video_metadata(video_id: str, template_id: str, db, ai_description: Optional[str] = None):
+    """
+    Generate AI description and add Instagram audio URL after video completion
+    
+    Args:
+        video_id: Generated video
+        template_id: Viral template (Instagram audio URL)
+        db: Database session
+        ai_description: Description already generated for the same render (skips Groq)
+    """
     try:
         from models.viral_video_template import ViralVideoTemplate
         from models.video import Video
@@ -667,6 +922,12 @@ def _post_process_video_metadata(video_id: str, template_id: str, db):
                 video.instagram_audio_url = template.video_link
                 logger.info(f"📱 Added Instagram audio URL: {template.video_link}")
         
+        if ai_description:
+            video.ai_description = ai_description
+            db.commit()
+            logger.info(f"♻️ Reused the AI description of the cached render for {video_id}")
+            return
+        
         # Generate AI description using Groq
         try:
             from services.groq_service import groq_service
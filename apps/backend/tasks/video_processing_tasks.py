@@ -1,19 +1,20 @@
-from celery import current_task
+from celery import current_task, chord, group
 from core.celery_app import celery_app
 from core.database import get_db
 from models.video import Video
 from models.property import Property
+from models.video_media_index import VideoMediaIndex
 from services.s3_service import s3_service
+from services.source_cache_service import source_cache_service
 # Local storage service removed - using S3 only
 from services.video_conversion_service import video_conversion_service
-try:
-    from services.openai_vision_service import openai_vision_service
-    ai_analysis_service = openai_vision_service
-except ImportError:
-    ai_analysis_service = None
+from services.shot_detector import shot_detector
+from services.ffmpeg_runner import celery_progress_callback
+from services.ai_description_service import ai_description_service
+from services.video_fingerprint_service import video_fingerprint_service
 from core.config import settings
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 import tempfile
 import os
@@ -30,12 +31,17 @@ def process_uploaded_video(
     s3_key: str
 ) -> Dict[str, Any]:
     """
-    Process uploaded video:
-    1. Download from S3
-    2. Convert to standard format (1080x1920, 30fps, H.264, AAC)
-    3. Generate content description script
-    4. Upload converted video back to S3
-    5. Update video record
+    Process uploaded video as a task DAG:
+    1. Download, probe and fingerprint (this task); a re-upload of footage the property
+       already has reuses its processed outputs and stops here. One fast-seek frame is
+       extracted and stored for the description step
+    2. In parallel:
+       - One decode pass (ingest queue): converted video, thumbnail, analysis frames
+         and scrub sprite sheet, all uploaded
+       - AI content description from the fast-seek frame (ai queue)
+    3. Join: update the video record once, delete the original
+    
+    The source is decoded once for its outputs; the AI call overlaps the conversion.
     """
     try:
         # Get database session
@@ -59,38 +65,11 @@ def process_uploaded_video(
         logger.info(f"🎬 Processing uploaded video: {video.title}")
         logger.info(f"📁 S3 Key: {s3_key}")
         
-        # Create temporary directory for processing
         temp_dir = tempfile.mkdtemp(prefix=f"video_process_{video_id}_")
-        original_path = os.path.join(temp_dir, f"original_{video_id}.mp4")
-        converted_path = os.path.join(temp_dir, f"converted_{video_id}.mp4")
-        
         try:
-            # Step 1: Download original video (adapt based on storage backend)
-            if settings.STORAGE_BACKEND == "s3":
-                logger.info("📥 Downloading original video from S3...")
-                download_url = s3_service.generate_presigned_download_url(s3_key, expires_in=3600)
-                
-                # Download using curl
-                download_cmd = ["curl", "-s", "-o", original_path, download_url]
-                result = subprocess.run(download_cmd, capture_output=True, text=True, timeout=300)
-                
-                if result.returncode != 0 or not os.path.exists(original_path):
-                    raise Exception(f"Failed to download video: {result.stderr}")
-                
-            else:
-                # Local storage - copy file directly
-                logger.info("📥 Copying original video from local storage...")
-                local_file_path = os.path.join("uploads", s3_key)
-                
-                if not os.path.exists(local_file_path):
-                    raise Exception(f"Local file not found: {local_file_path}")
-                
-                import shutil
-                shutil.copy2(local_file_path, original_path)
+            # Step 1: Download original video and probe it
+            original_path = _fetch_ingest_source(s3_key, video_id, temp_dir)
             
-            logger.info(f"✅ Video ready for processing: {os.path.getsize(original_path):,} bytes")
-            
-            # Update progress
             current_task.update_state(
                 state="PROGRESS",
                 meta={
@@ -100,224 +79,72 @@ def process_uploaded_video(
                 }
             )
             
-            # Step 2: Get original video metadata
             original_metadata = video_conversion_service.get_video_metadata(original_path)
             logger.info(f"📊 Original metadata: {original_metadata}")
             
-            # Step 3: Check if conversion is needed
-            needs_conversion = video_conversion_service.is_conversion_needed(original_metadata)
-            
-            if needs_conversion:
-                logger.info("🔄 Video conversion needed")
-                
-                # Update progress
-                current_task.update_state(
-                    state="PROGRESS",
-                    meta={
-                        "stage": "converting",
-                        "progress": 40,
-                        "video_id": video_id
-                    }
-                )
-                
-                # Step 4: Convert video to standard format
-                conversion_result = video_conversion_service.convert_to_standard_format(
-                    original_path, 
-                    converted_path
-                )
-                
-                if not conversion_result["success"]:
-                    raise Exception(f"Video conversion failed: {conversion_result['error']}")
-                
-                logger.info("✅ Video conversion completed")
-                final_video_path = converted_path
-                final_metadata = conversion_result["output_metadata"]
-                
-            else:
-                logger.info("✅ Video already in standard format")
-                final_video_path = original_path
-                final_metadata = original_metadata
-            
-            # Update progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={
-                    "stage": "generating_script",
-                    "progress": 60,
-                    "video_id": video_id
-                }
-            )
-            
-            # Step 5: Generate content description script
-            logger.info("📝 Generating content description...")
-            content_description = generate_video_content_description(
-                final_video_path, 
-                video.title,
-                video.property_id,
-                db
-            )
-            
-            # Update progress
-            current_task.update_state(
-                state="PROGRESS",
-                meta={
-                    "stage": "uploading",
-                    "progress": 80,
-                    "video_id": video_id
-                }
-            )
-            
-            # Step 6: Upload processed video (adapt based on storage backend)
-            final_s3_key = s3_key
-            if needs_conversion:
-                # Upload converted video with "_processed" suffix
-                base_key = s3_key.rsplit('.', 1)[0]  # Remove extension
-                final_s3_key = f"{base_key}_processed.mp4"
-                
-                if settings.STORAGE_BACKEND == "s3":
-                    logger.info(f"☁️ Uploading converted video to S3: {final_s3_key}")
-                    with open(final_video_path, 'rb') as video_file:
-                        upload_result = s3_service.upload_file_direct(
-                            video_file, 
-                            final_s3_key, 
-                            content_type="video/mp4",
-                            public_read=False
-                        )
-                    
-                    if not upload_result.get("success"):
-                        raise Exception(f"Failed to upload converted video: {upload_result.get('error')}")
-                    
-                    logger.info("✅ Converted video uploaded to S3")
-                    
-                    # Clean up original file to save storage costs
-                    try:
-                        logger.info(f"🗑️ Deleting original file: {s3_key}")
-                        if s3_service.delete_file(s3_key):
-                            logger.info("✅ Original file deleted successfully")
-                        else:
-                            logger.warning("⚠️ Failed to delete original file")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error deleting original file: {e}")
-                
-                else:
-                    # Local storage - copy converted file to final location
-                    logger.info(f"📁 Saving converted video locally: {final_s3_key}")
-                    final_local_path = os.path.join("uploads", final_s3_key)
-                    
-                    # Ensure directory exists
-                    os.makedirs(os.path.dirname(final_local_path), exist_ok=True)
-                    
-                    import shutil
-                    shutil.copy2(final_video_path, final_local_path)
-                    
-                    logger.info("✅ Converted video saved locally")
-                    
-                    # Remove original file to save space
-                    try:
-                        original_local_path = os.path.join("uploads", s3_key)
-                        if os.path.exists(original_local_path):
-                            os.remove(original_local_path)
-                            logger.info("✅ Original file deleted successfully")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error deleting original file: {e}")
+            # Same footage already processed for this property: no conversion, thumbnail or AI description
+            duplicate = _find_duplicate_upload(db, video, original_path, original_metadata)
+            if duplicate:
+                return _reuse_duplicate_upload(db, video, *duplicate, s3_key)
             
-            # Step 7: Update video record with processed information
-            if settings.STORAGE_BACKEND == "s3":
-                video.video_url = f"s3://{s3_service.bucket_name}/{final_s3_key}"
-            else:
-                video.video_url = f"s3://hospup-files/{final_s3_key}"  # Keep consistent format for local
-            # Update status to "processing" during conversion
-            video.status = "processing"
-            video.duration = final_metadata.get("duration")
-            video.size = final_metadata.get("size", os.path.getsize(final_video_path))
-            video.format = "mp4"  # Always MP4 after processing
-            # Enhance description with AI analysis but keep original as fallback
-            enhanced_description = f"{video.description}\n\nAI Analysis: {content_description}" if video.description else content_description
-            video.description = enhanced_description
-            
-            # Step 8: Generate thumbnail
-            thumbnail_url = _generate_video_thumbnail(final_video_path, video_id, temp_dir)
-            if thumbnail_url:
-                video.thumbnail_url = thumbnail_url
-                logger.info(f"✅ Thumbnail generated: {thumbnail_url}")
-            else:
-                logger.warning("⚠️ Failed to generate thumbnail")
+            # Keyframe index from the packet headers (no decoding)
+            original_keyframes = video_conversion_service.get_keyframe_index(original_path)
             
-            # Store processing metadata
-            processing_metadata = {
-                "original_metadata": original_metadata,
-                "final_metadata": final_metadata,
-                "conversion_needed": needs_conversion,
-                "content_description": content_description,
-                "processed_at": datetime.utcnow().isoformat(),
-                "s3_key": final_s3_key
-            }
-            
-            if needs_conversion and "compression_ratio" in conversion_result:
-                processing_metadata["compression_ratio"] = conversion_result["compression_ratio"]
+            # Per-stream plan: compliant streams are copied, only the others are re-encoded
+            # (a long GOP also needs the mezzanine re-encode)
+            conversion_plan = video_conversion_service.get_conversion_plan(original_metadata, original_keyframes)
+            needs_conversion = conversion_plan["needs_conversion"]
             
-            # Store as JSON in source_data field
-            video.source_data = json.dumps(processing_metadata)
-            
-            # Determine final status based on AI description availability
-            if content_description and not content_description.startswith("No content description available"):
-                # AI description generated successfully
-                video.status = "ready"  # Ready to use
-                logger.info(f"✅ Video ready with AI description: {content_description[:50]}...")
-            else:
-                # Video processed but no AI description
-                video.status = "uploaded"  # Uploaded but not ready for use
-                logger.info(f"⚠️ Video uploaded but AI description missing")
-            
-            db.commit()
-            
-            logger.info(f"✅ Video processing completed for {video_id}")
-            
-            # Final progress update
-            current_task.update_state(
-                state="PROGRESS",
-                meta={
-                    "stage": "completed",
-                    "progress": 100,
-                    "video_id": video_id
-                }
-            )
-            
-            return {
-                "video_id": video_id,
-                "status": "completed",
-                "original_size": original_metadata.get("size", 0),
-                "final_size": final_metadata.get("size", 0),
-                "conversion_needed": needs_conversion,
-                "content_description": content_description,
-                "duration": final_metadata.get("duration"),
-                "s3_key": final_s3_key
-            }
+            # One frame for the description step (input-side seek, no full decode) so the AI
+            # call does not wait for the conversion
+            describe_frame_key = None
+            describe_frame_path = _extract_analysis_frame(original_path, temp_dir, original_metadata.get("duration"))
+            if describe_frame_path:
+                describe_frame_key = f"analysis-frames/{video_id}/describe.jpg"
+                if not _store_ingest_artifact(describe_frame_path, describe_frame_key, "image/jpeg"):
+                    describe_frame_key = None
             
         finally:
-            # Cleanup temporary files
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-                logger.info("🧹 Cleaned up temporary files")
-            except Exception as e:
-                logger.warning(f"⚠️ Cleanup failed: {e}")
-                
+            _cleanup_temp_dir(temp_dir)
+        
+        ingest = {
+            "video_id": video_id,
+            "s3_key": s3_key,
+            "needs_conversion": needs_conversion,
+            "conversion_plan": conversion_plan,
+            "original_metadata": original_metadata,
+            "original_keyframes": original_keyframes,
+            "describe_frame_key": describe_frame_key
+        }
+        
+        # Step 2-3: conversion and AI description in parallel, join once both are done
+        # (every step keeps the priority the upload was queued with)
+        priority = (self.request.delivery_info or {}).get("priority")
+        branches = [convert_uploaded_video.s(ingest), describe_uploaded_video.s(ingest)]
+        join = finalize_uploaded_video.s(ingest)
+        if priority is not None:
+            branches = [branch.set(priority=priority) for branch in branches]
+            join = join.set(priority=priority)
+        workflow = chord(
+            group(*branches),
+            join.on_error(mark_uploaded_video_failed.s(video_id=video_id))
+        )
+        result = workflow.apply_async()
+        
+        logger.info(f"🔀 Ingest DAG dispatched for {video_id} (conversion needed: {needs_conversion})")
+        
+        return {
+            "video_id": video_id,
+            "status": "dispatched",
+            "conversion_needed": needs_conversion,
+            "finalize_task_id": result.id
+        }
+        
     except Exception as e:
         logger.error(f"❌ Video processing error: {str(e)}")
         
         # Log error but don't change video status to failed (it's already uploaded)
-        try:
-            if 'video' in locals():
-                # Just add error info to description, don't change status
-                error_info = f"\n\nProcessing error: {str(e)}"
-                if video.description:
-                    video.description += error_info
-                else:
-                    video.description = f"Video uploaded successfully{error_info}"
-                db.commit()
-        except:
-            pass
+        _record_processing_error(video_id, e)
         
         current_task.update_state(
             state="FAILURE",
@@ -328,6 +155,567 @@ def process_uploaded_video(
         if 'db' in locals():
             db.close()
 
+
+@celery_app.task(bind=True)
+def convert_uploaded_video(self, ingest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ingest step: decode the source once to write the standard format video (when
+    conversion is needed), thumbnail, analysis frames and scrub sprite, and upload them.
+    The original is deleted by the join.
+    """
+    video_id = ingest["video_id"]
+    s3_key = ingest["s3_key"]
+    needs_conversion = ingest["needs_conversion"]
+    conversion_plan = ingest.get("conversion_plan")
+    
+    temp_dir = tempfile.mkdtemp(prefix=f"video_convert_{video_id}_")
+    try:
+        original_path = _fetch_ingest_source(s3_key, video_id, temp_dir)
+        converted_path = os.path.join(temp_dir, f"converted_{video_id}.mp4")
+        artifacts_dir = os.path.join(temp_dir, "artifacts")
+        os.makedirs(artifacts_dir, exist_ok=True)
+        
+        conversion_result = _convert_long_upload(
+            original_path, converted_path, temp_dir, video_id, ingest
+        ) if needs_conversion else None
+        
+        if conversion_result:
+            # Already converted in chunks (short GOPs): the other artifacts come from a
+            # keyframe-only decode of the output, not a second full decode
+            artifacts_result = video_conversion_service.convert_with_artifacts(
+                converted_path,
+                artifacts_dir,
+                frame_count=settings.INGEST_ANALYSIS_FRAMES,
+                progress_callback=celery_progress_callback("converting", 75, 90, video_id=video_id),
+                keyframes_only=True
+            )
+            if artifacts_result["success"]:
+                conversion_result = {**artifacts_result, **conversion_result}
+            else:
+                logger.warning(f"⚠️ Artifact pass failed, falling back to separate steps: {artifacts_result['error']}")
+                conversion_result = {
+                    **_convert_with_separate_steps(converted_path, None, artifacts_dir, video_id),
+                    **conversion_result
+                }
+        else:
+            logger.info(f"🔄 Single-decode ingest pass (conversion needed: {needs_conversion})")
+            conversion_result = video_conversion_service.convert_with_artifacts(
+                original_path,
+                artifacts_dir,
+                output_file_path=converted_path if needs_conversion else None,
+                frame_count=settings.INGEST_ANALYSIS_FRAMES,
+                progress_callback=celery_progress_callback("converting", 0, 90, video_id=video_id),
+                plan=conversion_plan
+            )
+        
+        if not conversion_result["success"]:
+            # Sources ffmpeg cannot split-decode (some HDR/HEVC footage): one step at a time
+            logger.warning(f"⚠️ Single-decode pass failed, falling back to separate steps: {conversion_result['error']}")
+            conversion_result = _convert_with_separate_steps(
+                original_path, converted_path if needs_conversion else None, artifacts_dir, video_id,
+                plan=conversion_plan
+            )
+        
+        final_encoder_profile = None
+        if needs_conversion:
+            logger.info("✅ Video conversion completed")
+            final_path = converted_path
+            final_metadata = conversion_result["output_metadata"]
+            final_keyframes = video_conversion_service.get_keyframe_index(converted_path)
+            
+            # Upload converted video with "_processed" suffix
+            base_key = s3_key.rsplit('.', 1)[0]  # Remove extension
+            final_s3_key = f"{base_key}_processed.mp4"
+            
+            logger.info(f"☁️ Storing converted video: {final_s3_key}")
+            if not _store_ingest_artifact(final_path, final_s3_key, "video/mp4"):
+                raise Exception(f"Failed to upload converted video: {final_s3_key}")
+            logger.info("✅ Converted video stored")
+            
+            if settings.STORAGE_BACKEND == "s3":
+                # Renders will download the converted video next: seed the cache with it
+                source_cache_service.put(final_s3_key, final_path)
+            
+            # Smart-cut only stream-copies GOPs of videos whose stream the ingest encoded
+            if not conversion_plan or conversion_plan["video"]["action"] == "transcode":
+                final_encoder_profile = video_conversion_service.get_mezzanine_profile()
+        else:
+            logger.info("✅ Video already in standard format")
+            final_path = original_path
+            final_s3_key = s3_key
+            final_metadata = ingest["original_metadata"]
+            final_keyframes = ingest["original_keyframes"]
+        
+        # Shots come from the single-decode (or keyframe-only) pass; only the separate-steps
+        # fallback, taken when that pass failed, needs its own small decode
+        final_shots = conversion_result.get("shots")
+        if final_shots is None:
+            final_shots = shot_detector.detect(final_path, final_metadata.get("duration", 0), final_metadata.get("framerate"))
+        
+        # Thumbnail from the steadiest well-lit shot; the decode pass could only take it at 2s,
+        # so another time costs one seek into the final video
+        thumbnail_path = conversion_result.get("thumbnail_path")
+        thumbnail_time = shot_detector.pick_thumbnail_time(final_shots)
+        if abs(thumbnail_time - 2.0) > 0.5:
+            shot_thumbnail_path = _render_video_thumbnail(final_path, video_id, artifacts_dir, thumbnail_time)
+            if shot_thumbnail_path:
+                logger.info(f"🖼️ Thumbnail taken at {thumbnail_time}s from the detected shots")
+                thumbnail_path = shot_thumbnail_path
+        
+        # Thumbnail (public URL, S3 only as before)
+        thumbnail_url = None
+        if thumbnail_path and settings.STORAGE_BACKEND == "s3":
+            thumbnail_s3_key = f"thumbnails/{video_id}/{video_id}_thumbnail.jpg"
+            if _store_ingest_artifact(thumbnail_path, thumbnail_s3_key, "image/jpeg"):
+                thumbnail_url = f"https://{s3_service.bucket_name}.s3.amazonaws.com/{thumbnail_s3_key}"
+        
+        # Analysis frames, read by the description step and later analysis
+        frame_keys = []
+        for index, frame_path in enumerate(conversion_result.get("frame_paths", [])):
+            frame_key = f"analysis-frames/{video_id}/frame_{index:02d}.jpg"
+            if _store_ingest_artifact(frame_path, frame_key, "image/jpeg"):
+                frame_keys.append(frame_key)
+        
+        # Scrub sprite sheet
+        sprite = None
+        if conversion_result.get("sprite_path"):
+            sprite_key = f"sprites/{video_id}/sprite.jpg"
+            if _store_ingest_artifact(conversion_result["sprite_path"], sprite_key, "image/jpeg"):
+                sprite = {**conversion_result["sprite"], "s3_key": sprite_key}
+        
+        return {
+            "final_s3_key": final_s3_key,
+            "final_metadata": final_metadata,
+            "final_keyframes": final_keyframes,
+            "final_shots": final_shots,
+            "final_encoder_profile": final_encoder_profile,
+            "compression_ratio": conversion_result.get("compression_ratio"),
+            "conversion_seconds": conversion_result.get("conversion_seconds"),
+            "conversion_chunks": conversion_result.get("chunks", 1) if needs_conversion else 0,
+            "thumbnail_url": thumbnail_url,
+            "analysis_frame_keys": frame_keys,
+            "sprite": sprite
+        }
+        
+    finally:
+        _cleanup_temp_dir(temp_dir)
+
+
+@celery_app.task(bind=True)
+def describe_uploaded_video(self, ingest: Dict[str, Any]) -> Dict[str, Any]:
+    """Ingest branch: generate the content description script from the frame stored by the prepare step"""
+    video_id = ingest["video_id"]
+    temp_dir = tempfile.mkdtemp(prefix=f"video_describe_{video_id}_")
+    try:
+        db = next(get_db())
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if not video:
+            raise ValueError(f"Video {video_id} not found")
+        
+        frame_path = None
+        if ingest.get("describe_frame_key"):
+            frame_path = os.path.join(temp_dir, "frame_analysis.jpg")
+            if not _fetch_ingest_artifact(ingest["describe_frame_key"], frame_path):
+                frame_path = None
+        
+        logger.info("📝 Generating content description...")
+        content_description = describe_video_frame(frame_path, video.title, video.property_id, db)
+        return {"content_description": content_description}
+        
+    finally:
+        if 'db' in locals():
+            db.close()
+        _cleanup_temp_dir(temp_dir)
+
+
+@celery_app.task(bind=True)
+def finalize_uploaded_video(
+    self,
+    branch_results: List[Dict[str, Any]],
+    ingest: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Ingest join: update the video record once with the results of every branch,
+    then delete the original if it was converted
+    """
+    video_id = ingest["video_id"]
+    s3_key = ingest["s3_key"]
+    
+    results = {}
+    for branch_result in branch_results:
+        results.update(branch_result or {})
+    
+    final_s3_key = results["final_s3_key"]
+    final_metadata = results["final_metadata"]
+    needs_conversion = ingest["needs_conversion"]
+    content_description = results.get("content_description")
+    thumbnail_url = results.get("thumbnail_url")
+    
+    try:
+        db = next(get_db())
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if not video:
+            raise ValueError(f"Video {video_id} not found")
+        
+        # Update video record with processed information
+        if settings.STORAGE_BACKEND == "s3":
+            video.video_url = f"s3://{s3_service.bucket_name}/{final_s3_key}"
+        else:
+            video.video_url = f"s3://hospup-files/{final_s3_key}"  # Keep consistent format for local
+        video.duration = final_metadata.get("duration")
+        video.size = final_metadata.get("size")
+        video.format = "mp4"  # Always MP4 after processing
+        # Enhance description with AI analysis but keep original as fallback
+        enhanced_description = f"{video.description}\n\nAI Analysis: {content_description}" if video.description else content_description
+        video.description = enhanced_description
+        
+        # Persist the keyframe and shot index so renders and analysis can seek and cut without decoding
+        gop_stats = _store_media_index(
+            db, video_id, final_s3_key, results["final_keyframes"], final_metadata,
+            shots=results.get("final_shots"), encoder_profile=results.get("final_encoder_profile")
+        )
+        
+        if thumbnail_url:
+            video.thumbnail_url = thumbnail_url
+            logger.info(f"✅ Thumbnail generated: {thumbnail_url}")
+        else:
+            logger.warning("⚠️ Failed to generate thumbnail")
+        
+        # Store processing metadata
+        processing_metadata = {
+            "original_metadata": ingest["original_metadata"],
+            "final_metadata": final_metadata,
+            "conversion_needed": needs_conversion,
+            "conversion_plan": ingest.get("conversion_plan"),
+            "conversion_savings": video_conversion_service.get_copy_savings(
+                ingest.get("conversion_plan"), ingest["original_metadata"]
+            ),
+            "gop": gop_stats,
+            "content_description": content_description,
+            "analysis_frames": results.get("analysis_frame_keys", []),
+            "sprite": results.get("sprite"),
+            "processed_at": datetime.utcnow().isoformat(),
+            "s3_key": final_s3_key
+        }
+        
+        if results.get("compression_ratio"):
+            processing_metadata["compression_ratio"] = results["compression_ratio"]
+        if results.get("conversion_seconds") is not None:
+            processing_metadata["conversion_seconds"] = results["conversion_seconds"]
+        if results.get("conversion_chunks", 0) > 1:
+            processing_metadata["conversion_chunks"] = results["conversion_chunks"]
+        
+        # Store as JSON in source_data field
+        video.source_data = json.dumps(processing_metadata)
+        
+        # Determine final status based on AI description availability
+        if content_description and not content_description.startswith("No content description available"):
+            # AI description generated successfully
+            video.status = "ready"  # Ready to use
+            logger.info(f"✅ Video ready with AI description: {content_description[:50]}...")
+        else:
+            # Video processed but no AI description
+            video.status = "uploaded"  # Uploaded but not ready for use
+            logger.info(f"⚠️ Video uploaded but AI description missing")
+        
+        db.commit()
+        
+    finally:
+        if 'db' in locals():
+            db.close()
+    
+    # Clean up original file to save storage costs (every branch is done reading it)
+    if needs_conversion and final_s3_key != s3_key:
+        _delete_original_upload(s3_key)
+    
+    logger.info(f"✅ Video processing completed for {video_id}")
+    
+    return {
+        "video_id": video_id,
+        "status": "completed",
+        "original_size": ingest["original_metadata"].get("size", 0),
+        "final_size": final_metadata.get("size", 0),
+        "conversion_needed": needs_conversion,
+        "content_description": content_description,
+        "duration": final_metadata.get("duration"),
+        "s3_key": final_s3_key
+    }
+
+
+@celery_app.task(bind=True)
+def mark_uploaded_video_failed(self, request, exc, traceback, video_id: str = None):
+    """Errback of the ingest DAG: record the error on the video (status is left unchanged)"""
+    logger.error(f"❌ Video processing error in {request.task}: {exc}")
+    _record_processing_error(video_id, exc)
+
+
+def _find_duplicate_upload(
+    db: Session,
+    video: Video,
+    original_path: str,
+    original_metadata: Dict[str, Any]
+) -> Optional[tuple]:
+    """Fingerprint the upload, store it and look for a processed copy in the same property"""
+    if not settings.FINGERPRINT_ENABLED:
+        return None
+    
+    try:
+        fingerprint = video_fingerprint_service.compute(original_path, original_metadata.get("duration", 0))
+        if not fingerprint:
+            return None
+        
+        video_fingerprint_service.store(db, video.id, video.property_id, fingerprint)
+        return video_fingerprint_service.find_duplicate(db, video.id, video.property_id, fingerprint)
+        
+    except Exception as e:
+        # Fingerprinting only saves work: the upload is processed normally
+        db.rollback()
+        logger.warning(f"⚠️ Fingerprint lookup failed for {video.id}: {e}")
+        return None
+
+
+def _reuse_duplicate_upload(
+    db: Session,
+    video: Video,
+    source_video: Video,
+    distance: float,
+    s3_key: str
+) -> Dict[str, Any]:
+    """
+    Point a re-uploaded video at the processed outputs of its duplicate and delete the upload
+    
+    Args:
+        db: Database session
+        video: Video being ingested
+        source_video: Processed video with the same footage
+        distance: Mean Hamming distance of their fingerprints
+        s3_key: Key of the new upload
+        
+    Returns:
+        Task result
+    """
+    logger.info(f"♻️ Upload {video.id} duplicates {source_video.id} (distance {distance:.1f}), reusing its outputs")
+    source_metadata = json.loads(source_video.source_data)
+    content_description = source_metadata.get("content_description")
+    
+    video.video_url = source_video.video_url
+    video.duration = source_video.duration
+    video.size = source_video.size
+    video.format = source_video.format
+    if source_video.thumbnail_url:
+        video.thumbnail_url = source_video.thumbnail_url
+    if content_description:
+        video.description = f"{video.description}\n\nAI Analysis: {content_description}" if video.description else content_description
+    
+    # Same stored rendition, so the same keyframe and shot index
+    source_index = db.query(VideoMediaIndex).filter(VideoMediaIndex.video_id == source_video.id).first()
+    if source_index:
+        _store_media_index(
+            db, video.id, source_index.s3_key, source_index.keyframes,
+            {"duration": source_index.duration}, shots=source_index.shots,
+            encoder_profile=source_index.encoder_profile
+        )
+    
+    video.source_data = json.dumps({
+        **source_metadata,
+        "duplicate_of": source_video.id,
+        "fingerprint_distance": round(distance, 2),
+        "processed_at": datetime.utcnow().isoformat()
+    })
+    video.status = source_video.status
+    db.commit()
+    
+    # The stored outputs are shared: only the new upload is redundant
+    if s3_key != source_metadata["s3_key"]:
+        _delete_original_upload(s3_key)
+    
+    return {
+        "video_id": video.id,
+        "status": "duplicate",
+        "duplicate_of": source_video.id,
+        "conversion_needed": False,
+        "s3_key": source_metadata["s3_key"]
+    }
+
+
+def _fetch_ingest_source(s3_key: str, video_id: str, temp_dir: str) -> str:
+    """Materialize the uploaded original in temp_dir (shared source cache or local storage)"""
+    original_path = os.path.join(temp_dir, f"original_{video_id}.mp4")
+    
+    if settings.STORAGE_BACKEND == "s3":
+        logger.info("📥 Downloading original video from S3...")
+        
+        # Branches of the same upload hit the worker's source cache
+        if not source_cache_service.fetch(s3_key, original_path):
+            raise Exception(f"Failed to download video: {s3_key}")
+    else:
+        # Local storage - copy file directly
+        logger.info("📥 Copying original video from local storage...")
+        local_file_path = os.path.join("uploads", s3_key)
+        
+        if not os.path.exists(local_file_path):
+            raise Exception(f"Local file not found: {local_file_path}")
+        
+        import shutil
+        shutil.copy2(local_file_path, original_path)
+    
+    logger.info(f"✅ Video ready for processing: {os.path.getsize(original_path):,} bytes")
+    return original_path
+
+
+def _convert_long_upload(
+    original_path: str,
+    converted_path: str,
+    temp_dir: str,
+    video_id: str,
+    ingest: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Convert a long upload in keyframe-aligned chunks encoded in parallel.
+    
+    Returns the conversion result, or None when the upload is too short to split,
+    its video stream is copied anyway, or the chunked encode failed (the caller then
+    converts in a single pass).
+    """
+    plan = ingest.get("conversion_plan")
+    duration = ingest["original_metadata"].get("duration", 0)
+    if plan and plan["video"]["action"] != "transcode":
+        return None
+    if duration < 2 * settings.INGEST_CHUNK_MIN_SECONDS or not ingest["original_keyframes"]:
+        return None
+    
+    chunk_dir = os.path.join(temp_dir, "chunks")
+    os.makedirs(chunk_dir, exist_ok=True)
+    
+    logger.info(f"🧩 Long upload ({duration:.0f}s): chunked parallel conversion")
+    result = video_conversion_service.convert_chunked(
+        original_path,
+        converted_path,
+        chunk_dir,
+        ingest["original_keyframes"],
+        max_workers=settings.INGEST_CHUNK_WORKERS,
+        min_chunk_seconds=settings.INGEST_CHUNK_MIN_SECONDS,
+        progress_callback=celery_progress_callback("converting", 0, 75, video_id=video_id),
+        plan=plan
+    )
+    
+    if not result["success"]:
+        logger.warning(f"⚠️ Chunked conversion failed, converting in a single pass: {result['error']}")
+        return None
+    return result
+
+
+def _convert_with_separate_steps(
+    original_path: str,
+    converted_path: Optional[str],
+    artifacts_dir: str,
+    video_id: str,
+    plan: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Fallback of the single-decode pass: conversion, thumbnail and one analysis frame separately"""
+    conversion_result = {"success": True, "frame_paths": []}
+    
+    if converted_path:
+        conversion_result = video_conversion_service.convert_to_standard_format(
+            original_path,
+            converted_path,
+            progress_callback=celery_progress_callback("converting", 0, 90, video_id=video_id),
+            plan=plan
+        )
+        if not conversion_result["success"]:
+            raise Exception(f"Video conversion failed: {conversion_result['error']}")
+        conversion_result["frame_paths"] = []
+    
+    source_path = converted_path or original_path
+    
+    # The thumbnail helper has its own HDR/HEVC fallbacks
+    thumbnail_path = _render_video_thumbnail(source_path, video_id, artifacts_dir)
+    if thumbnail_path:
+        conversion_result["thumbnail_path"] = thumbnail_path
+    
+    frame_path = _extract_analysis_frame(source_path, artifacts_dir)
+    if frame_path:
+        conversion_result["frame_paths"] = [frame_path]
+    
+    return conversion_result
+
+
+def _store_ingest_artifact(local_path: str, key: str, content_type: str) -> bool:
+    """Store an ingest output under key (S3, or uploads/ for the local backend)"""
+    try:
+        if settings.STORAGE_BACKEND == "s3":
+            return bool(s3_service.upload_from_path(local_path, key, content_type=content_type).get("success"))
+        
+        local_key_path = os.path.join("uploads", key)
+        os.makedirs(os.path.dirname(local_key_path), exist_ok=True)
+        import shutil
+        shutil.copy2(local_path, local_key_path)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to store {key}: {e}")
+        return False
+
+
+def _fetch_ingest_artifact(key: str, local_path: str) -> bool:
+    """Fetch a small ingest output (frame, sprite) stored by _store_ingest_artifact"""
+    try:
+        if settings.STORAGE_BACKEND == "s3":
+            return s3_service.download_to_path(key, local_path)
+        
+        import shutil
+        shutil.copy2(os.path.join("uploads", key), local_path)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to fetch {key}: {e}")
+        return False
+
+
+def _delete_original_upload(s3_key: str):
+    """Delete the original upload once its converted version is stored"""
+    try:
+        logger.info(f"🗑️ Deleting original file: {s3_key}")
+        if settings.STORAGE_BACKEND == "s3":
+            if s3_service.delete_file(s3_key):
+                source_cache_service.invalidate(s3_key)
+                logger.info("✅ Original file deleted successfully")
+            else:
+                logger.warning("⚠️ Failed to delete original file")
+        else:
+            original_local_path = os.path.join("uploads", s3_key)
+            if os.path.exists(original_local_path):
+                os.remove(original_local_path)
+                logger.info("✅ Original file deleted successfully")
+    except Exception as e:
+        logger.warning(f"⚠️ Error deleting original file: {e}")
+
+
+def _record_processing_error(video_id: str, error: Exception):
+    """Append a processing error to the video description without changing its status"""
+    try:
+        db = next(get_db())
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if video:
+            error_info = f"\n\nProcessing error: {str(error)}"
+            if video.description:
+                video.description += error_info
+            else:
+                video.description = f"Video uploaded successfully{error_info}"
+            db.commit()
+    except Exception:
+        pass
+    finally:
+        if 'db' in locals():
+            db.close()
+
+
+def _cleanup_temp_dir(temp_dir: str):
+    try:
+        import shutil
+        shutil.rmtree(temp_dir)
+        logger.info("🧹 Cleaned up temporary files")
+    except Exception as e:
+        logger.warning(f"⚠️ Cleanup failed: {e}")
+
 def generate_video_content_description(
     video_path: str, 
     video_title: str, 
@@ -346,27 +734,69 @@ def generate_video_content_description(
     Returns:
         Generated content description
     """
+    frame_path = _extract_analysis_frame(video_path, os.path.dirname(video_path))
+    return describe_video_frame(frame_path, video_title, property_id, db)
+
+def describe_video_frame(
+    frame_path: Optional[str],
+    video_title: str,
+    property_id: str,
+    db: Session
+) -> str:
+    """
+    Generate content description from an analysis frame of the video
+    
+    Args:
+        frame_path: Path to a 512x512 frame (None falls back to the heuristic)
+        video_title: Original video title
+        property_id: Property ID for context
+        db: Database session
+        
+    Returns:
+        Generated content description
+    """
+    property_obj = None
     try:
         # Get property info for context
         property_obj = db.query(Property).filter(Property.id == property_id).first()
-        property_context = ""
-        if property_obj:
-            property_context = f"Property: {property_obj.name} in {property_obj.city}, {property_obj.country}"
         
-        # Extract frame from the video for analysis
-        temp_dir = os.path.dirname(video_path)
-        frame_path = os.path.join(temp_dir, "frame_analysis.jpg")
+        if frame_path and os.path.exists(frame_path):
+            # Vision model description (retried with backoff inside the service)
+            logger.info("🤖 Analyzing video content with the vision model...")
+            description = ai_description_service.describe([frame_path])
+            if description:
+                logger.info("✅ AI analysis successful")
+            else:
+                logger.warning("⚠️ AI analysis failed, falling back to heuristic")
+                description = generate_heuristic_description(video_title, property_obj)
+            
+        else:
+            # Fallback to filename-based description
+            logger.warning("⚠️ No analysis frame, using filename-based description")
+            description = generate_heuristic_description(video_title, property_obj)
+        
+        logger.info(f"📝 Generated description: {description[:100]}...")
+        return description
+        
+    except Exception as e:
+        logger.error(f"❌ Content description generation failed: {e}")
+        # Fallback description
+        return generate_heuristic_description(video_title, property_obj)
+
+def _extract_analysis_frame(video_path: str, output_dir: str, duration: Optional[float] = None) -> Optional[str]:
+    """Extract the middle frame of a video (512x512) for AI analysis (probes the duration if not given)"""
+    try:
+        frame_path = os.path.join(output_dir, "frame_analysis.jpg")
         
         # Get video metadata first to calculate duration
-        from services.video_conversion_service import video_conversion_service
-        video_metadata = video_conversion_service.get_video_metadata(video_path)
-        video_duration = video_metadata.get("duration", 2.0)
+        video_duration = duration or video_conversion_service.get_video_metadata(video_path).get("duration", 2.0)
         
         # Extract frame at 50% of video duration (middle of video)
         middle_time = video_duration / 2.0
         extract_cmd = [
-            "ffmpeg", "-y", "-i", video_path,
-            "-ss", str(middle_time),  # Extract at middle of video
+            "ffmpeg", "-y",
+            "-ss", str(middle_time),  # Input-side seek: decodes one GOP, not the whole file
+            "-i", video_path,
             "-vframes", "1",
             "-vf", "scale=512:512",  # Smaller for analysis
             frame_path
@@ -376,31 +806,14 @@ def generate_video_content_description(
         
         if result.returncode == 0 and os.path.exists(frame_path):
             logger.info("🖼️ Frame extracted for analysis")
-            
-            # Use BLIP AI model for intelligent image analysis
-            try:
-                logger.info("🤖 Analyzing video content with BLIP...")
-                if ai_analysis_service:
-                    description = ai_analysis_service.analyze_video_content(frame_path)
-                else:
-                    description = "Video processed successfully - AI analysis unavailable"
-                logger.info("✅ BLIP analysis successful")
-            except Exception as e:
-                logger.warning(f"⚠️ BLIP analysis failed: {e}, falling back to heuristic")
-                description = generate_heuristic_description(video_title, property_obj)
-            
-        else:
-            # Fallback to filename-based description
-            logger.warning("⚠️ Frame extraction failed, using filename-based description")
-            description = generate_heuristic_description(video_title, property_obj)
+            return frame_path
         
-        logger.info(f"📝 Generated description: {description[:100]}...")
-        return description
+        logger.warning(f"⚠️ Frame extraction failed: {result.stderr}")
+        return None
         
     except Exception as e:
-        logger.error(f"❌ Content description generation failed: {e}")
-        # Fallback description
-        return generate_heuristic_description(video_title, property_obj)
+        logger.warning(f"⚠️ Frame extraction failed: {e}")
+        return None
 
 def generate_heuristic_description(video_title: str, property_obj=None) -> str:
     """
@@ -493,7 +906,55 @@ def get_video_processing_status(self, video_id: str) -> Dict[str, Any]:
             db.close()
 
 
-def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str) -> str:
+def _store_media_index(
+    db: Session,
+    video_id: str,
+    s3_key: str,
+    keyframes: list,
+    metadata: Dict[str, Any],
+    shots: Optional[list] = None,
+    encoder_profile: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Create or refresh the keyframe and shot index of an ingested video
+    
+    Args:
+        db: Database session (committed by the caller)
+        video_id: ID of the indexed video
+        s3_key: Key of the object the index describes
+        keyframes: Keyframe index from get_keyframe_index
+        metadata: Video metadata of the same object
+        shots: Shots from shot_detector (None keeps the stored shots of the same object)
+        encoder_profile: Mezzanine profile if the ingest encoded the video stream, else None
+        
+    Returns:
+        GOP stats (keyframe_count, max_gop_duration)
+    """
+    duration = metadata.get("duration", 0)
+    gop_stats = video_conversion_service.get_gop_stats(keyframes, duration)
+    
+    media_index = db.query(VideoMediaIndex).filter(VideoMediaIndex.video_id == video_id).first()
+    if not media_index:
+        media_index = VideoMediaIndex(video_id=video_id)
+        db.add(media_index)
+    
+    if shots is not None:
+        media_index.shots = shots
+    elif media_index.s3_key != s3_key:
+        media_index.shots = None  # Shots belong to the previous rendition
+    media_index.s3_key = s3_key
+    media_index.keyframes = keyframes
+    media_index.keyframe_count = gop_stats["keyframe_count"]
+    media_index.max_gop_duration = gop_stats["max_gop_duration"]
+    media_index.duration = duration
+    media_index.encoder_profile = encoder_profile
+    
+    logger.info(f"🗂️ Media index stored: {gop_stats['keyframe_count']} keyframes, max GOP {gop_stats['max_gop_duration']}s, "
+                f"{len(media_index.shots or [])} shots")
+    return gop_stats
+
+
+def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str, thumbnail_time: float = 2) -> str:
     """
     Generate a thumbnail from the video file and upload it to storage
     
@@ -501,10 +962,56 @@ def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str) ->
         video_path: Path to the video file
         video_id: Unique identifier for the video
         temp_dir: Temporary directory for processing
+        thumbnail_time: Time of the thumbnail frame in seconds
         
     Returns:
         Thumbnail URL if successful, None if failed
     """
+    try:
+        thumbnail_path = _render_video_thumbnail(video_path, video_id, temp_dir, thumbnail_time)
+        if not thumbnail_path:
+            return None
+        
+        # Upload thumbnail to storage
+        thumbnail_filename = os.path.basename(thumbnail_path)
+        thumbnail_s3_key = f"thumbnails/{video_id}/{thumbnail_filename}"
+        
+        if settings.STORAGE_BACKEND == "s3":
+            # Upload to S3
+            upload_result = s3_service.upload_from_path(
+                thumbnail_path,
+                thumbnail_s3_key,
+                content_type="image/jpeg"
+            )
+            
+            if upload_result.get('success'):
+                # Generate public URL for thumbnail
+                thumbnail_url = f"https://{s3_service.bucket_name}.s3.amazonaws.com/{thumbnail_s3_key}"
+                logger.info(f"✅ Thumbnail uploaded to S3: {thumbnail_url}")
+                return thumbnail_url
+            else:
+                logger.error("❌ Failed to upload thumbnail to S3")
+                return None
+        else:
+            # S3 only - local storage removed
+            logger.error("❌ S3 storage not configured properly")
+            return None
+            
+    except Exception as e:
+        logger.error(f"❌ Error generating thumbnail: {str(e)}")
+        return None
+
+
+def _render_video_thumbnail(video_path: str, video_id: str, temp_dir: str, thumbnail_time: float = 2) -> Optional[str]:
+    """
+    Render the 9:16 JPEG thumbnail of a video, with fallbacks for HDR/HEVC iPhone footage
+    
+    Args:
+        thumbnail_time: Time of the thumbnail frame in seconds (the fallbacks use earlier frames)
+    
+    Returns:
+        Local thumbnail path if successful, None if failed
+    """
     try:
         # Generate thumbnail filename
         thumbnail_filename = f"{video_id}_thumbnail.jpg"
@@ -514,8 +1021,8 @@ def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str) ->
         ffmpeg_cmd = [
             "ffmpeg", "-y",
             "-hwaccel", "auto",  # Use hardware acceleration if available
+            "-ss", str(thumbnail_time),  # Input-side seek to thumbnail_time: decodes one GOP, not the whole prefix
             "-i", video_path,
-            "-ss", "2",  # Extract frame at 2 seconds
             "-vframes", "1",  # Extract only 1 frame
             "-vf", "scale=640:1138:force_original_aspect_ratio=decrease,pad=640:1138:(ow-iw)/2:(oh-ih)/2:black",  # 9:16 aspect ratio
             "-q:v", "2",  # High quality
@@ -596,32 +1103,7 @@ def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str) ->
             return None
             
         logger.info(f"✅ Thumbnail generated successfully: {thumbnail_path}")
-        
-        # Upload thumbnail to storage
-        thumbnail_s3_key = f"thumbnails/{video_id}/{thumbnail_filename}"
-        
-        if settings.STORAGE_BACKEND == "s3":
-            # Upload to S3
-            with open(thumbnail_path, 'rb') as thumbnail_file:
-                upload_result = s3_service.upload_file_direct(
-                    thumbnail_file, 
-                    thumbnail_s3_key, 
-                    content_type="image/jpeg",
-                    public_read=True  # Make thumbnails public for easy access
-                )
-            
-            if upload_result.get('success'):
-                # Generate public URL for thumbnail
-                thumbnail_url = f"https://{s3_service.bucket_name}.s3.amazonaws.com/{thumbnail_s3_key}"
-                logger.info(f"✅ Thumbnail uploaded to S3: {thumbnail_url}")
-                return thumbnail_url
-            else:
-                logger.error("❌ Failed to upload thumbnail to S3")
-                return None
-        else:
-            # S3 only - local storage removed
-            logger.error("❌ S3 storage not configured properly")
-            return None
+        return thumbnail_path
             
     except subprocess.TimeoutExpired:
         logger.error("❌ Thumbnail generation timed out")
@@ -631,6 +1113,75 @@ def _generate_video_thumbnail(video_path: str, video_id: str, temp_dir: str) ->
         return None
 
 
+@celery_app.task(bind=True)
+def describe_uploaded_videos(self, video_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Describe many uploaded videos at once from their stored analysis frames
+    (bulk onboarding, or videos left on the heuristic description)
+    
+    Requests run concurrently and several videos share a request
+    (AI_DESCRIPTION_CONCURRENCY, AI_DESCRIPTION_BATCH_SIZE).
+    
+    Args:
+        video_ids: Videos to describe (default: uploaded videos without AI description)
+    """
+    temp_dir = tempfile.mkdtemp(prefix="video_describe_batch_")
+    try:
+        db = next(get_db())
+        
+        query = db.query(Video).filter(Video.source_data.isnot(None))
+        if video_ids:
+            query = query.filter(Video.id.in_(video_ids))
+        else:
+            query = query.filter(Video.status == "uploaded")
+        
+        # Middle analysis frame of each video, as written by the ingest pass
+        videos, frame_paths = [], []
+        for video in query.all():
+            try:
+                processing_metadata = json.loads(video.source_data)
+            except (TypeError, ValueError):
+                continue
+            frame_keys = processing_metadata.get("analysis_frames") or []
+            if not frame_keys:
+                continue
+            
+            frame_path = os.path.join(temp_dir, f"{video.id}.jpg")
+            if _fetch_ingest_artifact(frame_keys[len(frame_keys) // 2], frame_path):
+                videos.append((video, processing_metadata))
+                frame_paths.append([frame_path])
+        
+        logger.info(f"🤖 Describing {len(videos)} videos in batch")
+        descriptions = ai_description_service.describe_many(frame_paths)
+        
+        described_count = 0
+        for (video, processing_metadata), description in zip(videos, descriptions):
+            if not description:
+                continue
+            
+            # Keep the uploader's description, replace any previous analysis
+            base_description = (video.description or "").split("\n\nAI Analysis: ")[0]
+            video.description = f"{base_description}\n\nAI Analysis: {description}" if base_description else description
+            processing_metadata["content_description"] = description
+            video.source_data = json.dumps(processing_metadata)
+            video.status = "ready"
+            described_count += 1
+        
+        db.commit()
+        logger.info(f"✅ Described {described_count}/{len(videos)} videos")
+        
+        return {
+            "described": described_count,
+            "total_found": len(videos),
+            "message": f"Described {described_count} videos out of {len(videos)}"
+        }
+        
+    finally:
+        if 'db' in locals():
+            db.close()
+        _cleanup_temp_dir(temp_dir)
+
+
 @celery_app.task(bind=True)
 def generate_missing_thumbnails(self):
     """
@@ -671,12 +1222,8 @@ def generate_missing_thumbnails(self):
                     
                     # Download video
                     if settings.STORAGE_BACKEND == "s3":
-                        download_url = s3_service.generate_presigned_download_url(s3_key)
-                        download_cmd = ["curl", "-s", "--max-time", "60", "-o", local_video_path, download_url]
-                        result = subprocess.run(download_cmd, capture_output=True, text=True, timeout=120)
-                        
-                        if result.returncode != 0 or not os.path.exists(local_video_path):
-                            logger.warning(f"Failed to download video {video.id}: {result.stderr}")
+                        if not source_cache_service.fetch(s3_key, local_video_path):
+                            logger.warning(f"Failed to download video {video.id}")
                             continue
                     else:
                         # Local storage
@@ -688,8 +1235,11 @@ def generate_missing_thumbnails(self):
                         import shutil
                         shutil.copy2(local_source_path, local_video_path)
                     
-                    # Generate thumbnail
-                    thumbnail_url = _generate_video_thumbnail(local_video_path, video.id, temp_dir)
+                    # Generate thumbnail from the steadiest well-lit shot of the stored file, if indexed
+                    media_index = db.query(VideoMediaIndex).filter(VideoMediaIndex.video_id == video.id).first()
+                    shots = media_index.shots if media_index and media_index.s3_key == s3_key else None
+                    thumbnail_time = shot_detector.pick_thumbnail_time(shots)
+                    thumbnail_url = _generate_video_thumbnail(local_video_path, video.id, temp_dir, thumbnail_time)
                     
                     if thumbnail_url:
                         video.thumbnail_url = thumbnail_url
@@ -718,4 +1268,16 @@ def generate_missing_thumbnails(self):
         return {"error": str(e)}
     finally:
         if 'db' in locals():
-            db.close()
\ No newline at end of file
+            db.close()
+
+
+@celery_app.task(bind=True)
+def get_source_cache_stats(self) -> Dict[str, Any]:
+    """
+    Return the source video cache hit/miss metrics of the worker host running this task
+    """
+    try:
+        return source_cache_service.get_stats()
+    except Exception as e:
+        logger.error(f"❌ Error getting source cache stats: {e}")
+        return {"error": str(e)}
@@ -10,10 +10,13 @@ from celery.schedules import crontab
 from sqlalchemy.orm import Session
 
 from core.celery_app import celery_app
+from core.config import settings
 from core.database import get_db
 from models.video import Video
+from models.upload_session import UploadSession
 from tasks.video_generation_v3 import generate_video_from_timeline_v3
 from services.video_recovery_service import video_recovery_service
+from services.s3_service import s3_service
 
 logger = logging.getLogger(__name__)
 
@@ -243,4 +246,40 @@ def cleanup_old_failed_videos(self, days_old: int = 7):
         return {"status": "completed", "deleted": deleted}
         
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@celery_app.task(bind=True, name="video_recovery.abort_stale_upload_sessions")
+def abort_stale_upload_sessions(self, ttl_hours: int = None):
+    """Abandonne les uploads multipart jamais terminés (les parts stockées sont facturées)"""
+    ttl_hours = ttl_hours or settings.UPLOAD_SESSION_TTL_HOURS
+    logger.info(f"🧹 Abandon des uploads multipart > {ttl_hours}h")
+    
+    db = next(get_db())
+    try:
+        cutoff_date = datetime.utcnow() - timedelta(hours=ttl_hours)
+        
+        # Les parts ne touchent pas la session: updated_at date de sa création ou de son dernier statut
+        stale_sessions = db.query(UploadSession).filter(
+            UploadSession.status == "uploading",
+            UploadSession.updated_at < cutoff_date
+        ).all()
+        
+        if not stale_sessions:
+            logger.info("✅ Aucun upload abandonné")
+            return {"status": "no_cleanup_needed", "aborted": 0}
+        
+        aborted = 0
+        for upload_session in stale_sessions:
+            if s3_service.abort_multipart_upload(upload_session.s3_key, upload_session.s3_upload_id):
+                upload_session.status = "aborted"
+                aborted += 1
+            else:
+                logger.warning(f"⚠️ Upload {upload_session.id} non abandonné, nouvel essai au prochain passage")
+        
+        db.commit()
+        
+        logger.info(f"🧹 {aborted}/{len(stale_sessions)} uploads abandonnés")
+        return {"status": "completed", "aborted": aborted, "stale": len(stale_sessions)}
+        
+    finally:
+        db.close()